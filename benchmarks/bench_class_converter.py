@@ -0,0 +1,99 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of resolving class names with str_to_python_object, with and
+without its import cache, and of converting long lists of classes with the
+converters made by str_to_classes_in_namespaces, and of converting objects
+back to strings with and without the to_str strategy cache"""
+
+from benchutil import best_time, report
+
+from configman import converters
+
+names = (
+    'configman.namespace.Namespace',
+    'configman.dotdict.DotDict',
+    'os.path.join',
+    'collections.OrderedDict',
+    'configman',
+)
+
+
+#------------------------------------------------------------------------------
+def main():
+    number = 10000
+
+    def resolve_all():
+        for a_name in names:
+            converters.str_to_python_object(a_name)
+
+    def resolve_all_uncached():
+        converters.clear_import_cache()
+        resolve_all()
+
+    report(
+        '%d x %d names, cached' % (number, len(names)),
+        best_time(resolve_all, number=number)
+    )
+    report(
+        '%d x %d names, uncached' % (number, len(names)),
+        best_time(resolve_all_uncached, number=number)
+    )
+
+    def probe_a_path():
+        try:
+            converters.str_to_python_object('/etc/app/config.ini')
+        except converters.CannotConvertError:
+            pass
+
+    report(
+        '%d x a config file path' % number,
+        best_time(probe_a_path, number=number)
+    )
+
+    class_list = ', '.join(
+        'configman.namespace.Namespace' for x in range(120)
+    )
+    class_list_converter = converters.str_to_classes_in_namespaces()
+
+    def convert_class_list():
+        class_list_converter(class_list).to_str()
+
+    def convert_class_list_uncached():
+        converters._class_list_cache.clear()
+        convert_class_list()
+
+    report(
+        '100 x a list of 120 classes, cached',
+        best_time(convert_class_list, number=100)
+    )
+    report(
+        '100 x a list of 120 classes, uncached',
+        best_time(convert_class_list_uncached, number=100)
+    )
+
+    objects = [
+        converters.str_to_python_object(a_name) for a_name in names
+    ] + [converters.to_str, 17L, object()]
+
+    def to_str_all():
+        for an_object in objects:
+            converters.to_str(an_object)
+
+    def to_str_all_uncached():
+        converters._to_str_strategy_cache.clear()
+        to_str_all()
+
+    report(
+        '%d x %d objects to_str, cached' % (number, len(objects)),
+        best_time(to_str_all, number=number)
+    )
+    report(
+        '%d x %d objects to_str, uncached' % (number, len(objects)),
+        best_time(to_str_all_uncached, number=number)
+    )
+
+
+if __name__ == '__main__':
+    main()
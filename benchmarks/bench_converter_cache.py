@@ -0,0 +1,131 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of setting up a configuration of many namespaces that repeat the same
+regular expression, datetime, timedelta and frozenset options, with and
+without the caches of the pure converters, and the hit rate of each cache"""
+
+import datetime
+
+from benchutil import best_time, report
+
+from configman import converters
+from configman.config_manager import ConfigurationManager
+from configman.namespace import Namespace
+
+
+#------------------------------------------------------------------------------
+def make_definitions(number_of_namespaces):
+    n = Namespace()
+    for i in xrange(number_of_namespaces):
+        n.namespace('worker%d' % i)
+        a_namespace = n['worker%d' % i]
+        a_namespace.add_option(
+            'pattern',
+            default=r'^/api/v\d+/items/(\d+)$',
+            from_string_converter=converters.regex_converter
+        )
+        a_namespace.add_option(
+            'start',
+            default=datetime.datetime(2014, 1, 1, 6, 30)
+        )
+        a_namespace.add_option(
+            'window',
+            default=datetime.timedelta(hours=2)
+        )
+        a_namespace.add_option(
+            'hosts',
+            default=frozenset(['a.example.com', 'b.example.com'])
+        )
+    return n
+
+
+#------------------------------------------------------------------------------
+def main():
+    number_of_namespaces = 500
+    values = {}
+    for i in xrange(number_of_namespaces):
+        values['worker%d.pattern' % i] = r'^/api/v\d+/things/(\d+)$'
+        values['worker%d.start' % i] = '2014-06-01T06:30:00'
+        values['worker%d.window' % i] = '0 03:00:00'
+        values['worker%d.hosts' % i] = 'c.example.com, d.example.com'
+
+    def configure():
+        ConfigurationManager(
+            [make_definitions(number_of_namespaces)],
+            values_source_list=[values],
+            argv_source=[],
+            use_auto_help=False
+        ).get_config()
+
+    # each converter alone, over more distinct strings than the re module's
+    # own cache of compiled patterns holds
+    number = 20
+    for a_converter, strings in (
+        (
+            converters.regex_converter,
+            [r'^/api/v\d+/items%d/(\d+)$' % i for i in xrange(200)]
+        ),
+        (
+            converters.datetime_converter,
+            ['2014-06-%02dT06:30:00' % (i % 28 + 1) for i in xrange(200)]
+        ),
+        (
+            converters.timedelta_converter,
+            ['%d 03:00:00' % i for i in xrange(200)]
+        ),
+        (
+            converters.str_to_frozenset,
+            ['a%d.example.com, b.example.com' % i for i in xrange(200)]
+        ),
+    ):
+        def convert_directly():
+            for a_string in strings:
+                a_converter(a_string)
+
+        def convert_through_cache():
+            for a_string in strings:
+                converters.convert_from_string(a_converter, a_string)
+
+        name = converters.to_str(a_converter).rsplit('.', 1)[-1]
+        report(
+            '%d x %d %s' % (number, len(strings), name),
+            best_time(convert_directly, number=number)
+        )
+        report(
+            '%d x %d %s, cached' % (number, len(strings), name),
+            best_time(convert_through_cache, number=number)
+        )
+
+    caches = converters._converter_caches
+    converters._converter_caches = {}
+    try:
+        report(
+            '%d namespaces, uncached' % number_of_namespaces,
+            best_time(configure, repeat=3)
+        )
+    finally:
+        converters._converter_caches = caches
+    converters.clear_converter_caches()
+    report(
+        '%d namespaces, cached' % number_of_namespaces,
+        best_time(configure, repeat=3)
+    )
+    for name, statistics in sorted(
+        converters.converter_cache_statistics().items()
+    ):
+        conversions = (
+            statistics['hits'] + statistics['misses']
+            + statistics['uncacheable']
+        )
+        if conversions:
+            print '%-40s %10d conversions %6.1f%% hits' % (
+                name.rsplit('.', 1)[-1],
+                conversions,
+                statistics['hit_rate'] * 100
+            )
+
+
+if __name__ == '__main__':
+    main()
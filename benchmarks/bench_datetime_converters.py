@@ -0,0 +1,81 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of converting ISO datetimes, dates and timedeltas from strings with
+the one pass parsers in datetime_util, against the strptime and splitting
+conversions that they replaced"""
+
+from benchutil import best_time, report
+
+from configman import datetime_util
+
+datetimes = (
+    '2011-05-04T15:10:00',
+    '2011-05-04',
+    '2011-05-04T15:10:00.666000',
+    '2011-05-04T15:10:00+05:30',
+)
+
+timedeltas = (
+    '4 03:02:01',
+    '4:03:02:01',
+    '03:02:01',
+    '60',
+)
+
+
+#------------------------------------------------------------------------------
+def main():
+    number = 10000
+    for a_name, a_function, strings in (
+        (
+            'datetime, strptime',
+            datetime_util._datetime_from_ISO_string_by_strptime,
+            datetimes[:3]
+        ),
+        (
+            'datetime, one pass',
+            datetime_util.datetime_from_ISO_string,
+            datetimes[:3]
+        ),
+        (
+            'datetime with offset, one pass',
+            datetime_util.datetime_from_ISO_string,
+            datetimes[3:]
+        ),
+        (
+            'date, strptime',
+            lambda s: datetime_util.datetime.datetime.strptime(
+                s,
+                '%Y-%m-%d'
+            ).date(),
+            datetimes[1:2]
+        ),
+        (
+            'date, one pass',
+            datetime_util.date_from_ISO_string,
+            datetimes[1:2]
+        ),
+        (
+            'timedelta, splitting',
+            datetime_util._str_to_timedelta_by_splitting,
+            timedeltas
+        ),
+        (
+            'timedelta, split once',
+            datetime_util.str_to_timedelta,
+            timedeltas
+        ),
+    ):
+        def convert_all():
+            for a_string in strings:
+                a_function(a_string)
+        report(
+            '%d x %d %s' % (number, len(strings), a_name),
+            best_time(convert_all, number=number)
+        )
+
+
+if __name__ == '__main__':
+    main()
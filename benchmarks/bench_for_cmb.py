@@ -0,0 +1,59 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""load time of a cmb file, and of the same table as a conf and a json file,
+followed by the lookup of a hundred keys"""
+
+import json
+import os
+import tempfile
+
+from benchutil import best_time, report
+
+from configman.value_sources import for_cmb, for_conf, for_json
+from configman.value_sources.parse_cache import parse_cache
+
+
+#------------------------------------------------------------------------------
+def main():
+    for number_of_keys in (10000, 100000):
+        items = [
+            ('namespace%d.key%d' % (i % 50, i), 'value %d' % i)
+            for i in xrange(number_of_keys)
+        ]
+        keys = [key for key, value in items[::number_of_keys // 100]]
+        base_name = os.path.join(
+            tempfile.gettempdir(),
+            'bench_%d' % number_of_keys
+        )
+        with open(base_name + '.cmb', 'wb') as f:
+            for_cmb.write_cmb(items, f)
+        with open(base_name + '.conf', 'w') as f:
+            for key, value in items:
+                f.write('%s=%s\n' % (key, value))
+        with open(base_name + '.json', 'w') as f:
+            json.dump(dict(items), f)
+        try:
+            for a_module in (for_cmb, for_conf, for_json):
+                def load_and_look_up():
+                    parse_cache.clear()
+                    values = a_module.ValueSource(
+                        '%s.%s' % (base_name, a_module.file_name_extension)
+                    ).get_values(None, True)
+                    for key in keys:
+                        values[key]
+                report(
+                    '%d keys, %s' % (
+                        number_of_keys,
+                        a_module.file_name_extension
+                    ),
+                    best_time(load_and_look_up, repeat=3)
+                )
+        finally:
+            for extension in ('cmb', 'conf', 'json'):
+                os.remove('%s.%s' % (base_name, extension))
+
+
+if __name__ == '__main__':
+    main()
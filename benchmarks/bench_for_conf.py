@@ -0,0 +1,53 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""parse time and peak memory of the .conf value source with the buffered
+and the mmap readers"""
+
+import os
+import tempfile
+
+from benchutil import best_time, peak_memory_in_kb, report
+
+from configman.value_sources import for_conf
+
+
+#------------------------------------------------------------------------------
+def write_conf_file(file_name, number_of_lines, continuation_every=10):
+    with open(file_name, 'w') as f:
+        for i in xrange(number_of_lines):
+            if i % continuation_every:
+                f.write('namespace%d.key%d=value %d\n' % (i % 50, i, i))
+            else:
+                f.write('# a comment\n')
+                f.write('folded%d=start\n' % i)
+                for j in range(20):
+                    f.write('  more text %d\n' % j)
+
+
+#------------------------------------------------------------------------------
+def main():
+    for number_of_lines in (10000, 100000):
+        file_name = os.path.join(
+            tempfile.gettempdir(),
+            'bench_%d.conf' % number_of_lines
+        )
+        write_conf_file(file_name, number_of_lines)
+        try:
+            for use_mmap in (False, True):
+                load = lambda: for_conf.ValueSource(
+                    file_name,
+                    use_mmap=use_mmap
+                )
+                report(
+                    '%d lines, mmap=%s' % (number_of_lines, use_mmap),
+                    best_time(load, repeat=3),
+                    peak_memory_in_kb(load)
+                )
+        finally:
+            os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
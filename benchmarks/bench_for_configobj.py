@@ -0,0 +1,50 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""parse time of a 10k key ini file with ConfigObj and with the native
+ini reader"""
+
+import os
+import tempfile
+
+from benchutil import best_time, report
+
+from configman.value_sources import for_configobj
+
+
+#------------------------------------------------------------------------------
+def write_ini_file(file_name, number_of_keys, keys_per_section=100):
+    with open(file_name, 'w') as f:
+        for i in xrange(number_of_keys):
+            if not i % keys_per_section:
+                f.write('[section%d]\n' % (i / keys_per_section))
+                f.write('    # the sub section\n')
+                f.write('    [[sub]]\n')
+            f.write('        # the doc string for key%d\n' % i)
+            if i % 3:
+                f.write('        key%d=value %d\n' % (i, i))
+            else:
+                f.write('        key%d="a, quoted, list"\n' % i)
+
+
+#------------------------------------------------------------------------------
+def main():
+    file_name = os.path.join(tempfile.gettempdir(), 'bench_10k.ini')
+    write_ini_file(file_name, 10000)
+    try:
+        configobj_time = best_time(
+            lambda: for_configobj.ValueSource._parse_file(file_name)
+        )
+        native_time = best_time(
+            lambda: for_configobj.ValueSource._parse_file_natively(file_name)
+        )
+        report('10k keys, ConfigObj', configobj_time)
+        report('10k keys, native', native_time)
+        print 'speed up: %.1fx' % (configobj_time / native_time)
+    finally:
+        os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of the output of the help option for a configuration of many
+options: all of them, with the index made anew or already made, and the
+options of one namespace or those that match a glob"""
+
+from cStringIO import StringIO
+
+from benchutil import best_time, report
+
+from configman.config_manager import ConfigurationManager
+from configman.namespace import Namespace
+
+
+#------------------------------------------------------------------------------
+def make_definitions(number_of_namespaces):
+    n = Namespace()
+    for i in xrange(number_of_namespaces):
+        n.namespace('worker%d' % i)
+        a_namespace = n['worker%d' % i]
+        for j in xrange(8):
+            a_namespace.add_option('option%d' % j, default=j, doc='an int')
+        a_namespace.add_option('port', default=5432, doc='a port')
+        a_namespace.add_option('password', default='xyzzy', secret=True)
+    return n
+
+
+#------------------------------------------------------------------------------
+def output_help(config_manager, help_topic=None, fresh_index=False):
+    if fresh_index:
+        config_manager._help_index = None
+    config_manager.output_summary(StringIO(), help_topic=help_topic)
+
+
+#------------------------------------------------------------------------------
+def main():
+    number_of_namespaces = 3000
+    config_manager = ConfigurationManager(
+        [make_definitions(number_of_namespaces)],
+        values_source_list=[],
+        argv_source=[],
+        use_auto_help=False
+    )
+    number_of_options = number_of_namespaces * 10
+
+    report(
+        'help, %d options, new index' % number_of_options,
+        best_time(lambda: output_help(config_manager, fresh_index=True))
+    )
+    report(
+        'help, %d options' % number_of_options,
+        best_time(lambda: output_help(config_manager))
+    )
+    report(
+        'help=worker17, %d options' % number_of_options,
+        best_time(lambda: output_help(config_manager, 'worker17'))
+    )
+    report(
+        'help=*.port, %d options' % number_of_options,
+        best_time(lambda: output_help(config_manager, '*.port'))
+    )
+
+
+if __name__ == '__main__':
+    main()
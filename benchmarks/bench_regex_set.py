@@ -0,0 +1,78 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of matching request paths against a list of skip patterns, one
+compiled pattern at a time in a loop and all at once through a RegexSet, and
+the time of compiling the RegexSet"""
+
+import re
+
+from benchutil import best_time, report
+
+from configman import converters
+
+patterns = [r'^/static/%s/' % a_name for a_name in (
+    'css', 'js', 'img', 'fonts', 'media', 'vendor', 'docs', 'downloads'
+)] + [
+    r'^/api/v\d+/health$',
+    r'^/api/v\d+/metrics$',
+    r'^/favicon\.ico$',
+    r'^/robots\.txt$',
+    r'\.(png|jpe?g|gif|svg)$',
+    r'^/(en|fr|de)/about/?$',
+] + [r'^/legacy/app%d/' % i for i in range(30)]
+
+paths = [
+    '/api/v2/items/17',
+    '/static/js/app.js',
+    '/fr/about',
+    '/legacy/app29/index',
+    '/users/42/avatar.png',
+    '/search?q=configman',
+]
+
+
+#------------------------------------------------------------------------------
+def main():
+    number = 10000
+    compiled_patterns = [re.compile(a_pattern) for a_pattern in patterns]
+
+    def match_in_a_loop():
+        for a_path in paths:
+            for a_pattern in compiled_patterns:
+                if a_pattern.search(a_path):
+                    break
+
+    a_regex_set = converters.RegexSet(patterns)
+
+    def match_with_a_regex_set():
+        for a_path in paths:
+            a_regex_set.search(a_path)
+
+    report(
+        '%d x %d paths, %d patterns in a loop' % (
+            number,
+            len(paths),
+            len(patterns)
+        ),
+        best_time(match_in_a_loop, number=number)
+    )
+    report(
+        '%d x %d paths, a RegexSet' % (number, len(paths)),
+        best_time(match_with_a_regex_set, number=number)
+    )
+
+    def compile_a_regex_set():
+        # the re module keeps its own cache of compiled patterns
+        re.purge()
+        converters.RegexSet(patterns)
+
+    report(
+        'compiling a RegexSet of %d patterns' % len(patterns),
+        best_time(compile_a_regex_set)
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time and peak memory of reading every key of a large value source through
+a DotDict copy and through a read-only view"""
+
+from benchutil import best_time, peak_memory_in_kb, report
+
+from configman.dotdict import DotDict, DotDictWithAcquisition
+
+
+#------------------------------------------------------------------------------
+def make_flat_mapping(number_of_keys):
+    return dict(
+        ('namespace%d.sub%d.key%d' % (i % 100, i % 7, i), str(i))
+        for i in xrange(number_of_keys)
+    )
+
+
+#------------------------------------------------------------------------------
+def main():
+    number_of_keys = 50000
+    flat = make_flat_mapping(number_of_keys)
+    keys = list(flat)
+    for obj_hook in (DotDict, DotDictWithAcquisition):
+        for label, make in (
+            ('copy', lambda: obj_hook(initializer=flat)),
+            ('view', lambda: obj_hook.view(flat)),
+        ):
+            def read_all():
+                values = make()
+                for key in keys:
+                    values[key]
+            report(
+                '%d keys, %s %s' % (number_of_keys, obj_hook.__name__, label),
+                best_time(read_all, repeat=3),
+                peak_memory_in_kb(read_all)
+            )
+
+
+if __name__ == '__main__':
+    main()
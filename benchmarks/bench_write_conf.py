@@ -0,0 +1,77 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of writing an ini file of a configuration of many namespaces through
+ConfigurationManager.write_conf, against making the full copy of the option
+definitions that write_conf used to make before writing"""
+
+import contextlib
+from cStringIO import StringIO
+
+from benchutil import best_time, report
+
+from configman.config_manager import ConfigurationManager
+from configman.namespace import Namespace
+from configman.value_sources import dispatch_request_to_write
+
+
+#------------------------------------------------------------------------------
+def make_definitions(number_of_namespaces):
+    n = Namespace()
+    for i in xrange(number_of_namespaces):
+        n.namespace('worker%d' % i)
+        a_namespace = n['worker%d' % i]
+        for j in xrange(8):
+            a_namespace.add_option('option%d' % j, default=j, doc='an int')
+        a_namespace.add_option('password', default='xyzzy', secret=True)
+    return n
+
+
+#------------------------------------------------------------------------------
+def copy_and_write(config_manager, opener):
+    """what write_conf did before it wrote through a FilteredNamespace"""
+    option_defs = config_manager.option_definitions.safe_copy()
+    for a_blocked_key in config_manager.admin_controls_list:
+        try:
+            del option_defs[a_blocked_key]
+        except (AttributeError, KeyError):
+            pass
+    for key in list(option_defs.keys_breadth_first(include_dicts=True)):
+        candidate = option_defs[key]
+        if isinstance(candidate, Namespace) and not len(candidate):
+            del option_defs[key]
+    for a_key in option_defs.keys_breadth_first():
+        an_option = option_defs[a_key]
+        if not a_key.startswith('admin') and getattr(an_option, 'secret'):
+            an_option.value = '*' * 16
+            an_option.from_string_converter = str
+    dispatch_request_to_write('ini', option_defs, opener)
+
+
+#------------------------------------------------------------------------------
+def main():
+    number_of_namespaces = 1000
+    config_manager = ConfigurationManager(
+        [make_definitions(number_of_namespaces)],
+        values_source_list=[],
+        argv_source=[],
+        use_auto_help=False
+    )
+
+    @contextlib.contextmanager
+    def opener():
+        yield StringIO()
+
+    report(
+        'ini, %d namespaces, copied' % number_of_namespaces,
+        best_time(lambda: copy_and_write(config_manager, opener))
+    )
+    report(
+        'ini, %d namespaces, filtered' % number_of_namespaces,
+        best_time(lambda: config_manager.write_conf('ini', opener))
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""time of writing a configuration of 30000 options in each of the text file
+formats to an unbuffered stream, as when dumping a config to a pipe"""
+
+import os
+
+from benchutil import best_time, report
+
+from configman.namespace import Namespace
+from configman.value_sources import (
+    for_conf,
+    for_configobj,
+    for_json,
+    for_modules,
+)
+
+
+#------------------------------------------------------------------------------
+def make_definitions(number_of_namespaces, options_per_namespace):
+    n = Namespace()
+    for i in xrange(number_of_namespaces):
+        n.namespace('worker%d' % i, doc='worker %d' % i)
+        a_namespace = n['worker%d' % i]
+        for j in xrange(options_per_namespace):
+            a_namespace.add_option(
+                'option%d' % j,
+                default='value %d, %d' % (i, j) if j % 2 else j,
+                doc='option %d' % j
+            )
+    return n
+
+
+#------------------------------------------------------------------------------
+def main():
+    number_of_namespaces = 3000
+    options_per_namespace = 10
+    definitions = make_definitions(number_of_namespaces, options_per_namespace)
+    with open(os.devnull, 'w', 0) as output_stream:
+        for name, a_handler in (
+            ('conf', for_conf),
+            ('ini', for_configobj),
+            ('json', for_json),
+            ('py', for_modules),
+        ):
+            report(
+                '%s, %d options' % (
+                    name,
+                    number_of_namespaces * options_per_namespace
+                ),
+                best_time(
+                    lambda: a_handler.ValueSource.write(
+                        definitions,
+                        output_stream=output_stream
+                    ),
+                    repeat=3
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
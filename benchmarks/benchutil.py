@@ -0,0 +1,57 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""a few helpers shared by the benchmark scripts in this directory.  The
+benchmarks are not tests, they are run by hand:
+
+    $ python benchmarks/bench_for_conf.py
+"""
+
+import os
+import sys
+import time
+
+# make the configman in this source tree importable without installing it
+sys.path.insert(
+    0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+#------------------------------------------------------------------------------
+def best_time(fn, repeat=5, number=1):
+    """return the best wall clock time in seconds of 'repeat' trials of
+    calling 'fn' 'number' times"""
+    best = None
+    for x in range(repeat):
+        start = time.time()
+        for y in xrange(number):
+            fn()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+#------------------------------------------------------------------------------
+def peak_memory_in_kb(fn):
+    """run 'fn' in a forked child process and return the maximum resident set
+    size that the child reached.  Forking isolates the measurement from the
+    memory already held by this process."""
+    pid = os.fork()
+    if not pid:
+        try:
+            fn()
+        finally:
+            os._exit(0)
+    pid, status, rusage = os.wait4(pid, 0)
+    return rusage.ru_maxrss
+
+
+#------------------------------------------------------------------------------
+def report(label, seconds, peak_kb=None):
+    if peak_kb is None:
+        print '%-40s %10.4fs' % (label, seconds)
+    else:
+        print '%-40s %10.4fs %10dKB' % (label, seconds, peak_kb)
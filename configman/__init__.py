@@ -17,6 +17,7 @@ from configman.config_manager import ConfigurationManager
 from configman.required_config import RequiredConfig
 from configman.namespace import Namespace
 from configman.config_file_future_proxy import ConfigFileFutureProxy
+from configman.value_sources import SourceWithOptions
 from configman.converters import (
     class_converter,
     regex_converter,
@@ -16,27 +16,40 @@ import warnings
 # import these symbols from here rather than their origin definition location.
 # PyFlakes may erroneously flag some of these as unused
 from configman.command_line import command_line
-from configman.converters import to_string_converters
+from configman.converters import (
+    to_string_converters,
+    to_help_string_converters,
+    str_to_help_topic
+)
 from configman.config_exceptions import NotAnOptionError
 from configman.config_file_future_proxy import ConfigFileFutureProxy
 from configman.def_sources import setup_definitions
 from configman.dotdict import (
     DotDict,
     DotDictWithAcquisition,
-    iteritems_breadth_first
+    iteritems_breadth_first,
+    create_deferring_dot_dict
 )
 from configman.environment import environment
-from configman.namespace import Namespace
+from configman.help_index import HelpIndex
+from configman.namespace import Namespace, FilteredNamespace
 from configman.option import (
     Option,
-    Aggregation
+    Aggregation,
+    _differs
 )
 # The following is not used directly in this file, but made available as
 # a type to be imported from this module
 from configman.required_config import RequiredConfig
+from configman.requirements_manifest import (
+    load_manifest,
+    is_class_option,
+    recorded_class_path
+)
 from configman.value_sources import (
     config_filename_from_commandline,
     wrap_with_value_source_api,
+    unwrap_source,
     dispatch_request_to_write,
     file_extension_dispatch,
 )
@@ -62,6 +75,8 @@ class ConfigurationManager(object):
         config_pathname='.',
         config_optional=True,
         value_source_object_hook=DotDict,
+        value_source_executor=None,
+        requirements_manifest=None,
     ):
         """create and initialize a configman object.
 
@@ -109,6 +124,16 @@ class ConfigurationManager(object):
                                      representation of a value source.
                                      This is used to enable any special
                                      processing, like key translations.
+          value_source_executor - optional, an executor, like those of
+                                  'concurrent.futures', with which the
+                                  value sources are read concurrently.
+                                  Their precedence is unchanged.
+          requirements_manifest - optional, a RequirementsManifest or the
+                                  name of a manifest file.  The options of
+                                  the classes that it records are taken
+                                  from it, so the modules of those classes
+                                  aren't imported until the values of their
+                                  class options are looked up in the config.
                             """
 
         # instead of allowing mutables as default keyword argument values...
@@ -134,6 +159,10 @@ class ConfigurationManager(object):
         self.config_optional = config_optional
 
         self.value_source_object_hook = value_source_object_hook
+        self.value_source_executor = value_source_executor
+        if isinstance(requirements_manifest, basestring):
+            requirements_manifest = load_manifest(requirements_manifest)
+        self.requirements_manifest = requirements_manifest
 
         self.app_name = app_name
         self.app_version = app_version
@@ -143,6 +172,7 @@ class ConfigurationManager(object):
                         # will be stored here.
 
         self._config = None  # eventual container for DOM-like config object
+        self._help_index = None  # made on the first use of the help
 
         self.option_definitions = Namespace()
         self.definition_source_list = definition_source_list
@@ -195,7 +225,8 @@ class ConfigurationManager(object):
                 safe_copy_of_def_source = a_definition_source
             setup_definitions(
                 safe_copy_of_def_source,
-                self.option_definitions
+                self.option_definitions,
+                self.requirements_manifest
             )
 
         if use_admin_controls:
@@ -204,13 +235,14 @@ class ConfigurationManager(object):
             config_filename = config_filename_from_commandline(self)
             if (
                 config_filename
-                and ConfigFileFutureProxy in values_source_list
+                and self._uses_config_file(values_source_list)
             ):
                 self.option_definitions.admin.conf.default = config_filename
 
         self.values_source_list = wrap_with_value_source_api(
             values_source_list,
-            self
+            self,
+            executor=self.value_source_executor
         )
 
         known_keys = self._overlay_expand()
@@ -222,6 +254,7 @@ class ConfigurationManager(object):
         # if those are empty, set app_name, et al, to empty strings
         try:
             app_option = self._get_option('application')
+            self._resolve_deferred(app_option)
             self.app_name = getattr(app_option.value, 'app_name', '')
             self.app_version = getattr(app_option.value, 'app_version', '')
             self.app_description = getattr(
@@ -235,7 +268,12 @@ class ConfigurationManager(object):
             pass
 
         if use_auto_help and self._get_option('help').value:
-            self.output_summary()
+            help_topic = self._get_option('help').value
+            if isinstance(help_topic, basestring):
+                self.output_summary(help_topic=help_topic)
+            else:
+                # overrides of output_summary may not take a topic
+                self.output_summary()
             admin_tasks_done = True
 
         if use_admin_controls and self._get_option('admin.print_conf').value:
@@ -272,60 +310,82 @@ class ConfigurationManager(object):
             return config
 
     #--------------------------------------------------------------------------
-    def output_summary(self, output_stream=sys.stdout):
+    def output_summary(self, output_stream=sys.stdout, help_topic=None):
         """outputs a usage tip and the list of acceptable commands.
         This is useful as the output of the 'help' option.
 
         parameters:
             output_stream - an open file-like object suitable for use as the
                             target of a print statement
+            help_topic - the name of a namespace or an option, or a glob of
+                         option names, to limit the list of options to.  All
+                         of them are listed if it is None.
         """
-        if self.app_name or self.app_description:
-            print >> output_stream, 'Application:',
-        if self.app_name:
-            print >> output_stream, self.app_name, self.app_version
-        if self.app_description:
-            print >> output_stream, self.app_description
-        if self.app_name or self.app_description:
-            print >> output_stream, ''
-
-        names_list = self.get_option_names()
-        print >> output_stream, \
-            "usage:\n%s [OPTIONS]... " % self.app_invocation_name,
+        output_stream.write(''.join(self._emit_summary(help_topic)))
+
+    #--------------------------------------------------------------------------
+    def _emit_summary(self, help_topic=None):
+        """a generator of the chunks of text of the output_summary"""
+        if self.app_name and self.app_description:
+            yield 'Application: %s %s\n%s\n\n' % (
+                self.app_name,
+                self.app_version,
+                self.app_description
+            )
+        elif self.app_name:
+            yield 'Application: %s %s\n\n' % (
+                self.app_name,
+                self.app_version
+            )
+        elif self.app_description:
+            yield 'Application: %s\n\n' % self.app_description
+
+        help_index = self._get_help_index()
+        yield "usage:\n%s [OPTIONS]... " % self.app_invocation_name
         bracket_count = 0
         # this section prints the non-switch command line arguments
-        for key in names_list:
-            an_option = self.option_definitions[key]
-            if an_option.is_argument:
-                if an_option.default is None:
-                    # there's no option, assume the user must set this
-                    print >> output_stream, an_option.name,
-                elif (inspect.isclass(an_option.value)
-                      or inspect.ismodule(an_option.value)
-                ):
-                    # this is already set and it could have expanded, most
-                    # likely this is a case where a sub-command has been
-                    # loaded and we're looking to show the help for it.
-                    # display show it as a constant already provided rather
-                    # than as an option the user must provide
-                    print >> output_stream, an_option.default,
-                else:
-                    # this is an argument that the user may alternatively
-                    # provide
-                    print >> output_stream, "[ %s" % an_option.name,
-                    bracket_count += 1
-        print >> output_stream, ']' * bracket_count, '\n'
-
-        names_list.sort()
-        if names_list:
-            print >> output_stream, 'OPTIONS:'
+        for an_option in help_index.arguments:
+            if an_option.default is None:
+                # there's no option, assume the user must set this
+                yield ' %s' % an_option.name
+            elif (inspect.isclass(an_option.value)
+                  or inspect.ismodule(an_option.value)
+                  or self._is_deferred(an_option)
+            ):
+                # this is already set and it could have expanded, most
+                # likely this is a case where a sub-command has been
+                # loaded and we're looking to show the help for it.
+                # display show it as a constant already provided rather
+                # than as an option the user must provide
+                yield ' %s' % an_option.default
+            else:
+                # this is an argument that the user may alternatively
+                # provide
+                yield ' [ %s' % an_option.name
+                bracket_count += 1
+        yield ' %s \n\n' % (']' * bracket_count)
+
+        entries = help_index.select(help_topic)
+        if entries:
+            yield 'OPTIONS:\n'
+        elif help_topic:
+            yield 'no options match: %s\n' % help_topic
 
+        try:
+            expose_secrets = (
+                self.option_definitions.admin.expose_secrets.default
+            )
+        except KeyError:
+            # there are no admin controls to expose them
+            expose_secrets = False
         pad = ' ' * 4
+        banned_from_help = set(self.options_banned_from_help)
 
-        for name in names_list:
-            if name in self.options_banned_from_help:
+        for an_entry in entries:
+            name = an_entry.name
+            if name in banned_from_help:
                 continue
-            option = self._get_option(name)
+            option = an_entry.option
 
             line = ' ' * 2  # always start with 2 spaces
             if option.short_form:
@@ -339,19 +399,31 @@ class ConfigurationManager(object):
             try:
                 value = option.value
                 type_of_value = type(value)
-                converter_function = to_string_converters[type_of_value]
+                if type_of_value in to_help_string_converters:
+                    converter_function = to_help_string_converters[
+                        type_of_value
+                    ]
+                else:
+                    converter_function = to_string_converters[type_of_value]
                 default = converter_function(value)
             except KeyError:
                 default = option.value
             if default is not None:
-                if ((option.secret or 'password' in name.lower())
-                    and not self.option_definitions.admin.expose_secrets.default):
+                if an_entry.is_secret and not expose_secrets:
                     default = '*********'
                 if name not in ('help',):
                     # don't bother with certain dead obvious ones
                     line += '%s(default: %s)\n' % (pad, default)
 
-            print >> output_stream, line
+            yield line + '\n'
+
+    #--------------------------------------------------------------------------
+    def _get_help_index(self):
+        """return the HelpIndex of the option definitions, making it the
+        first time that it is needed"""
+        if self._help_index is None:
+            self._help_index = HelpIndex(self.option_definitions)
+        return self._help_index
 
     #--------------------------------------------------------------------------
     def print_conf(self):
@@ -389,8 +461,11 @@ class ConfigurationManager(object):
         if not config_pathname:
             config_pathname = self._get_option('admin.dump_conf').value
 
-        opener = functools.partial(open, config_pathname, 'w')
         config_file_type = os.path.splitext(config_pathname)[1][1:]
+        if file_extension_dispatch.is_binary(config_file_type):
+            opener = functools.partial(open, config_pathname, 'wb')
+        else:
+            opener = functools.partial(open, config_pathname, 'w')
 
         skip_keys = [
             k for (k, v)
@@ -412,39 +487,20 @@ class ConfigurationManager(object):
             opener - a callable object or function that returns a file like
                      object that works as a context in a with statement."""
 
-        blocked_keys = self.admin_controls_list
+        blocked_keys = set(self.admin_controls_list)
         if skip_keys:
-            blocked_keys.extend(skip_keys)
+            blocked_keys.update(skip_keys)
 
-        if blocked_keys:
-            option_defs = self.option_definitions.safe_copy()
-            for a_blocked_key in blocked_keys:
-                try:
-                    del option_defs[a_blocked_key]
-                except (AttributeError, KeyError):
-                    # okay that key isn't here
-                    pass
-            # remove empty namespaces
-            all_keys = [k for k in
-                        option_defs.keys_breadth_first(include_dicts=True)]
-            for key in all_keys:
-                candidate = option_defs[key]
-                if (isinstance(candidate, Namespace) and not len(candidate)):
-                    del option_defs[key]
-        else:
-            option_defs = self.option_definitions
-
-        # find all of the secret options and overwrite their values with '*' * 16
-        if not self.option_definitions.admin.expose_secrets.default:
-            for a_key in option_defs.keys_breadth_first():
-                an_option = option_defs[a_key]
-                if ((not a_key.startswith('admin'))
-                    and isinstance(an_option, Option)
-                    and an_option.secret
-                ):
-                    # force the option to be a string of *
-                    option_defs[a_key].value = '*' * 16
-                    option_defs[a_key].from_string_converter = str
+        # rather than a copy with the blocked keys deleted and the secrets
+        # overwritten with '*' * 16, the writer is given a view that leaves
+        # them out as it goes
+        option_defs = FilteredNamespace(
+            self.option_definitions,
+            blocked_keys,
+            mask_secrets=(
+                not self.option_definitions.admin.expose_secrets.default
+            )
+        )
 
         dispatch_request_to_write(config_file_type, option_defs, opener)
 
@@ -485,8 +541,11 @@ class ConfigurationManager(object):
             list.  Each item will be fully qualified with dot delimited
             Namespace names.
         """
-        return [x for x in self.option_definitions.keys_breadth_first()
-                if isinstance(self.option_definitions[x], Option)]
+        return [
+            key
+            for key, value in iteritems_breadth_first(self.option_definitions)
+            if isinstance(value, Option)
+        ]
 
     #--------------------------------------------------------------------------
     def _create_reference_value_from_links(self, keys, known_keys):
@@ -605,7 +664,10 @@ class ConfigurationManager(object):
                         # the value source.  This assignment may come
                         # via acquisition, so the key given may not have
                         # been an exact match for what was returned.
-                        opt.has_changed = opt.default != val_src_dict[key]
+                        opt.has_changed = _differs(
+                            opt.default,
+                            val_src_dict[key]
+                        )
                         opt.default = val_src_dict[key]
                         if key in all_reference_values:
                             # make sure that this value gets propagated to keys
@@ -623,16 +685,21 @@ class ConfigurationManager(object):
                 an_option = self.option_definitions[key]
                 #if not isinstance(an_option, Option):
                 #    continue  # aggregations, namespaces are ignored
-                # apply the from string conversion to make the real value
-                an_option.set_value(an_option.default)
+                # a class recorded in the requirements manifest is left
+                # unresolved, its requirements come from the manifest
+                new_req = self._requirements_from_manifest(an_option)
+                if new_req is None:
+                    # apply the from string conversion to make the real value
+                    an_option.set_value(an_option.default)
                 # new values have been seen, don't let loop break
                 new_keys_discovered = True
                 try:
-                    try:
-                        # try to fetch new requirements from this value
-                        new_req = an_option.value.get_required_config()
-                    except AttributeError:
-                        new_req = an_option.value.required_config
+                    if new_req is None:
+                        try:
+                            # try to fetch new requirements from this value
+                            new_req = an_option.value.get_required_config()
+                        except AttributeError:
+                            new_req = an_option.value.required_config
                     # make sure what we got as new_req is actually a
                     # Mapping of some sort
                     if not isinstance(new_req, collections.Mapping):
@@ -701,10 +768,12 @@ class ConfigurationManager(object):
                 allow_mismatches,
                 self.value_source_object_hook
             )
-            value_source_keys_set = set([
-                k for k in
-                DotDict(value_source_mapping).keys_breadth_first()
-            ])
+            try:
+                keys_breadth_first = value_source_mapping.keys_breadth_first
+            except AttributeError:
+                keys_breadth_first = \
+                    DotDict(value_source_mapping).keys_breadth_first
+            value_source_keys_set = set(keys_breadth_first())
             # make a set of the keys that didn't match any of the known
             # keys in the requirements
             unmatched_keys = value_source_keys_set.difference(known_keys)
@@ -749,6 +818,13 @@ class ConfigurationManager(object):
     #--------------------------------------------------------------------------
     def _generate_config(self, mapping_class):
         """This routine generates a copy of the DotDict based config"""
+        if self.requirements_manifest is not None and issubclass(
+            mapping_class,
+            DotDict
+        ):
+            # the classes left unresolved by the manifest are imported when
+            # their keys are first looked up
+            mapping_class = create_deferring_dot_dict(mapping_class)
         config = mapping_class()
         self._walk_config_copy_values(
             self.option_definitions,
@@ -759,7 +835,13 @@ class ConfigurationManager(object):
 
     #--------------------------------------------------------------------------
     def _setup_auto_help(self):
-        help_option = Option(name='help', doc='print this', default=False)
+        help_option = Option(
+            name='help',
+            doc='print this, or just the options of a namespace or that '
+                'match a glob, as in --help=db or --help=*.port',
+            default=False,
+            from_string_converter=str_to_help_topic
+        )
         self.definition_source_list.append({'help': help_option})
 
     #--------------------------------------------------------------------------
@@ -779,6 +861,16 @@ class ConfigurationManager(object):
                 return None
         return self.config_pathname
 
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _uses_config_file(values_source_list):
+        """True if the config file is among the value sources, with or
+        without options for its ValueSource"""
+        return any(
+            unwrap_source(a_source)[0] is ConfigFileFutureProxy
+            for a_source in values_source_list
+        )
+
     #--------------------------------------------------------------------------
     def _setup_admin_options(self, values_source_list):
         base_namespace = Namespace()
@@ -807,7 +899,7 @@ class ConfigurationManager(object):
         )
         # only offer the config file admin options if they've been requested in
         # the values source list
-        if ConfigFileFutureProxy in values_source_list:
+        if self._uses_config_file(values_source_list):
             default_config_pathname = self._get_config_pathname()
             admin.add_option(
                 name='conf',
@@ -820,12 +912,54 @@ class ConfigurationManager(object):
     def _walk_config_copy_values(self, source, destination, mapping_class):
         for key, val in source.items():
             value_type = type(val)
-            if isinstance(val, Option) or isinstance(val, Aggregation):
+            if self._is_deferred(val):
+                resolve = functools.partial(
+                    val.from_string_converter,
+                    val.value
+                )
+                try:
+                    destination.defer(key, resolve)
+                except AttributeError:
+                    # this mapping class can't defer values
+                    destination[key] = resolve()
+            elif isinstance(val, Option) or isinstance(val, Aggregation):
                 destination[key] = val.value
             elif value_type == Namespace:
                 destination[key] = d = mapping_class()
                 self._walk_config_copy_values(val, d, mapping_class)
 
+    #--------------------------------------------------------------------------
+    def _requirements_from_manifest(self, an_option):
+        """if the class named by the default of a class option is in the
+        requirements manifest, leave the option's value as the class path
+        and return the Namespace of options that the class contributes.
+        Otherwise return None."""
+        class_path = recorded_class_path(
+            an_option,
+            self.requirements_manifest
+        )
+        if class_path is None:
+            return None
+        new_req = self.requirements_manifest[class_path]
+        an_option.has_changed = an_option.value != class_path
+        an_option.value = class_path
+        return new_req
+
+    #--------------------------------------------------------------------------
+    def _is_deferred(self, an_option):
+        """True if the value of an option is a class path left unresolved
+        because of the requirements manifest"""
+        return (
+            self.requirements_manifest is not None
+            and is_class_option(an_option)
+            and isinstance(an_option.value, basestring)
+        )
+
+    #--------------------------------------------------------------------------
+    def _resolve_deferred(self, an_option):
+        if self._is_deferred(an_option):
+            an_option.set_value(an_option.value)
+
     #--------------------------------------------------------------------------
     def _aggregate(self, source, base_namespace, local_namespace):
         aggregates_found = False
@@ -7,6 +7,11 @@ import re
 import datetime
 import types
 import json
+import array
+import bisect
+import os
+import threading
+import time
 
 from configman.datetime_util import (
     datetime_from_ISO_string,
@@ -21,6 +26,7 @@ datetime_converter = datetime_from_ISO_string
 date_converter = date_from_ISO_string
 
 from configman.config_exceptions import CannotConvertError
+from configman.memoize import memoize
 
 import datetime_util
 
@@ -87,6 +93,145 @@ def str_quote_stripper(input_str):
     return input_str
 
 
+#------------------------------------------------------------------------------
+# the number of results that the cache of each pure converter keeps
+default_converter_cache_size = 256
+
+
+#==============================================================================
+class ConverterCache(object):
+    """a bounded cache of the results of a pure from string converter, one
+    whose result depends on nothing but its input string.  When the cache is
+    full, a result not used since the last pass of the 'clock' over the
+    entries is dropped, approximating least recently used order, at the cost
+    of no more than setting a flag on each hit.  Only immutable results are
+    kept, as they are shared by all the options that convert the same string.
+    A mutable result, like the dict of json.loads, is made anew for each
+    conversion."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, converter, max_cache_size=default_converter_cache_size):
+        self.converter = converter
+        self.max_cache_size = max_cache_size
+        self._lock = threading.Lock()
+        self.clear()
+
+    #--------------------------------------------------------------------------
+    def __call__(self, input_str):
+        # 'abc' and u'abc' are equal, but a converter may treat them apart
+        key = (type(input_str), input_str)
+        # a dict lookup is atomic, the lock is only needed to change the
+        # cache
+        entry = self._cache.get(key)
+        if entry is not None:
+            # [result, used since the clock last passed]
+            entry[1] = True
+            self.hits += 1
+            return entry[0]
+        result = self.converter(input_str)
+        with self._lock:
+            if not is_immutable(result):
+                self.uncacheable += 1
+                return result
+            self.misses += 1
+            if key in self._cache:
+                # converted by another thread meanwhile
+                return result
+            if len(self._keys) < self.max_cache_size:
+                self._keys.append(key)
+            else:
+                self._keys[self._evict()] = key
+            self._cache[key] = [result, False]
+        return result
+
+    #--------------------------------------------------------------------------
+    def _evict(self):
+        """advance the clock to the first entry not used since it last
+        passed, drop the entry and return its place"""
+        while True:
+            hand = self._hand
+            self._hand = (hand + 1) % len(self._keys)
+            entry = self._cache[self._keys[hand]]
+            if entry[1]:
+                entry[1] = False
+            else:
+                del self._cache[self._keys[hand]]
+                return hand
+
+    #--------------------------------------------------------------------------
+    def statistics(self):
+        """return a dict of the hit, miss and uncacheable counts, the hit
+        rate and the number of entries currently in the cache.  The counts
+        of hits may be a little short if many threads convert at once."""
+        conversions = self.hits + self.misses + self.uncacheable
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'uncacheable': self.uncacheable,
+            'hit_rate': float(self.hits) / conversions if conversions else 0.0,
+            'entries': len(self._cache),
+        }
+
+    #--------------------------------------------------------------------------
+    def clear(self):
+        """empty the cache and reset the statistics"""
+        with self._lock:
+            self._cache = {}
+            self._keys = []
+            self._hand = 0
+            self.hits = 0
+            self.misses = 0
+            self.uncacheable = 0
+
+
+# the caches of the converters that have been registered as pure
+_converter_caches = {}
+
+
+#------------------------------------------------------------------------------
+def register_pure_converter(
+    a_converter,
+    max_cache_size=default_converter_cache_size
+):
+    """mark a from string converter as pure, so that the Options using it
+    cache its results.  Returns the converter itself, so it can be used as a
+    decorator."""
+    _converter_caches[a_converter] = ConverterCache(
+        a_converter,
+        max_cache_size
+    )
+    return a_converter
+
+
+#------------------------------------------------------------------------------
+def convert_from_string(a_converter, input_str):
+    """convert a string with a converter, through its cache if it has been
+    registered as pure"""
+    try:
+        a_cache = _converter_caches[a_converter]
+    except (KeyError, TypeError):
+        # TypeError - an unhashable converter, like a bound method of an
+        # unhashable object
+        return a_converter(input_str)
+    return a_cache(input_str)
+
+
+#------------------------------------------------------------------------------
+def converter_cache_statistics():
+    """return a dict of the statistics of the cache of each pure converter,
+    keyed by the name of the converter"""
+    return dict(
+        (to_str(a_converter), a_cache.statistics())
+        for a_converter, a_cache in _converter_caches.items()
+    )
+
+
+#------------------------------------------------------------------------------
+def clear_converter_caches():
+    for a_cache in _converter_caches.values():
+        a_cache.clear()
+
+
 #------------------------------------------------------------------------------
 #  from string section
 #
@@ -124,20 +269,76 @@ boolean_converter = str_to_boolean  # for backward compatiblity
 
 
 #------------------------------------------------------------------------------
-def str_to_python_object(input_str):
-    """ a conversion that will import a module and class name
-    """
-    if not input_str:
-        return None
+def str_to_help_topic(input_str):
+    """a conversion function for the 'help' option, which is either a
+    boolean or the topic of the help: the name of a namespace or an option,
+    or a glob of option names.  The empty string, as from a bare '--help',
+    is True."""
     if not isinstance(input_str, basestring):
-        # gosh, we didn't get a string, we can't convert anything but strings
-        # we're going to assume that what we got is actually what was wanted
-        # as the output
-        return input_str
-    input_str = str_quote_stripper(input_str)
-    if '.' not in input_str and input_str in known_mapping_str_to_type:
-        return known_mapping_str_to_type[input_str]
+        raise ValueError(input_str)
+    input_str = str_quote_stripper(input_str.strip()).strip()
+    lowered = input_str.lower()
+    if lowered in ('', 'true', 't', '1', 'y', 'yes'):
+        return True
+    if lowered in ('false', 'f', '0', 'n', 'no'):
+        return False
+    return input_str
+
+
+#------------------------------------------------------------------------------
+# the largest number of names that str_to_python_object remembers resolving,
+# or failing to resolve.  Beyond that, it starts again with an empty cache.
+max_import_cache_size = 1000
+
+_import_cache = {}
+
+
+#==============================================================================
+class _ImportFailure(object):
+    """the cached record of a name that couldn't be resolved"""
+    __slots__ = ('message',)
+
+    #--------------------------------------------------------------------------
+    def __init__(self, message):
+        self.message = message
+
+
+#------------------------------------------------------------------------------
+def clear_import_cache():
+    """forget every object that str_to_python_object has resolved and every
+    name that it couldn't.  This is needed after changes to 'sys.path', or
+    to the contents of modules, that would resolve names differently."""
+    _import_cache.clear()
+
+
+#------------------------------------------------------------------------------
+def _python_object_from_sys_modules(parts):
+    """resolve the parts of a dotted name without importing anything: find
+    the longest leading part that names a module that has already been
+    imported and look up the rest as attributes.  Return None if that can't
+    be done."""
+    for i in range(len(parts), 0, -1):
+        a_module = sys.modules.get('.'.join(parts[:i]))
+        if a_module is not None:
+            break
+    else:
+        return None
+    obj = a_module
+    try:
+        for name in parts[i:]:
+            obj = getattr(obj, name)
+    except AttributeError:
+        # perhaps a submodule not yet imported
+        return None
+    return obj
+
+
+#------------------------------------------------------------------------------
+def _import_python_object(input_str):
     parts = [x.strip() for x in input_str.split('.') if x.strip()]
+    obj = _python_object_from_sys_modules(parts)
+    if obj is not None:
+        return obj
     try:
         try:
             # first try as a complete module
@@ -157,9 +358,58 @@ def str_to_python_object(input_str):
     except ImportError, x:
         raise CannotConvertError(str(x))
 
+
+#------------------------------------------------------------------------------
+def str_to_python_object(input_str):
+    """ a conversion that will import a module and class name.  Names are
+    resolved once, then remembered, as are the names that can't be resolved.
+    See 'clear_import_cache'.
+    """
+    if not input_str:
+        return None
+    if not isinstance(input_str, basestring):
+        # gosh, we didn't get a string, we can't convert anything but strings
+        # we're going to assume that what we got is actually what was wanted
+        # as the output
+        return input_str
+    input_str = str_quote_stripper(input_str)
+    if '.' not in input_str and input_str in known_mapping_str_to_type:
+        return known_mapping_str_to_type[input_str]
+    if input_str in _generated_converters:
+        return _generated_converters[input_str]
+    if input_str.startswith(_numpy_array_converter_prefix):
+        # made on demand, numpy is only imported for options that use it
+        dtype_name = input_str[len(_numpy_array_converter_prefix):]
+        try:
+            return numpy_array_converter(dtype_name)
+        except TypeError:
+            raise CannotConvertError('%s is not a numpy dtype' % dtype_name)
+    try:
+        obj = _import_cache[input_str]
+    except KeyError:
+        try:
+            obj = _import_python_object(input_str)
+        except CannotConvertError, x:
+            obj = _ImportFailure(str(x))
+        if len(_import_cache) >= max_import_cache_size:
+            _import_cache.clear()
+        _import_cache[input_str] = obj
+    if type(obj) is _ImportFailure:
+        raise CannotConvertError(obj.message)
+    return obj
+
 class_converter = str_to_python_object  # for backward compatibility
 
 
+#------------------------------------------------------------------------------
+# the largest number of converted class lists that the converters made by
+# str_to_classes_in_namespaces remember.  Beyond that, they start again with
+# an empty cache.
+max_class_list_cache_size = 100
+
+_class_list_cache = {}
+
+
 #------------------------------------------------------------------------------
 def str_to_classes_in_namespaces(
     template_for_namespace="cls%d",
@@ -215,6 +465,9 @@ def str_to_classes_in_namespaces(
                               Namespace will contain elements for the class, as
                               well as an aggregator that will instantiate the
                               class.
+
+    Conversions are cached: converting the same list of classes, however it
+    is spaced, with the same parameters returns the same InnerClassList.
                               """
 
     # these are only used within this method.  No need to pollute the module
@@ -235,6 +488,16 @@ def str_to_classes_in_namespaces(
                 class_list = []
         else:
             raise TypeError('must be derivative of a basestring')
+        cache_key = (
+            tuple(class_list),
+            template_for_namespace,
+            name_of_class_option,
+            instantiate_classes
+        )
+        try:
+            return _class_list_cache[cache_key]
+        except KeyError:
+            pass
 
         #======================================================================
         class InnerClassList(RequiredConfig):
@@ -251,6 +514,7 @@ def str_to_classes_in_namespaces(
                                                          # for future reference
             class_option_name = name_of_class_option  # save the class's option
                                                       # name for the future
+            class_list_str = ', '.join(class_list)  # for 'to_str'
             # for each class in the class list
             for namespace_index, a_class in enumerate(class_list):
                 # figure out the Namespace name
@@ -277,12 +541,11 @@ def str_to_classes_in_namespaces(
                 """this method takes this inner class object and turns it back
                 into the original string of classnames.  This is used
                 primarily as for the output of the 'help' option"""
-                return ', '.join(
-                    py_obj_to_str(v[name_of_class_option].value)
-                    for v in cls.get_required_config().values()
-                    if isinstance(v, Namespace)
-                )
+                return cls.class_list_str
 
+        if len(_class_list_cache) >= max_class_list_cache_size:
+            _class_list_cache.clear()
+        _class_list_cache[cache_key] = InnerClassList
         return InnerClassList  # result of class_list_converter
     return class_list_converter  # result of classes_in_namespaces_converter
 
@@ -298,6 +561,260 @@ regex_converter = str_to_regular_expression  # for backward compatibility
 
 compiled_regexp_type = type(re.compile(r'x'))
 
+# the largest number of groups that the re module of Python 2 compiles in
+# one pattern.  It counts the whole match as a group too, so it refuses
+# patterns of 100 groups.
+max_groups_per_pattern = 99
+
+# patterns that can't share an alternation with others: those with inline
+# flags, which apply to the whole of an alternation, with back references
+# or conditional groups by number, which would refer to the wrong groups,
+# or with named groups, whose names could clash
+_uncombinable_re = re.compile(r'\(\?[iLmsux]|\\[1-9]|\(\?P[<=]|\(\?\(')
+
+
+#==============================================================================
+class RegexSet(object):
+    """a list of regular expressions compiled to be matched together, for
+    options like a list of URLs to skip.  Rather than trying each pattern in
+    turn, the patterns are combined into alternations, '(p0)|(p1)|...', so
+    that one call into the re module finds the pattern that matches.  The
+    patterns that can't be combined are tried on their own, in their place
+    in the list."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self.compile_seconds = 0.0
+        # each pattern is compiled once, here, so that a bad one is reported
+        # at once.  The alternations are compiled as they are first needed.
+        self._compiled = self._timed(
+            lambda: [re.compile(a_pattern) for a_pattern in self.patterns]
+        )
+        # lists of (a compiled pattern, a mapping of the index of a group
+        # to the index of the pattern that the group holds).  For a pattern
+        # tried on its own, the mapping is just the index of the pattern.
+        self._matchers = None
+        self._anchored_matchers = None
+        self._unanchored_matchers = None
+
+    #--------------------------------------------------------------------------
+    def _timed(self, a_function):
+        """call a function that compiles, adding its time to the total"""
+        start = time.time()
+        try:
+            return a_function()
+        finally:
+            self.compile_seconds += time.time() - start
+
+    #--------------------------------------------------------------------------
+    def _get_matchers(self):
+        """the matchers of all the patterns, for 'match'"""
+        if self._matchers is None:
+            self._matchers = self._timed(
+                lambda: self._compile(range(len(self.patterns)))
+            )
+        return self._matchers
+
+    #--------------------------------------------------------------------------
+    def _get_search_matchers(self):
+        """the matchers of the anchored and of the unanchored patterns, for
+        'search'.  The patterns anchored at the beginning of the string need
+        only be tried there, which is much cheaper than trying every
+        position of the string."""
+        if self._unanchored_matchers is None:
+            anchored = []
+            unanchored = []
+            for index, a_pattern in enumerate(self.patterns):
+                if _is_anchored(a_pattern):
+                    anchored.append(index)
+                else:
+                    unanchored.append(index)
+            self._anchored_matchers = self._timed(
+                lambda: self._compile(anchored)
+            )
+            self._unanchored_matchers = self._timed(
+                lambda: self._compile(unanchored)
+            )
+        return self._anchored_matchers, self._unanchored_matchers
+
+    #--------------------------------------------------------------------------
+    def _compile(self, indexes):
+        """return the matchers for the patterns of the indexes given"""
+        matchers = []
+        alternatives = []
+        group_indexes = {}
+        groups = 0
+        for index in indexes:
+            a_pattern = self.patterns[index]
+            compiled = self._compiled[index]
+            if (
+                _uncombinable_re.search(a_pattern)
+                # with the group that wraps it, it would have too many
+                or compiled.groups + 1 > max_groups_per_pattern
+            ):
+                self._add_alternation(matchers, alternatives, group_indexes)
+                alternatives, group_indexes, groups = [], {}, 0
+                matchers.append((compiled, index))
+                continue
+            if groups + compiled.groups + 1 > max_groups_per_pattern:
+                self._add_alternation(matchers, alternatives, group_indexes)
+                alternatives, group_indexes, groups = [], {}, 0
+            alternatives.append('(%s)' % a_pattern)
+            group_indexes[groups + 1] = index
+            groups += compiled.groups + 1
+        self._add_alternation(matchers, alternatives, group_indexes)
+        return matchers
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _add_alternation(matchers, alternatives, group_indexes):
+        if alternatives:
+            matchers.append(
+                (re.compile('|'.join(alternatives)), group_indexes)
+            )
+
+    #--------------------------------------------------------------------------
+    def _find(self, a_string, matchers, method_name):
+        for a_matcher, group_indexes in matchers:
+            a_match = getattr(a_matcher, method_name)(a_string)
+            if a_match is not None:
+                if type(group_indexes) is int:
+                    return self.patterns[group_indexes]
+                # the group of a whole alternative closes last, so it is the
+                # last matched group
+                return self.patterns[group_indexes[a_match.lastindex]]
+        return None
+
+    #--------------------------------------------------------------------------
+    def match(self, a_string):
+        """return the first of the patterns that matches at the beginning of
+        the string, or None if none does"""
+        return self._find(a_string, self._get_matchers(), 'match')
+
+    #--------------------------------------------------------------------------
+    def search(self, a_string):
+        """return a pattern that matches anywhere in the string, or None if
+        none does.  The patterns anchored with a leading '^' are tried
+        first, and of the patterns in an alternation, the one that matches
+        earliest in the string is found, so it is not necessarily the first
+        pattern in the list that matches."""
+        anchored_matchers, unanchored_matchers = self._get_search_matchers()
+        return (
+            self._find(a_string, anchored_matchers, 'match')
+            or self._find(a_string, unanchored_matchers, 'search')
+        )
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.patterns)
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self.patterns)
+
+    #--------------------------------------------------------------------------
+    def __eq__(self, other):
+        return isinstance(other, RegexSet) and self.patterns == other.patterns
+
+    #--------------------------------------------------------------------------
+    def __ne__(self, other):
+        return not self == other
+
+    #--------------------------------------------------------------------------
+    def __hash__(self):
+        return hash(self.patterns)
+
+    #--------------------------------------------------------------------------
+    def __repr__(self):
+        return '<RegexSet of %d patterns compiled in %.3fs>' % (
+            len(self.patterns),
+            self.compile_seconds
+        )
+
+
+#------------------------------------------------------------------------------
+def _separator_positions(input_str, separator=','):
+    """return the positions of the separators in a string of regular
+    expressions that are not within brackets, braces or parentheses and are
+    not escaped"""
+    positions = []
+    depth = 0
+    in_class = False
+    i = 0
+    length = len(input_str)
+    while i < length:
+        c = input_str[i]
+        if c == '\\':
+            i += 1
+        elif in_class:
+            if c == ']':
+                in_class = False
+        elif c == '[':
+            in_class = True
+            # a ']' first in a class is one of its characters
+            if input_str[i + 1:i + 2] == '^':
+                i += 1
+            if input_str[i + 1:i + 2] == ']':
+                i += 1
+        elif c in '({':
+            depth += 1
+        elif c in ')}':
+            depth -= 1
+        elif c == separator and not depth:
+            positions.append(i)
+        i += 1
+    return positions
+
+
+#------------------------------------------------------------------------------
+def _is_anchored(a_pattern):
+    """True if a pattern can only match at the beginning of a string: it
+    starts with '^' and has no alternative that doesn't.  Patterns with
+    inline flags, such as '(?m)', are never taken to be anchored."""
+    return (
+        a_pattern.startswith('^')
+        and not _uncombinable_re.search(a_pattern)
+        and not _separator_positions(a_pattern, '|')
+    )
+
+
+#------------------------------------------------------------------------------
+def _split_patterns(input_str):
+    patterns = []
+    start = 0
+    for i in _separator_positions(input_str):
+        patterns.append(input_str[start:i])
+        start = i + 1
+    patterns.append(input_str[start:])
+    return [x.strip() for x in patterns if x.strip()]
+
+
+#------------------------------------------------------------------------------
+def str_to_regex_set(input_str):
+    """ a conversion function for RegexSet, from regular expressions separated
+    by commas.  A comma within a pattern must be escaped, as '\\,', unless it
+    is within brackets, braces or parentheses.
+    """
+    if not isinstance(input_str, basestring):
+        raise ValueError(input_str)
+    try:
+        return RegexSet(_split_patterns(str_quote_stripper(input_str)))
+    except re.error, x:
+        raise ValueError(str(x))
+
+
+#------------------------------------------------------------------------------
+def regex_set_to_str(a_regex_set):
+    """the patterns separated by commas, with the commas that would separate
+    them escaped, so that they are split the same way when read again"""
+    escaped_patterns = []
+    for a_pattern in a_regex_set.patterns:
+        for i in reversed(_separator_positions(a_pattern)):
+            a_pattern = a_pattern[:i] + '\\' + a_pattern[i:]
+        escaped_patterns.append(a_pattern)
+    return ', '.join(escaped_patterns)
+
 
 #------------------------------------------------------------------------------
 def str_to_list(
@@ -322,6 +839,361 @@ def str_to_list(
 list_converter = str_to_list  # for backward compatibility
 
 
+#==============================================================================
+class SortedTuple(tuple):
+    """a tuple kept in sorted order, so that membership and position are
+    found by binary search rather than by a scan"""
+    __slots__ = ()
+
+    #--------------------------------------------------------------------------
+    def __new__(cls, iterable=()):
+        return super(SortedTuple, cls).__new__(cls, sorted(iterable))
+
+    #--------------------------------------------------------------------------
+    def __contains__(self, item):
+        i = bisect.bisect_left(self, item)
+        return i != len(self) and self[i] == item
+
+    #--------------------------------------------------------------------------
+    def index(self, item):
+        i = bisect.bisect_left(self, item)
+        if i != len(self) and self[i] == item:
+            return i
+        raise ValueError('%r is not in the SortedTuple' % (item,))
+
+    #--------------------------------------------------------------------------
+    def count(self, item):
+        return (
+            bisect.bisect_right(self, item) - bisect.bisect_left(self, item)
+        )
+
+    #--------------------------------------------------------------------------
+    def __repr__(self):
+        return 'SortedTuple(%s)' % super(SortedTuple, self).__repr__()
+
+
+#------------------------------------------------------------------------------
+def str_to_frozenset(
+    input_str,
+    item_converter=lambda x: x,
+    item_separator=',',
+):
+    """ a conversion function for frozenset, for options that are only ever
+    tested for membership
+    """
+    return str_to_list(input_str, item_converter, item_separator, frozenset)
+
+
+#------------------------------------------------------------------------------
+def str_to_sorted_tuple(
+    input_str,
+    item_converter=lambda x: x,
+    item_separator=',',
+):
+    """ a conversion function for SortedTuple
+    """
+    return str_to_list(input_str, item_converter, item_separator, SortedTuple)
+
+
+# the types of the items of the arrays of each typecode
+array_item_converters = {
+    'c': str,
+    'u': unicode,
+    'f': float,
+    'd': float,
+}
+
+
+#------------------------------------------------------------------------------
+def str_to_array(input_str, typecode='d', item_separator=','):
+    """ a conversion function for array.array.  The array holds its numbers
+    in a single block of memory, a few bytes each, rather than as a list of
+    Python objects.
+    """
+    items = str_to_list(
+        input_str,
+        array_item_converters.get(typecode, int),
+        item_separator
+    )
+    try:
+        return array.array(typecode, items)
+    except OverflowError, x:
+        # a number too big for the typecode is as wrong as one misspelled
+        raise ValueError(str(x))
+
+
+# the converters made at run time, like the one for frozensets of ints, by
+# the qualified names that to_str gives them, as the json writer records
+# them.  They aren't attributes of any module, so str_to_python_object looks
+# their names up here.
+_generated_converters = {}
+
+
+#------------------------------------------------------------------------------
+def _register_generated_converter(a_converter):
+    """make a converter made at run time known to str_to_python_object"""
+    _generated_converters.setdefault(
+        '%s.%s' % (a_converter.__module__, a_converter.__name__),
+        a_converter
+    )
+
+
+#------------------------------------------------------------------------------
+@memoize()
+def typed_collection_converter(collection_type, item_type):
+    """return a conversion function for a frozenset or a SortedTuple of items
+    of the given type, or for an array.array of the given typecode.
+    Option._deduce_converter uses it for defaults of those types."""
+    if collection_type is array.array:
+        def converter(input_str):
+            return str_to_array(input_str, item_type)
+    else:
+        item_converter = str_to_instance_of_type_converters.get(
+            item_type,
+            item_type
+        )
+        collection_converter = {
+            frozenset: str_to_frozenset,
+            SortedTuple: str_to_sorted_tuple,
+        }[collection_type]
+
+        def converter(input_str):
+            return collection_converter(input_str, item_converter)
+        register_pure_converter(converter)
+    converter.__name__ = 'str_to_%s_of_%s' % (
+        collection_type.__name__,
+        getattr(item_type, '__name__', item_type)
+    )
+    _register_generated_converter(converter)
+    return converter
+
+
+# the file name extension of the numpy arrays that are loaded from files
+npy_file_name_extension = '.npy'
+
+# the qualified names of the converters for numpy arrays of a dtype start
+# with this, the name of the dtype follows
+_numpy_array_converter_prefix = 'configman.converters.str_to_ndarray_of_'
+
+
+#------------------------------------------------------------------------------
+def _import_numpy():
+    """return the numpy module.  numpy is optional and slow to import, so it
+    is not imported until a numpy array is to be made from a string."""
+    try:
+        import numpy
+    except ImportError:
+        raise CannotConvertError('numpy arrays require numpy')
+    _register_numpy_converters(numpy)
+    return numpy
+
+
+#------------------------------------------------------------------------------
+def _imported_numpy():
+    """return the numpy module if something has imported it, else None.  A
+    numpy array can't exist until then."""
+    return sys.modules.get('numpy')
+
+
+#------------------------------------------------------------------------------
+def _register_numpy_converters(numpy):
+    """add the conversions of numpy arrays to the tables of converters"""
+    if numpy.ndarray in str_to_instance_of_type_converters:
+        return
+    for an_array_type in (numpy.ndarray, numpy.memmap):
+        to_string_converters[an_array_type] = numpy_array_to_str
+        to_help_string_converters[an_array_type] = numpy_array_to_summary_str
+    str_to_instance_of_type_converters[numpy.ndarray] = str_to_numpy_array
+
+
+#==============================================================================
+class _NumpyImportWatcher(object):
+    """an import hook for sys.meta_path that adds the conversions of numpy
+    arrays to the tables as soon as numpy is imported, by configman or by
+    anyone else.  It takes itself off sys.meta_path at the first import of
+    numpy, later imports cost nothing."""
+
+    #--------------------------------------------------------------------------
+    def find_module(self, full_name, path=None):
+        if full_name == 'numpy':
+            return self
+        return None
+
+    #--------------------------------------------------------------------------
+    def load_module(self, full_name):
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            # another thread got here first
+            pass
+        __import__(full_name)
+        numpy = sys.modules[full_name]
+        _register_numpy_converters(numpy)
+        return numpy
+
+
+#------------------------------------------------------------------------------
+def str_to_numpy_array(input_str, dtype=float, item_separator=','):
+    """ a conversion function for numpy arrays.  The string is either the
+    name of a '.npy' file or the items of a one dimensional array.  The file
+    is memory mapped read only, so the processes forked after loading it
+    share its pages rather than each having a copy.  The items are parsed
+    by numpy in one call rather than one by one.
+    """
+    numpy = _import_numpy()
+    if not isinstance(input_str, basestring):
+        raise ValueError(input_str)
+    input_str = str_quote_stripper(input_str.strip())
+    if input_str.endswith(npy_file_name_extension):
+        try:
+            return numpy.load(input_str, mmap_mode='r', allow_pickle=False)
+        except IOError, x:
+            raise ValueError(str(x))
+    if not input_str:
+        return numpy.empty(0, dtype)
+    # numpy.fromstring would be faster, but it stops quietly at the first
+    # item that it can't parse
+    return numpy.array(input_str.split(item_separator), dtype)
+
+
+#------------------------------------------------------------------------------
+def numpy_array_converter(dtype):
+    """return a conversion function for numpy arrays of the given dtype.
+    Option._deduce_converter uses it for numpy array defaults."""
+    # the dtype may be given in many forms, the converter is made once
+    return _numpy_array_converter(_import_numpy().dtype(dtype).name)
+
+
+#------------------------------------------------------------------------------
+@memoize()
+def _numpy_array_converter(dtype_name):
+    dtype = _import_numpy().dtype(dtype_name)
+
+    def converter(input_str):
+        return str_to_numpy_array(input_str, dtype)
+    converter.__name__ = 'str_to_ndarray_of_%s' % dtype_name
+    _register_generated_converter(converter)
+    return converter
+
+
+# option values of the form '@file:<path>' are references to the files that
+# hold the values
+file_reference_prefix = '@file:'
+
+# files of at least this many bytes are memory mapped rather than read
+file_reference_mmap_threshold = 1 << 20
+
+
+#==============================================================================
+class FileReference(object):
+    """the value of an option given as '@file:<path>'.  The file isn't read
+    until its contents are first used.  They are then kept until the file's
+    modification time or size changes.  Files of at least
+    'file_reference_mmap_threshold' bytes are memory mapped read only rather
+    than read.
+
+    It stands in for the contents: len, indexing, 'in' and the attributes
+    that it hasn't got of its own go to the contents.  As a string it is the
+    reference rather than the contents, so help, the log and config files
+    never show them."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        self._data = None
+
+    #--------------------------------------------------------------------------
+    @property
+    def reference(self):
+        return file_reference_prefix + self.path
+
+    #--------------------------------------------------------------------------
+    @property
+    def data(self):
+        """the contents of the file: a str, or a read only mmap for a large
+        file"""
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime, stat.st_size)
+        if stamp != self._stamp:
+            # the stamp from before the read, so that a change made during
+            # the read is seen next time
+            self._data = self._load(stat.st_size)
+            self._stamp = stamp
+        return self._data
+
+    #--------------------------------------------------------------------------
+    def _load(self, size):
+        with open(self.path, 'rb') as f:
+            if size and size >= file_reference_mmap_threshold:
+                # imported here, so that configs that aren't mapped never
+                # import it
+                import mmap
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return f.read()
+
+    #--------------------------------------------------------------------------
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            # copy, pickle and the like probe for these, they mustn't read
+            # the file
+            raise AttributeError(name)
+        return getattr(self.data, name)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.data)
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        return self.data[key]
+
+    #--------------------------------------------------------------------------
+    def __contains__(self, a_substring):
+        return self.data.find(a_substring) != -1
+
+    #--------------------------------------------------------------------------
+    def __nonzero__(self):
+        # without this, truth testing would read the file to find its len
+        return True
+
+    #--------------------------------------------------------------------------
+    def __eq__(self, other):
+        return isinstance(other, FileReference) and self.path == other.path
+
+    #--------------------------------------------------------------------------
+    def __ne__(self, other):
+        return not self == other
+
+    #--------------------------------------------------------------------------
+    def __hash__(self):
+        return hash(self.path)
+
+    #--------------------------------------------------------------------------
+    def __str__(self):
+        return self.reference
+
+    #--------------------------------------------------------------------------
+    def __repr__(self):
+        return 'FileReference(%r)' % self.path
+
+
+#------------------------------------------------------------------------------
+def str_to_file_reference(input_str):
+    """ a conversion function for options whose values may be kept in files.
+    A value of the form '@file:<path>' becomes a FileReference to the file,
+    any other value is the value itself.
+    """
+    if not isinstance(input_str, basestring):
+        raise ValueError(input_str)
+    a_reference = str_quote_stripper(input_str.strip())
+    if a_reference.startswith(file_reference_prefix):
+        return FileReference(
+            os.path.expanduser(a_reference[len(file_reference_prefix):])
+        )
+    return input_str
+
+
 #------------------------------------------------------------------------------
 #
 #   To string section
@@ -337,6 +1209,11 @@ str_to_instance_of_type_converters = {
     bool: boolean_converter,
     dict: json.loads,
     list: list_converter,
+    frozenset: str_to_frozenset,
+    SortedTuple: str_to_sorted_tuple,
+    array.array: str_to_array,
+    FileReference: str_to_file_reference,
+    RegexSet: str_to_regex_set,
     datetime.datetime: datetime_converter,
     datetime.date: date_converter,
     datetime.timedelta: timedelta_converter,
@@ -348,64 +1225,211 @@ str_to_instance_of_type_converters = {
  # backward compatibility
 from_string_converters = str_to_instance_of_type_converters
 
+# the converters for the common item types are made up front, so that their
+# names can be found again in a new process
+for _typecode in 'cbBuhHiIlLfd':
+    typed_collection_converter(array.array, _typecode)
+for _collection_type in (frozenset, SortedTuple):
+    for _item_type in (str, unicode, int, long, float):
+        typed_collection_converter(_collection_type, _item_type)
+del _typecode, _collection_type, _item_type
+
+# the converters whose results depend only on their input, and are worth
+# caching.  A cache lookup costs more than int or float would.
+for _a_converter in (
+    regex_converter,
+    datetime_converter,
+    date_converter,
+    timedelta_converter,
+    str_to_frozenset,
+    str_to_sorted_tuple,
+    str_to_regex_set,
+):
+    register_pure_converter(_a_converter)
+del _a_converter
+
+# the types of the values that can't be changed, so that one value can be
+# shared by many options
+immutable_types = set([
+    type(None),
+    bool,
+    int,
+    long,
+    float,
+    complex,
+    str,
+    unicode,
+    datetime.datetime,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    compiled_regexp_type,
+    RegexSet,
+])
+
+# the types that are immutable if their items are
+immutable_container_types = set([tuple, frozenset, SortedTuple])
+
+
+#------------------------------------------------------------------------------
+def is_immutable(a_value):
+    a_type = type(a_value)
+    if a_type in immutable_types:
+        return True
+    if a_type in immutable_container_types:
+        for an_item in a_value:
+            if not is_immutable(an_item):
+                return False
+        return True
+    return False
+
+
+#------------------------------------------------------------------------------
+def converter_for_typed_default(default):
+    """return the conversion function for a default whose items have a type
+    of their own: an array.array, a numpy array, or a frozenset or SortedTuple
+    that isn't empty.  The items of a value are converted to the same type.
+    None if the default is of any other kind."""
+    default_type = type(default)
+    if default_type is array.array:
+        return typed_collection_converter(default_type, default.typecode)
+    if default_type in (frozenset, SortedTuple) and default:
+        return typed_collection_converter(
+            default_type,
+            type(iter(default).next())
+        )
+    numpy = _imported_numpy()
+    if numpy is not None and isinstance(default, numpy.ndarray):
+        return numpy_array_converter(default.dtype)
+    return None
+
+
+#------------------------------------------------------------------------------
+#  the ways that arbitrary_object_to_string has of converting an object,
+#  in the order that it tries them.  Each raises one of the exceptions paired
+#  with it if it doesn't apply to the object.
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+def _by_to_str_method(a_thing):
+    """does it have a to_str function?"""
+    return a_thing.to_str()
+
+
+#------------------------------------------------------------------------------
+def _by_type_proxy(a_thing):
+    """is this a type proxy?"""
+    return arbitrary_object_to_string(a_thing.a_type)
+
+
+#------------------------------------------------------------------------------
+def _by_builtin_name(a_thing):
+    """is it a built in?"""
+    return known_mapping_type_to_str[a_thing]
+
+
+#------------------------------------------------------------------------------
+@memoize()
+def _module_name_from_file_name(file_name):
+    return file_name[:-3].replace('/', '.').strip('.')
+
+
+#------------------------------------------------------------------------------
+def _by_module_and_name(a_thing):
+    """is it something from a loaded module?"""
+    module_name = a_thing.__module__
+    if module_name in ('__builtin__', 'exceptions'):
+        raise AttributeError('__module__')
+    if module_name == "__main__":
+        module_name = _module_name_from_file_name(
+            sys.modules['__main__'].__file__
+        )
+    return "%s.%s" % (module_name, a_thing.__name__)
+
+
+#------------------------------------------------------------------------------
+def _by_name(a_thing):
+    """maybe it has a __name__ attribute?"""
+    return a_thing.__name__
+
+
+_to_str_strategies = (
+    # AttributeError - no to_str function?
+    # KeyError - DotDict has no to_str?
+    # TypeError - problem converting
+    (_by_to_str_method, (AttributeError, KeyError, TypeError)),
+    (_by_type_proxy, (AttributeError, KeyError, TypeError)),
+    (_by_builtin_name, (KeyError, TypeError)),
+    (_by_module_and_name, (AttributeError,)),
+    (_by_name, (AttributeError,)),
+    # punt and see what happens if we just cast it to string
+    (str, ()),
+)
+
+# the largest number of types, classes and modules for which
+# arbitrary_object_to_string remembers the strategy that worked
+max_to_str_strategy_cache_size = 1000
+
+_to_str_strategy_cache = {}
+
 
 #------------------------------------------------------------------------------
 def arbitrary_object_to_string(a_thing):
     """take a python object of some sort, and convert it into a human readable
     string.  this function is used extensively to convert things like "subject"
-    into "subject_key, function -> function_key, etc."""
+    into "subject_key, function -> function_key, etc.
+
+    The strategy that works for an object is remembered, by the object
+    itself for classes and modules and by the type of the object otherwise.
+    Objects like it are converted by that strategy directly, without first
+    probing for the ones that don't work."""
     # is it None?
     if a_thing is None:
         return ''
     # is it already a string?
     if isinstance(a_thing, basestring):
         return a_thing
-    # does it have a to_str function?
-    try:
-        return a_thing.to_str()
-    except (AttributeError, KeyError, TypeError):
-        # AttributeError - no to_str function?
-        # KeyError - DotDict has no to_str?
-        # TypeError - problem converting
-        # nope, no to_str function
-        pass
-    # is this a type proxy?
-    try:
-        return arbitrary_object_to_string(a_thing.a_type)
-    except (AttributeError, KeyError, TypeError):
-        #
-        # nope, no a_type property
-        pass
-    # is it a built in?
-    try:
-        return known_mapping_type_to_str[a_thing]
-    except (KeyError, TypeError):
-        # nope, not a builtin
-        pass
-    # is it something from a loaded module?
-    try:
-        if a_thing.__module__ not in ('__builtin__', 'exceptions'):
-            if a_thing.__module__ == "__main__":
-                module_name = (
-                    sys.modules['__main__']
-                    .__file__[:-3]
-                    .replace('/', '.')
-                    .strip('.')
-                )
-            else:
-                module_name = a_thing.__module__
-            return "%s.%s" % (module_name, a_thing.__name__)
-    except AttributeError:
-        # nope, not one of these
-        pass
-    # maybe it has a __name__ attribute?
-    try:
-        return a_thing.__name__
-    except AttributeError:
-        # nope, not one of these
-        pass
-    # punt and see what happens if we just cast it to string
-    return str(a_thing)
+    if isinstance(a_thing, (type, types.ClassType, types.ModuleType)):
+        # classes and modules differ in their attributes, not their types
+        cache_key = a_thing
+    else:
+        cache_key = type(a_thing)
+        if cache_key is types.InstanceType:
+            # the instances of old style classes all share one type
+            cache_key = a_thing.__class__
+    a_strategy = _to_str_strategy_cache.get(cache_key)
+    if a_strategy is not None and a_strategy[0] not in (
+        _by_to_str_method,
+        _by_type_proxy
+    ):
+        # an instance may have been given its own 'to_str' or 'a_type',
+        # which the earlier strategies would find
+        instance_attributes = getattr(a_thing, '__dict__', None)
+        if (
+            cache_key is not a_thing
+            and isinstance(instance_attributes, dict)
+            and ('to_str' in instance_attributes
+                 or 'a_type' in instance_attributes)
+        ):
+            a_strategy = None
+    if a_strategy is not None:
+        a_function, failures = a_strategy
+        try:
+            return a_function(a_thing)
+        except failures:
+            # this one is unlike the others of its type
+            pass
+    for a_strategy in _to_str_strategies:
+        a_function, failures = a_strategy
+        try:
+            result = a_function(a_thing)
+        except failures:
+            continue
+        if len(_to_str_strategy_cache) >= max_to_str_strategy_cache_size:
+            _to_str_strategy_cache.clear()
+        _to_str_strategy_cache[cache_key] = a_strategy
+        return result
 
 
 py_obj_to_str = arbitrary_object_to_string  # for backwards compatibility
@@ -429,6 +1453,11 @@ to_string_converters = {
     unicode: unicode,
     list: list_to_str,
     tuple: list_to_str,
+    SortedTuple: list_to_str,
+    frozenset: lambda x: list_to_str(sorted(x)),
+    array.array: list_to_str,
+    FileReference: str,
+    RegexSet: regex_set_to_str,
     bool: lambda x: 'True' if x else 'False',
     dict: json.dumps,
     datetime.datetime: datetime_to_ISO_string,
@@ -441,6 +1470,43 @@ to_string_converters = {
 }
 
 
+#------------------------------------------------------------------------------
+def numpy_array_to_str(an_array):
+    """a memory mapped array is written as the name of its file, any other
+    as its items.  Arrays of more than one dimension are flattened, they
+    keep their shape only in a '.npy' file."""
+    file_name = getattr(an_array, 'filename', None)
+    if file_name:
+        return file_name
+    if an_array.dtype.kind in 'fc':
+        # repr, as the shortest string that reads back as the same number
+        return ', '.join(repr(x) for x in an_array.ravel().tolist())
+    return ', '.join(str(x) for x in an_array.ravel().tolist())
+
+
+#------------------------------------------------------------------------------
+def numpy_array_to_summary_str(an_array):
+    """describe an array by its shape and dtype rather than its items"""
+    summary = 'shape=%s, dtype=%s' % (an_array.shape, an_array.dtype)
+    file_name = getattr(an_array, 'filename', None)
+    if file_name:
+        return '%s (%s)' % (file_name, summary)
+    return 'array(%s)' % summary
+
+
+# the conversions used for the defaults shown by help, for the types whose
+# values are too big to show in full.  Any other type is shown as it is
+# written to a config file
+to_help_string_converters = {}
+
+# the conversions of numpy arrays are added to the tables when numpy is
+# imported, or now if it already has been
+if _imported_numpy() is None:
+    sys.meta_path.insert(0, _NumpyImportWatcher())
+else:
+    _register_numpy_converters(_imported_numpy())
+
+
 #------------------------------------------------------------------------------
 def to_str(a_thing):
     try:
@@ -3,12 +3,66 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import datetime
+import re
 
+# the forms of ISO-8601 dates and datetimes that are parsed in one pass.
+# Strings that don't match are left to strptime, which raises the ValueError
+_date_re = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\Z')
+_datetime_re = re.compile(
+    r'(\d{4})-(\d{1,2})-(\d{1,2})'
+    r'(?:T(\d{1,2}):(\d{1,2}):(\d{1,2})(?:\.(\d{1,6}))?'
+    r'(Z|[+-]\d{2}:?\d{2})?)?\Z'
+)
 
-def datetime_from_ISO_string(s):
-    """ Take an ISO date string of the form YYYY-MM-DDTHH:MM:SS.S
-    and convert it into an instance of datetime.datetime
+
+class FixedOffset(datetime.tzinfo):
+    """ a time zone that is a fixed number of minutes east of UTC, as given
+    by the offset of an ISO datetime string
     """
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self._offset = datetime.timedelta(minutes=minutes)
+
+    def utcoffset(self, a_datetime):
+        return self._offset
+
+    def dst(self, a_datetime):
+        return datetime.timedelta(0)
+
+    def tzname(self, a_datetime):
+        if not self.minutes:
+            return 'UTC'
+        sign = '-' if self.minutes < 0 else '+'
+        return '%s%02d:%02d' % ((sign,) + divmod(abs(self.minutes), 60))
+
+    def __repr__(self):
+        return 'FixedOffset(%d)' % self.minutes
+
+    def __reduce__(self):
+        return (FixedOffset, (self.minutes,))
+
+
+_fixed_offsets = {}
+
+
+def _fixed_offset(offset_str):
+    try:
+        return _fixed_offsets[offset_str]
+    except KeyError:
+        if offset_str == 'Z':
+            minutes = 0
+        else:
+            digits = offset_str[1:].replace(':', '')
+            minutes = int(digits[:2]) * 60 + int(digits[2:])
+            if offset_str[0] == '-':
+                minutes = -minutes
+        if minutes >= 24 * 60:
+            raise ValueError('%r is not a valid UTC offset' % offset_str)
+        a_time_zone = _fixed_offsets[offset_str] = FixedOffset(minutes)
+        return a_time_zone
+
+
+def _datetime_from_ISO_string_by_strptime(s):
     try:
         return datetime.datetime.strptime(s, '%Y-%m-%dT%H:%M:%S')
     except ValueError:
@@ -18,11 +72,44 @@ def datetime_from_ISO_string(s):
             return datetime.datetime.strptime(s, '%Y-%m-%dT%H:%M:%S.%f')
 
 
+def datetime_from_ISO_string(s):
+    """ Take an ISO date string of the form YYYY-MM-DDTHH:MM:SS.S
+    and convert it into an instance of datetime.datetime.  A trailing UTC
+    offset, as in 'Z' or '+05:30', gives a datetime with a FixedOffset
+    tzinfo
+    """
+    match = _datetime_re.match(s)
+    if match is None:
+        return _datetime_from_ISO_string_by_strptime(s)
+    (year, month, day, hour, minute, second, fraction,
+        offset) = match.groups()
+    if hour is None:
+        return datetime.datetime(int(year), int(month), int(day))
+    if fraction is None:
+        microsecond = 0
+    else:
+        microsecond = int(fraction.ljust(6, '0'))
+    return datetime.datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        microsecond,
+        None if offset is None else _fixed_offset(offset)
+    )
+
+
 def date_from_ISO_string(s):
     """ Take an ISO date string of the form YYYY-MM-DD
     and convert it into an instance of datetime.date
     """
-    return datetime.datetime.strptime(s, '%Y-%m-%d').date()
+    match = _date_re.match(s)
+    if match is None:
+        return datetime.datetime.strptime(s, '%Y-%m-%d').date()
+    year, month, day = match.groups()
+    return datetime.date(int(year), int(month), int(day))
 
 
 def datetime_to_ISO_string(aDate):
@@ -45,15 +132,8 @@ def timedelta_to_seconds(td):
     return td.days * 24 * 60 * 60 + td.seconds
 
 
-def str_to_timedelta(input_str):
-    """ a string conversion function for timedelta for strings in the format
-    DD:HH:MM:SS or D HH:MM:SS
-    """
-    try:
-        input_str = input_str.replace(' ', ':')
-    except (TypeError, AttributeError):
-        from configman.converters import to_str
-        raise TypeError('%s should have been a string' % to_str(input_str))
+def _str_to_timedelta_by_splitting(input_str):
+    input_str = input_str.replace(' ', ':')
     days, hours, minutes, seconds = 0, 0, 0, 0
     details = input_str.split(':')
     if len(details) >= 4:
@@ -70,6 +150,36 @@ def str_to_timedelta(input_str):
                               seconds=seconds)
 
 
+def str_to_timedelta(input_str):
+    """ a string conversion function for timedelta for strings in the format
+    DD:HH:MM:SS or D HH:MM:SS
+    """
+    try:
+        details = input_str.replace(' ', ':').split(':')
+    except (TypeError, AttributeError):
+        from configman.converters import to_str
+        raise TypeError('%s should have been a string' % to_str(input_str))
+    # the days and the total of the seconds, without the keyword arguments
+    # and the normalization of each unit that timedelta would go through
+    number_of_details = len(details)
+    if number_of_details == 4:
+        return datetime.timedelta(
+            int(details[0]),
+            int(details[1]) * 3600 + int(details[2]) * 60 + int(details[3])
+        )
+    if number_of_details == 3:
+        return datetime.timedelta(
+            0,
+            int(details[0]) * 3600 + int(details[1]) * 60 + int(details[2])
+        )
+    if number_of_details == 2:
+        return datetime.timedelta(0, int(details[0]) * 60 + int(details[1]))
+    if number_of_details == 1:
+        return datetime.timedelta(0, int(details[0]))
+    # more than four, the leading ones are ignored
+    return _str_to_timedelta_by_splitting(input_str)
+
+
 def timedelta_to_str(aTimedelta):
     """ a conversion function for time deltas to string in the form
     DD:HH:MM:SS
@@ -25,7 +25,7 @@ class UnknownDefinitionTypeException(Exception):
     pass
 
 
-def setup_definitions(source, destination):
+def setup_definitions(source, destination, requirements_manifest=None):
     target_setup_func = None
     try:
         target_setup_func = definition_dispatch[type(source)]
@@ -36,4 +36,8 @@ def setup_definitions(source, destination):
                 break
         if not target_setup_func:
             raise UnknownDefinitionTypeException(repr(type(source)))
-    target_setup_func(source, destination)
+    if requirements_manifest is None:
+        # setup functions of other origins may not take a manifest
+        target_setup_func(source, destination)
+    else:
+        target_setup_func(source, destination, requirements_manifest)
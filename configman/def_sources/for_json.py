@@ -5,10 +5,14 @@ import json
 from configman.def_sources import for_mappings
 
 
-def setup_definitions(source, destination):
+def setup_definitions(source, destination, requirements_manifest=None):
     try:
         json_dict = json.loads(source)
     except ValueError:
         with open(source) as j:
             json_dict = json.load(j)
-    for_mappings.setup_definitions(json_dict, destination)
+    for_mappings.setup_definitions(
+        json_dict,
+        destination,
+        requirements_manifest
+    )
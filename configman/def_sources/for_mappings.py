@@ -10,10 +10,11 @@ from configman.option import (
     Option,
     Aggregation,
 )
+from configman.requirements_manifest import recorded_class_path
 
 
 #------------------------------------------------------------------------------
-def setup_definitions(source, destination):
+def setup_definitions(source, destination, requirements_manifest=None):
     for key, val in source.items():
         if key.startswith('__'):
             continue  # ignore these
@@ -21,7 +22,10 @@ def setup_definitions(source, destination):
             destination[key] = val
             if not val.name:
                 val.name = key
-            val.set_value(val.default)
+            if recorded_class_path(val, requirements_manifest) is None:
+                # the classes in the requirements manifest are left
+                # unconverted, so that their imports can be deferred
+                val.set_value(val.default)
         elif isinstance(val, Aggregation):
             destination[key] = val
         elif isinstance(val, collections.Mapping):
@@ -42,7 +46,11 @@ def setup_definitions(source, destination):
                     except AttributeError:
                         destination[key] = Namespace()
                 # recurse!
-                setup_definitions(val, destination[key])
+                setup_definitions(
+                    val,
+                    destination[key],
+                    requirements_manifest
+                )
         else:
             destination[key] = Option(name=key,
                                       doc=key,
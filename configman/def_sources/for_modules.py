@@ -5,7 +5,7 @@
 from configman.def_sources.for_mappings import setup_definitions
 
 
-def setup_definitions(source, destination):
+def setup_definitions(source, destination, requirements_manifest=None):
     module_dict = source.__dict__.copy()
     del module_dict['__builtins__']
-    setup_definitions(module_dict, destination)
+    setup_definitions(module_dict, destination, requirements_manifest)
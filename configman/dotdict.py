@@ -6,6 +6,12 @@
 import collections
 import weakref
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
+
 from configman.orderedset import OrderedSet
 from configman.memoize import memoize
 
@@ -241,6 +247,13 @@ class DotDict(collections.MutableMapping):
         else:
             return self[parent_key]
 
+    #--------------------------------------------------------------------------
+    @classmethod
+    def view(cls, a_mapping, **kwargs):
+        """return a read-only DotDictView of a flat mapping of 'x.y.z' keys
+        that answers lookups the way an instance of this class would."""
+        return DotDictView(a_mapping, cls, **kwargs)
+
 
 #==============================================================================
 class DotDictWithAcquisition(DotDict):
@@ -344,6 +357,231 @@ class DotDictWithAcquisition(DotDict):
                 raise
             raise KeyError(key)
 
+    #--------------------------------------------------------------------------
+    @classmethod
+    def view(cls, a_mapping, **kwargs):
+        """return a read-only view of a flat mapping of 'x.y.z' keys with
+        the acquisition semantics of this class."""
+        return DotDictViewWithAcquisition(a_mapping, cls, **kwargs)
+
+
+#==============================================================================
+class DotDictView(collections.Mapping):
+    """A read-only view of a flat mapping of keys in the form 'x.y.z'.  It
+    answers lookups the way an instance of a DotDict class initialized from
+    that mapping would, without copying the mapping.  ValueSources return
+    these from 'get_values', so reading a large source costs nothing beyond
+    the lookups themselves:
+
+        v = DotDictView({'a': 1, 'x.y.b': 2})
+        assert v['x.y.b'] == 2
+        assert v.x.y.b == 2
+        assert v['x'] == {'y': {'b': 2}}
+
+    A lookup of a leaf goes straight to the underlying mapping.  A lookup of
+    a namespace, for which there is no flat key, is answered with an instance
+    of the DotDict class holding just that namespace.  It is built once and
+    kept.  If key translations are given, the translated version of the
+    mapping is made on the first lookup, rather than when the view is made.
+    """
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_mapping, namespace_class=DotDict,
+                 translation_tuples=()):
+        """parameters:
+            a_mapping - a flat mapping of keys in the form 'x.y.z'.  It is
+                        never changed or copied, except to translate keys.
+            namespace_class - the DotDict class used for namespaces
+            translation_tuples - a sequence of 2-tuples of the form:
+                                 (original_substring, substitution_string)
+                                 as in 'create_key_translating_dot_dict'"""
+        self._source = a_mapping
+        self._namespace_class = namespace_class
+        self._translation_tuples = translation_tuples
+        self._table = None if translation_tuples else a_mapping
+        self._children = None
+        self._children_length = 0
+        self._namespaces = {}
+
+    #--------------------------------------------------------------------------
+    def _translate_key(self, key):
+        for original, replacement in self._translation_tuples:
+            key = key.replace(original, replacement)
+        return key
+
+    #--------------------------------------------------------------------------
+    def _get_table(self):
+        """return the flat mapping with the keys translated"""
+        if self._table is None:
+            self._table = OrderedDict(
+                (self._translate_key(k), v)
+                for k, v in self._source.iteritems()
+            )
+        return self._table
+
+    #--------------------------------------------------------------------------
+    def _get_children(self):
+        """return a mapping of each namespace, '' being the top level, to
+        the set of names within it.  It is made on the first lookup that
+        misses a flat key or on the first iteration, and made again if the
+        mapping has since grown, as a mapping that fetches its contents
+        lazily may."""
+        table = self._get_table()
+        if self._children is None or self._children_length != len(table):
+            self._children_length = len(table)
+            children = {'': OrderedSet()}
+            for key in table:
+                namespace = ''
+                for a_name in key.split('.'):
+                    try:
+                        children[namespace].add(a_name)
+                    except KeyError:
+                        children[namespace] = OrderedSet((a_name,))
+                    namespace = (
+                        '%s.%s' % (namespace, a_name) if namespace else a_name
+                    )
+            self._children = children
+        return self._children
+
+    #--------------------------------------------------------------------------
+    def _make_namespace(self, namespace):
+        """return a new instance of the DotDict class for a namespace"""
+        table = self._get_table()
+        children = self._get_children()
+        a_dot_dict = self._namespace_class()
+        for a_name in children[namespace]:
+            key = '%s.%s' % (namespace, a_name)
+            try:
+                a_dot_dict[a_name] = table[key]
+            except KeyError:
+                a_dot_dict[a_name] = self._make_namespace(key)
+        return a_dot_dict
+
+    #--------------------------------------------------------------------------
+    def _get_namespace(self, namespace):
+        """return the DotDict for a namespace, building the one for its
+        top level namespace if it hasn't been used before"""
+        top_name, _, rest = namespace.partition('.')
+        try:
+            a_dot_dict = self._namespaces[top_name]
+        except KeyError:
+            a_dot_dict = self._make_namespace(top_name)
+            self._namespaces[top_name] = a_dot_dict
+        if rest:
+            return a_dot_dict[rest]
+        return a_dot_dict
+
+    #--------------------------------------------------------------------------
+    def _is_namespace(self, key):
+        """a mapping that can tell whether a key is a namespace without
+        listing all its keys may offer an 'is_namespace' method"""
+        table = self._get_table()
+        try:
+            return table.is_namespace(key)
+        except AttributeError:
+            return key in self._get_children()
+
+    #--------------------------------------------------------------------------
+    def _find(self, key):
+        """an exact lookup of a key that is either a leaf or a namespace"""
+        try:
+            return self._get_table()[key]
+        except KeyError:
+            if not key or not self._is_namespace(key):
+                raise
+        return self._get_namespace(key)
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        """accepts keys in the form 'x.y.z'.  A key that isn't found is
+        translated and tried again, as a key translating DotDict would."""
+        try:
+            return self._find(key)
+        except KeyError:
+            if not self._translation_tuples:
+                raise
+        translated_key = self._translate_key(key)
+        if translated_key == key:
+            raise KeyError(key)
+        try:
+            return self._find(translated_key)
+        except KeyError:
+            raise KeyError(key)
+
+    #--------------------------------------------------------------------------
+    def __getattr__(self, key):
+        """offer the same attribute style access as the DotDict.  As with
+        the DotDict, a missing key raises KeyError, except for the special
+        '__' attributes and the view's own private ones."""
+        if key.startswith('_'):
+            raise AttributeError(key)
+        return self[key]
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self._get_children()[''])
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._get_children()[''])
+
+    #--------------------------------------------------------------------------
+    def keys_breadth_first(self, include_dicts=False):
+        """a generator that returns all the keys in the form 'x.y.z'.
+        Unless the namespaces are wanted too, these are just the keys of the
+        underlying mapping."""
+        if not include_dicts:
+            for key in self._get_table():
+                yield key
+            return
+        children = self._get_children()
+        namespaces = ['']
+        for namespace in namespaces:
+            for a_name in children[namespace]:
+                key = '%s.%s' % (namespace, a_name) if namespace else a_name
+                yield key
+                if key in children:
+                    namespaces.append(key)
+
+
+#==============================================================================
+class DotDictViewWithAcquisition(DotDictView):
+    """A read-only view with the acquisition semantics of the
+    DotDictWithAcquisition: a key of the form 'x.y.a' that is not in the
+    mapping is looked for as 'x.a' and then as 'a'.
+
+        v = DotDictViewWithAcquisition({'a': 39, 'x.b': 2})
+        assert v['x.y.z.a'] == 39
+        assert v.x.a == 39
+    """
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        try:
+            return super(DotDictViewWithAcquisition, self).__getitem__(key)
+        except KeyError:
+            if '.' not in key:
+                raise
+        key_split = key.split('.')
+        for i in range(len(key_split) - 2, -1, -1):
+            try:
+                return super(DotDictViewWithAcquisition, self).__getitem__(
+                    '.'.join(key_split[:i] + key_split[-1:])
+                )
+            except KeyError:
+                pass
+        raise KeyError(key)
+
+    #--------------------------------------------------------------------------
+    def _make_namespace(self, namespace):
+        """top level namespaces acquire from the view itself"""
+        a_dot_dict = super(DotDictViewWithAcquisition, self)._make_namespace(
+            namespace
+        )
+        if '.' not in namespace:
+            a_dot_dict.__dict__['_parent'] = self
+        return a_dot_dict
+
 
 #------------------------------------------------------------------------------
 def create_key_translating_dot_dict(
@@ -407,5 +645,100 @@ def create_key_translating_dot_dict(
                 self._translate_key(key)
             )
 
+        #----------------------------------------------------------------------
+        @classmethod
+        def view(cls, a_mapping, **kwargs):
+            kwargs.setdefault('translation_tuples', translation_tuples)
+            return super(DotDictWithKeyTranslations, cls).view(
+                a_mapping,
+                **kwargs
+            )
+
     DotDictWithKeyTranslations.__name__ = new_class_name
     return DotDictWithKeyTranslations
+
+
+#------------------------------------------------------------------------------
+@memoize()
+def create_deferring_dot_dict(base_class=DotDict):
+    """this function will generate a DotDict derivative class with keys whose
+    values aren't made until they are first looked up, as the
+    ConfigurationManager uses for the class options that a requirements
+    manifest leaves unresolved.  The base class itself is left as it is.
+
+    parameters:
+        base_class - the baseclass on which this new class is to be based
+    """
+    #==========================================================================
+    class DotDictWithDeferredValues(base_class):
+
+        def __init__(self, *args, **kwargs):
+            self.__dict__['_deferred'] = {}
+            super(DotDictWithDeferredValues, self).__init__(*args, **kwargs)
+
+        #----------------------------------------------------------------------
+        def defer(self, key, a_callable):
+            """add a key whose value isn't made until it is first looked up.
+            Until then, the key is listed like any other.  Then 'a_callable'
+            is called, with no arguments, to make the value, which is kept.
+
+            parameters:
+                key - a key within this mapping, not of the form 'x.y.z'
+                a_callable - a function that returns the value"""
+            self._key_order.add(key)
+            self.__dict__.pop(key, None)
+            self._deferred[key] = a_callable
+
+        #----------------------------------------------------------------------
+        def __setattr__(self, key, value):
+            self._deferred.pop(key, None)
+            super(DotDictWithDeferredValues, self).__setattr__(key, value)
+
+        #----------------------------------------------------------------------
+        def __getattr__(self, key):
+            try:
+                a_callable = self.__dict__['_deferred'][key]
+            except KeyError:
+                return super(DotDictWithDeferredValues, self).__getattr__(
+                    key
+                )
+            value = a_callable()
+            self.__dict__[key] = value
+            del self._deferred[key]
+            return value
+
+        #----------------------------------------------------------------------
+        def __delattr__(self, key):
+            if key in self._deferred:
+                self._key_order.discard(key)
+                del self._deferred[key]
+                return
+            super(DotDictWithDeferredValues, self).__delattr__(key)
+
+        #----------------------------------------------------------------------
+        def __contains__(self, key):
+            """a deferred key is found without making its value"""
+            namespace, dot, name = key.rpartition('.')
+            if dot:
+                try:
+                    return name in self[namespace]
+                except (KeyError, TypeError):
+                    return False
+            if key in self._deferred:
+                return True
+            return super(DotDictWithDeferredValues, self).__contains__(key)
+
+    DotDictWithDeferredValues.__name__ = 'Deferring%s' % base_class.__name__
+    return DotDictWithDeferredValues
+
+
+#------------------------------------------------------------------------------
+def view_or_copy(a_mapping, obj_hook=DotDict):
+    """return a read-only view of a flat mapping of 'x.y.z' keys if the
+    class 'obj_hook' offers one, otherwise a new instance of 'obj_hook'
+    initialized with the mapping.  Only a class that defines its own 'view'
+    classmethod offers views: a derivative that changes how values are
+    stored, but inherits 'view', would be misrepresented by one."""
+    if 'view' in getattr(obj_hook, '__dict__', ()):
+        return obj_hook.view(a_mapping)
+    return obj_hook(initializer=a_mapping)
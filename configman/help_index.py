@@ -0,0 +1,100 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""An index of the options of a configuration for the output of the 'help'
+option.  It is made in one walk of the option definitions and answers which
+options the help of a topic covers:
+
+    --help             all the options
+    --help=db          the option 'db' or the options within namespace 'db'
+    --help=*.port      the options whose names match the glob
+"""
+
+import bisect
+import fnmatch
+import re
+from operator import attrgetter
+
+from configman.dotdict import DotDict
+from configman.option import Option
+
+# the characters that make a help topic a glob rather than a name
+glob_characters = '*?['
+
+
+#------------------------------------------------------------------------------
+def _options_breadth_first(a_namespace, prefix=''):
+    """a generator of the names, in the form 'x.y.z', and the Options within a
+    set of nested Namespaces, in the order of iteritems_breadth_first"""
+    namespaces = []
+    for key in a_namespace:
+        value = getattr(a_namespace, key)
+        # Options are by far the most common, and the cheapest to test
+        if isinstance(value, Option):
+            yield prefix + key, value
+        elif isinstance(value, DotDict):
+            namespaces.append((prefix + key + '.', value))
+    for a_prefix, a_namespace in namespaces:
+        for an_item in _options_breadth_first(a_namespace, a_prefix):
+            yield an_item
+
+
+#==============================================================================
+class HelpEntry(object):
+    """an option as the help shows it"""
+
+    __slots__ = ('name', 'option', 'is_secret')
+
+    #--------------------------------------------------------------------------
+    def __init__(self, name, an_option):
+        self.name = name
+        self.option = an_option
+        self.is_secret = an_option.secret or 'password' in name.lower()
+
+
+#==============================================================================
+class HelpIndex(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, option_definitions):
+        """parameters:
+            option_definitions - the Namespace of all the options"""
+        # the options that are command line arguments, in the order that
+        # they are taken from the command line
+        self.arguments = []
+        self.entries = []
+        for name, an_option in _options_breadth_first(option_definitions):
+            if an_option.is_argument:
+                self.arguments.append(an_option)
+            self.entries.append(HelpEntry(name, an_option))
+        self.entries.sort(key=attrgetter('name'))
+        self.names = [an_entry.name for an_entry in self.entries]
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.entries)
+
+    #--------------------------------------------------------------------------
+    def select(self, topic=None):
+        """return the entries, sorted by name, that the help of a topic
+        covers.  Without a topic, that is all of them.  A topic with any of
+        the glob_characters selects the names that match it, any other
+        selects the option of that name and the options within the namespace
+        of that name."""
+        if not topic:
+            return self.entries
+        if any(c in topic for c in glob_characters):
+            match = re.compile(fnmatch.translate(topic)).match
+            return [
+                an_entry for an_entry in self.entries if match(an_entry.name)
+            ]
+        start = bisect.bisect_left(self.names, topic)
+        selected = []
+        if start < len(self.names) and self.names[start] == topic:
+            selected.append(self.entries[start])
+        # the names within the namespace sort between 'topic.' and 'topic/'
+        start = bisect.bisect_left(self.names, topic + '.', start)
+        end = bisect.bisect_left(self.names, topic + '/', start)
+        selected.extend(self.entries[start:end])
+        return selected
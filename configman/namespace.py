@@ -4,6 +4,7 @@
 
 from configman.dotdict import DotDict
 from configman.option import Option, Aggregation
+from configman.orderedset import OrderedSet
 
 
 #==============================================================================
@@ -103,3 +104,88 @@ class Namespace(DotDict):
         # the __setattr__ method, this is the only way to actually force a
         # value to become an attribute rather than member of the dict
         object.__setattr__(self, '_reference_value_from', True)
+
+
+#==============================================================================
+class FilteredNamespace(Namespace):
+    """a read-only view of a Namespace for the writers of config files.  It
+    leaves out the blocked keys and the namespaces that are empty without
+    them, and it may mask the values of secret options.  Nothing is copied
+    but the secret options: the keys of a namespace are found the first time
+    it is used and the values are taken from the wrapped Namespace as they
+    are, so writing a large configuration costs no more than walking it."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_namespace, blocked_keys=(), mask_secrets=False,
+                 prefix=''):
+        """parameters:
+            a_namespace - the Namespace to filter
+            blocked_keys - a collection of keys in the form 'x.y.z' to leave
+                           out, along with anything within them
+            mask_secrets - if True, secret options outside of the 'admin'
+                           namespace are replaced by copies with a value of
+                           '*' * 16
+            prefix - the key of 'a_namespace' within the Namespace at the
+                     top, followed by a '.'"""
+        self.__dict__.update(
+            _namespace=a_namespace,
+            _blocked_keys=blocked_keys,
+            _mask_secrets=mask_secrets,
+            _prefix=prefix,
+            _doc=a_namespace._doc,
+            _reference_value_from=a_namespace._reference_value_from,
+        )
+
+    #--------------------------------------------------------------------------
+    @property
+    def _key_order(self):
+        """the keys that are not filtered out.  Finding them puts their
+        values into the __dict__, where the DotDict looks for them."""
+        try:
+            return self.__dict__['_visible_keys']
+        except KeyError:
+            pass
+        visible_keys = OrderedSet()
+        for key in self._namespace:
+            full_key = self._prefix + key
+            if full_key in self._blocked_keys:
+                continue
+            value = getattr(self._namespace, key)
+            if isinstance(value, Namespace):
+                value = FilteredNamespace(
+                    value,
+                    self._blocked_keys,
+                    self._mask_secrets,
+                    full_key + '.'
+                )
+                if not len(value):
+                    continue
+            elif (
+                self._mask_secrets
+                and isinstance(value, Option)
+                and value.secret
+                and not full_key.startswith('admin')
+            ):
+                value = value.copy()
+                value.value = '*' * 16
+                value.from_string_converter = str
+            self.__dict__[key] = value
+            visible_keys.add(key)
+        self.__dict__['_visible_keys'] = visible_keys
+        return visible_keys
+
+    #--------------------------------------------------------------------------
+    def __getattr__(self, key):
+        if key.startswith('__') and key.endswith('__'):
+            raise AttributeError(key)
+        if key not in self._key_order:
+            raise KeyError(key)
+        return self.__dict__[key]
+
+    #--------------------------------------------------------------------------
+    def __setattr__(self, key, value):
+        raise TypeError('a FilteredNamespace is read-only')
+
+    #--------------------------------------------------------------------------
+    def __delattr__(self, key):
+        raise TypeError('a FilteredNamespace is read-only')
@@ -7,6 +7,8 @@ import collections
 from configman.converters import (
     str_to_python_object,
     from_string_converters,
+    converter_for_typed_default,
+    convert_from_string,
     to_str
 )
 from configman.config_exceptions import (
@@ -15,6 +17,19 @@ from configman.config_exceptions import (
 )
 
 
+#------------------------------------------------------------------------------
+def _differs(a_value, another_value):
+    """return True if two values aren't equal.  Comparing arrays, as of
+    numpy, gives an array of the comparisons of their items, which is
+    reduced to the one answer."""
+    differences = a_value != another_value
+    try:
+        return bool(differences)
+    except ValueError:
+        # the truth value of an array of more than one item is ambiguous
+        return bool(differences.any())
+
+
 #==============================================================================
 class Option(object):
     #--------------------------------------------------------------------------
@@ -101,8 +116,10 @@ class Option(object):
 
     #--------------------------------------------------------------------------
     def _deduce_converter(self, default):
+        typed_converter = converter_for_typed_default(default)
+        if typed_converter is not None:
+            return typed_converter
         default_type = type(default)
-
         return from_string_converters.get(
             default_type,
             default_type
@@ -114,11 +131,14 @@ class Option(object):
             val = self.default
         if isinstance(val, basestring):
             try:
-                new_value = self.from_string_converter(val)
-                self.has_changed = new_value != self.value
+                new_value = convert_from_string(
+                    self.from_string_converter,
+                    val
+                )
+                self.has_changed = _differs(new_value, self.value)
                 self.value = new_value
             except TypeError:
-                self.has_changed = val != self.value
+                self.has_changed = _differs(val, self.value)
                 self.value = val
             except ValueError:
                 error_message = "In '%s', '%s' fails to convert '%s'" % (
@@ -128,12 +148,12 @@ class Option(object):
                 )
                 raise CannotConvertError(error_message)
         elif isinstance(val, Option):
-            self.has_changed = val.default != self.value
+            self.has_changed = _differs(val.default, self.value)
             self.value = val.default
         elif isinstance(val, collections.Mapping) and 'default' in val:
             self.set_value(val["default"])
         else:
-            self.has_changed = val != self.value
+            self.has_changed = _differs(val, self.value)
             self.value = val
 
     #--------------------------------------------------------------------------
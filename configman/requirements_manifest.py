@@ -0,0 +1,373 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""A requirements manifest records, for each of a set of classes, the
+options that the class contributes through its 'required_config'.  Given a
+manifest, the ConfigurationManager learns the options of a class option's
+class from the manifest rather than from the class itself, so the module of
+the class isn't imported until the value of the option is used.  Starting an
+app with many plugins, database drivers and the like, only to print its help
+or write its config file, need not import any of them.
+
+A manifest is made from the real classes, so it goes stale when they change.
+It is a json file:
+
+    {
+        "version": 1,
+        "classes": {
+            "<class path>": {<the class's required_config>},
+            ...
+        }
+    }
+
+The required_config of a class is a mapping of names to entries of the
+'kind' 'option', 'aggregation' or 'namespace'.  The entry of an option holds
+its parameters, with the default as a string if it isn't a simple json
+value and with its converters as the names of the functions.
+
+Making and checking a manifest from the command line:
+
+    $ python -m configman.requirements_manifest write app.manifest \\
+          app.plugins.Alpha app.plugins.Beta
+    $ python -m configman.requirements_manifest check app.manifest
+
+Checking prints the classes whose entries no longer match and exits with the
+status 1 if there are any."""
+
+import collections
+import json
+import sys
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
+
+from configman.converters import (
+    str_to_python_object,
+    str_dict_keys,
+    str_quote_stripper,
+    to_str,
+)
+from configman.config_exceptions import CannotConvertError
+from configman.namespace import Namespace
+from configman.option import Option, Aggregation
+
+manifest_version = 1
+
+# the types of default values that are kept as they are, any other default
+# is recorded as a string
+json_types = (type(None), bool, int, long, float, str, unicode)
+
+# the parameters of an Option that are recorded as they are
+option_parameters = (
+    'name',
+    'doc',
+    'short_form',
+    'exclude_from_print_conf',
+    'exclude_from_dump_conf',
+    'is_argument',
+    'likely_to_be_changed',
+    'not_for_definition',
+    'reference_value_from',
+    'secret',
+)
+
+
+#==============================================================================
+class NotRepresentableError(CannotConvertError):
+    """the required_config of a class can't be recorded in a manifest, as
+    with options whose converters can't be found again by name"""
+    pass
+
+
+#------------------------------------------------------------------------------
+def get_required_config(a_class):
+    """return the required_config that a class contributes, or None if it
+    contributes none.  This is the same test that the ConfigurationManager
+    applies during expansion."""
+    try:
+        try:
+            required_config = a_class.get_required_config()
+        except AttributeError:
+            required_config = a_class.required_config
+    except AttributeError:
+        return None
+    if not isinstance(required_config, collections.Mapping):
+        return None
+    return required_config
+
+
+#------------------------------------------------------------------------------
+def is_class_option(an_option):
+    """True if the value of an Option is the class named by a string"""
+    return (
+        isinstance(an_option, Option)
+        and an_option.from_string_converter is str_to_python_object
+    )
+
+
+#------------------------------------------------------------------------------
+def recorded_class_path(an_option, a_manifest):
+    """return the class path in the default of a class option if the
+    manifest records that class, otherwise None"""
+    if (
+        a_manifest is None
+        or not is_class_option(an_option)
+        or not isinstance(an_option.default, basestring)
+    ):
+        return None
+    class_path = str_quote_stripper(an_option.default.strip())
+    if class_path in a_manifest:
+        return class_path
+    return None
+
+
+#------------------------------------------------------------------------------
+def _function_name(a_function):
+    """return the name by which a converter can be found again"""
+    if a_function is None:
+        return None
+    name = to_str(a_function)
+    try:
+        if str_to_python_object(name) is a_function:
+            return name
+    except CannotConvertError:
+        pass
+    raise NotRepresentableError('%r cannot be found by name' % a_function)
+
+
+#------------------------------------------------------------------------------
+def _option_to_entry(an_option):
+    entry = OrderedDict((('kind', 'option'),))
+    for a_parameter in option_parameters:
+        entry[a_parameter] = getattr(an_option, a_parameter)
+    if type(an_option.default) in json_types:
+        entry['default'] = an_option.default
+    else:
+        # as Option.__str__ does for the value
+        try:
+            entry['default'] = an_option.to_string_converter(
+                an_option.default
+            )
+        except TypeError:
+            entry['default'] = to_str(an_option.default)
+    entry['from_string_converter'] = _function_name(
+        an_option.from_string_converter
+    )
+    entry['to_string_converter'] = _function_name(
+        an_option.to_string_converter
+    )
+    return entry
+
+
+#------------------------------------------------------------------------------
+def namespace_to_entries(a_namespace):
+    """return the json ready form of the Options, Aggregations and
+    Namespaces within a Namespace"""
+    entries = OrderedDict()
+    for key, value in a_namespace.iteritems():
+        if isinstance(value, Option):
+            entries[key] = _option_to_entry(value)
+        elif isinstance(value, Aggregation):
+            entries[key] = OrderedDict((
+                ('kind', 'aggregation'),
+                ('function', _function_name(value.function)),
+                ('secret', value.secret),
+            ))
+        elif isinstance(value, collections.Mapping):
+            entries[key] = OrderedDict((
+                ('kind', 'namespace'),
+                ('doc', getattr(value, '_doc', '')),
+                (
+                    'reference_value_from',
+                    getattr(value, '_reference_value_from', False)
+                ),
+                ('items', namespace_to_entries(value)),
+            ))
+    return entries
+
+
+#------------------------------------------------------------------------------
+def namespace_from_entries(entries):
+    """return a Namespace made from the json form of its contents"""
+    a_namespace = Namespace()
+    for key, entry in entries.iteritems():
+        key = str(key)
+        kind = entry['kind']
+        if kind == 'namespace':
+            a_sub_namespace = namespace_from_entries(entry['items'])
+            object.__setattr__(a_sub_namespace, '_doc', entry['doc'])
+            if entry['reference_value_from']:
+                a_sub_namespace.ref_value_namespace()
+            a_namespace[key] = a_sub_namespace
+        elif kind == 'aggregation':
+            a_namespace.add_aggregation(
+                key,
+                entry['function'],
+                entry['secret']
+            )
+        else:
+            parameters = str_dict_keys(entry)
+            del parameters['kind']
+            parameters['name'] = str(parameters['name'])
+            if parameters['to_string_converter'] is not None:
+                parameters['to_string_converter'] = str_to_python_object(
+                    parameters['to_string_converter']
+                )
+            a_namespace[key] = Option(**parameters)
+    return a_namespace
+
+
+#------------------------------------------------------------------------------
+def _class_options_within(entries):
+    """yield the default class paths of the class options in the json
+    form of a Namespace"""
+    for entry in entries.itervalues():
+        if entry['kind'] == 'namespace':
+            for a_class_path in _class_options_within(entry['items']):
+                yield a_class_path
+        elif (
+            entry['kind'] == 'option'
+            and entry['from_string_converter'] == to_str(str_to_python_object)
+            and isinstance(entry['default'], basestring)
+            and entry['default'].strip()
+        ):
+            yield entry['default'].strip()
+
+
+#------------------------------------------------------------------------------
+def make_manifest(class_paths):
+    """return the json ready form of a manifest for the classes named, and
+    for the classes named by the defaults of their class options, and so on.
+    Classes that can't be imported, contribute no required_config or can't
+    be represented are left out.  The ConfigurationManager imports those as
+    it would without a manifest."""
+    classes = OrderedDict()
+    to_do = list(class_paths)
+    seen = set()
+    while to_do:
+        a_class_path = to_do.pop(0)
+        if a_class_path in seen:
+            continue
+        seen.add(a_class_path)
+        try:
+            required_config = get_required_config(
+                str_to_python_object(a_class_path)
+            )
+            if required_config is None:
+                continue
+            entries = namespace_to_entries(required_config)
+        except CannotConvertError:
+            continue
+        classes[a_class_path] = entries
+        to_do.extend(_class_options_within(entries))
+    return OrderedDict((
+        ('version', manifest_version),
+        ('classes', classes),
+    ))
+
+
+#------------------------------------------------------------------------------
+def write_manifest(class_paths, output_stream=sys.stdout):
+    json.dump(make_manifest(class_paths), output_stream, indent=2)
+
+
+#==============================================================================
+class RequirementsManifest(collections.Mapping):
+    """a read-only mapping of class paths to the Namespace of options that
+    each class contributes.  The Namespaces are made on first use."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, manifest):
+        """parameters:
+            manifest - the json form of a manifest, as from 'make_manifest'
+        """
+        if manifest.get('version') != manifest_version:
+            raise ValueError(
+                'unknown manifest version: %r' % manifest.get('version')
+            )
+        self.classes = manifest['classes']
+        self._namespaces = {}
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, class_path):
+        try:
+            return self._namespaces[class_path]
+        except KeyError:
+            a_namespace = namespace_from_entries(self.classes[class_path])
+            self._namespaces[class_path] = a_namespace
+            return a_namespace
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self.classes)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.classes)
+
+
+#------------------------------------------------------------------------------
+def load_manifest(source):
+    """return a RequirementsManifest read from a file name or an open
+    file"""
+    if isinstance(source, basestring):
+        with open(source) as f:
+            return RequirementsManifest(json.load(f))
+    return RequirementsManifest(json.load(source))
+
+
+#------------------------------------------------------------------------------
+def check_manifest(a_manifest):
+    """compare a manifest with the classes that it records and return a
+    mapping of the class paths whose entries don't match to the reason"""
+    mismatches = OrderedDict()
+    for a_class_path, recorded_entries in a_manifest.classes.iteritems():
+        try:
+            required_config = get_required_config(
+                str_to_python_object(a_class_path)
+            )
+        except CannotConvertError, x:
+            mismatches[a_class_path] = 'cannot be imported: %s' % x
+            continue
+        if required_config is None:
+            mismatches[a_class_path] = 'has no required_config'
+            continue
+        try:
+            # a round trip through json, so both sides have the same types
+            actual_entries = json.loads(
+                json.dumps(namespace_to_entries(required_config))
+            )
+        except NotRepresentableError, x:
+            mismatches[a_class_path] = str(x)
+            continue
+        if actual_entries != recorded_entries:
+            mismatches[a_class_path] = 'required_config has changed'
+    return mismatches
+
+
+#------------------------------------------------------------------------------
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) >= 2 and argv[0] == 'write':
+        with open(argv[1], 'w') as f:
+            write_manifest(argv[2:], f)
+        return 0
+    if len(argv) == 2 and argv[0] == 'check':
+        mismatches = check_manifest(load_manifest(argv[1]))
+        for a_class_path, reason in mismatches.iteritems():
+            print '%s: %s' % (a_class_path, reason)
+        return 1 if mismatches else 0
+    print >> sys.stderr, (
+        'usage: requirements_manifest write <manifest> <class path> ...\n'
+        '       requirements_manifest check <manifest>'
+    )
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1120,6 +1120,62 @@ c.string =   from ini
         finally:
             sys.exit = old_sys_exit
 
+    #--------------------------------------------------------------------------
+    def test_help_of_a_topic(self):
+        n = config_manager.Namespace()
+        n.add_option('alpha', default=1)
+        n.add_option('db.host', default='localhost')
+        n.add_option('db.password', default='xyzzy')
+        n.add_option('dbx.port', default=5432)
+        outputs = []
+
+        #======================================================================
+        class RecordingStream(object):
+            def __init__(self):
+                self.writes = []
+
+            def write(self, a_string):
+                self.writes.append(a_string)
+
+        #======================================================================
+        class MyConfigManager(config_manager.ConfigurationManager):
+            def output_summary(inner_self, help_topic=None):
+                outputs.append(RecordingStream())
+                super(MyConfigManager, inner_self).output_summary(
+                    outputs[-1],
+                    help_topic
+                )
+
+        for argv in (
+            ['--help=db', '--alpha=2'],
+            ['--help=*.port'],
+            ['--help'],
+            ['--help=nothing'],
+        ):
+            c = MyConfigManager(
+                n,
+                [getopt],
+                use_admin_controls=True,
+                quit_after_admin=False,
+                argv_source=argv
+            )
+        self.assertEqual(c.get_config().alpha, 1)
+        self.assertEqual(len(outputs), 4)
+        for an_output in outputs:
+            # the help is written with one call
+            self.assertEqual(len(an_output.writes), 1)
+        db, port, everything, nothing = [x.writes[0] for x in outputs]
+        self.assertTrue('--db.host' in db)
+        self.assertTrue('--db.password\n    (default: *********)' in db)
+        self.assertTrue('--dbx.port' not in db)
+        self.assertTrue('--alpha' not in db)
+        self.assertTrue('--dbx.port' in port)
+        self.assertTrue('--db.host' not in port)
+        for name in ('--alpha', '--db.host', '--dbx.port', '--admin.strict'):
+            self.assertTrue(name in everything)
+        self.assertTrue('no options match: nothing' in nothing)
+        self.assertTrue('OPTIONS:' not in nothing)
+
     #--------------------------------------------------------------------------
     def test_write_gets_called(self):
         class MyApp(config_manager.RequiredConfig):
@@ -1451,6 +1507,26 @@ c.string =   from ini
             config_pathname='fred'
         )
 
+    #--------------------------------------------------------------------------
+    def test_dump_conf_of_a_binary_format(self):
+        n = config_manager.Namespace()
+
+        class MyConfigManager(config_manager.ConfigurationManager):
+            def write_conf(inner_self, file_type, opener, skip_keys=None):
+                inner_self.opener_args = opener.args
+                self.assertEqual(file_type, 'cmb')
+
+        c = MyConfigManager(
+            n,
+            [getopt],
+            use_admin_controls=True,
+            use_auto_help=False,
+            quit_after_admin=False,
+            argv_source=['--admin.dump_conf=fred.cmb'],
+            config_pathname='fred'
+        )
+        self.assertEqual(c.opener_args, ('fred.cmb', 'wb'))
+
     #--------------------------------------------------------------------------
     def test_dump_conf_bad_extension(self):
         n = config_manager.Namespace()
@@ -1587,6 +1663,88 @@ c.string =   from ini
         self.assertTrue('salary' in printed)
         self.assertTrue('*' * 16 not in printed)
 
+    #--------------------------------------------------------------------------
+    def test_write_conf_leaves_the_definitions_alone(self):
+        n = config_manager.Namespace()
+        n.add_option('gender', default='Male')
+        n.add_option('salary', default=10000, secret=True)
+        n.add_option('dept.name', default='shipping')
+        c = config_manager.ConfigurationManager(
+            n,
+            [],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[],
+        )
+        admin_controls = list(c.admin_controls_list)
+        outputs = []
+
+        @contextmanager
+        def opener():
+            outputs.append(StringIO())
+            yield outputs[-1]
+
+        c.write_conf('ini', opener, skip_keys=['gender'])
+        c.write_conf('ini', opener, skip_keys=['dept.name'])
+        self.assertEqual(c.admin_controls_list, admin_controls)
+        self.assertTrue('gender' not in outputs[0].getvalue())
+        self.assertTrue('[dept]' in outputs[0].getvalue())
+        self.assertTrue('*' * 16 in outputs[0].getvalue())
+        # the skipped key was not kept for the next write
+        self.assertTrue('gender' in outputs[1].getvalue())
+        self.assertTrue('[dept]' not in outputs[1].getvalue())
+        self.assertTrue('admin' not in outputs[1].getvalue())
+        self.assertEqual(c.option_definitions.salary.value, 10000)
+        self.assertEqual(c.option_definitions.dept.name.value, 'shipping')
+
+    #--------------------------------------------------------------------------
+    def test_write_conf_of_an_unchanged_class_option(self):
+        outputs = []
+
+        @contextmanager
+        def opener():
+            outputs.append(StringIO())
+            yield outputs[-1]
+
+        def make_definitions():
+            n = config_manager.Namespace()
+            n.add_option(
+                'cls',
+                default='decimal.Decimal',
+                from_string_converter='configman.converters.class_converter'
+            )
+            return n
+
+        for values_source_list in ([], [{'cls': 'fractions.Fraction'}]):
+            c = config_manager.ConfigurationManager(
+                make_definitions(),
+                values_source_list,
+                use_admin_controls=True,
+                use_auto_help=False,
+                argv_source=[],
+            )
+            c.write_conf('ini', opener)
+        # unchanged, the option is written commented out, as its default
+        self.assertTrue('#cls=decimal.Decimal' in outputs[0].getvalue())
+        # read back from the file and written again, it is unchanged still
+        ini_file_name = '/tmp/test_unchanged_class_option.ini'
+        try:
+            with open(ini_file_name, 'w') as f:
+                f.write(outputs[0].getvalue())
+            c = config_manager.ConfigurationManager(
+                make_definitions(),
+                [ini_file_name],
+                use_admin_controls=True,
+                use_auto_help=False,
+                argv_source=[],
+            )
+            c.write_conf('ini', opener)
+        finally:
+            os.remove(ini_file_name)
+        self.assertEqual(outputs[2].getvalue(), outputs[0].getvalue())
+        # changed, it is written as an active line
+        self.assertTrue('\ncls=fractions.Fraction' in outputs[1].getvalue())
+
     #--------------------------------------------------------------------------
     def test_dump_conf_some_options_excluded(self):
         n = config_manager.Namespace()
@@ -6,10 +6,28 @@
 import unittest
 import tempfile
 import datetime
+import array
+import os
+import mmap
+import shutil
+import subprocess
+import sys
+from cStringIO import StringIO
 
+from nose.plugins.skip import SkipTest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import configman
 from configman import converters
 from configman import RequiredConfig, Namespace, ConfigurationManager
 from configman.dotdict import DotDict
+from configman.option import Option
+from configman.config_exceptions import CannotConvertError
+from configman.value_sources import for_conf, for_json
 
 
 #==============================================================================
@@ -171,6 +189,46 @@ class TestCase(unittest.TestCase):
         """),
             Foo)
 
+    #--------------------------------------------------------------------------
+    def test_str_to_python_object_cache(self):
+        function = converters.str_to_python_object
+        converters.clear_import_cache()
+        self.assertTrue(
+            function('configman.tests.test_converters.Bar') is Bar
+        )
+        self.assertTrue(function('configman.converters') is converters)
+        self.assertTrue(function('os.path.join') is __import__('os').path.join)
+        self.assertTrue(
+            'configman.tests.test_converters.Bar' in converters._import_cache
+        )
+        # negative lookups are remembered, until the cache is cleared
+        name = 'configman.tests.test_converters.Baz'
+        self.assertRaises(converters.CannotConvertError, function, name)
+        globals()['Baz'] = Bar
+        try:
+            self.assertRaises(converters.CannotConvertError, function, name)
+            converters.clear_import_cache()
+            self.assertTrue(function(name) is Bar)
+        finally:
+            del globals()['Baz']
+            converters.clear_import_cache()
+        self.assertRaises(
+            converters.CannotConvertError,
+            function,
+            'no_such_module_at_all.Thing'
+        )
+        # the cache is bounded
+        original_size = converters.max_import_cache_size
+        converters.max_import_cache_size = 2
+        converters.clear_import_cache()
+        try:
+            for name in ('os', 'sys', 'json'):
+                function(name)
+            self.assertEqual(len(converters._import_cache), 1)
+        finally:
+            converters.max_import_cache_size = original_size
+            converters.clear_import_cache()
+
     #--------------------------------------------------------------------------
     def test_dict_conversions(self):
         d = {
@@ -279,6 +337,45 @@ class TestCase(unittest.TestCase):
                            config[x].kls)
             )
 
+    #--------------------------------------------------------------------------
+    def test_classes_in_namespaces_converter_is_cached(self):
+        converter = converters.classes_in_namespaces_converter()
+        a_class_list = converter(
+            'configman.tests.test_converters.Alpha, '
+            'configman.tests.test_converters.Beta'
+        )
+        # spacing doesn't matter, nor does the converter being made anew
+        self.assertTrue(
+            converters.classes_in_namespaces_converter()(
+                ' configman.tests.test_converters.Alpha,'
+                'configman.tests.test_converters.Beta '
+            ) is a_class_list
+        )
+        self.assertEqual(
+            a_class_list.to_str(),
+            'configman.tests.test_converters.Alpha, '
+            'configman.tests.test_converters.Beta'
+        )
+        # the parameters of the converter do matter
+        for other_converter in (
+            converters.classes_in_namespaces_converter('kls%d'),
+            converters.classes_in_namespaces_converter(
+                name_of_class_option='kls'
+            ),
+            converters.classes_in_namespaces_converter(
+                instantiate_classes=True
+            ),
+        ):
+            self.assertFalse(
+                other_converter(
+                    'configman.tests.test_converters.Alpha, '
+                    'configman.tests.test_converters.Beta'
+                ) is a_class_list
+            )
+        self.assertFalse(
+            converter('configman.tests.test_converters.Alpha') is a_class_list
+        )
+
     #--------------------------------------------------------------------------
     def test_to_str_to_regular_expression(self):
         import re
@@ -367,6 +464,18 @@ class TestCase(unittest.TestCase):
         ))
         self.assertRaises(ValueError, converters.str_to_boolean, 99)
 
+    #--------------------------------------------------------------------------
+    def test_str_to_help_topic(self):
+        function = converters.str_to_help_topic
+        self.assertTrue(function('') is True)
+        self.assertTrue(function('TRUE') is True)
+        self.assertTrue(function("'yes'") is True)
+        self.assertTrue(function('false') is False)
+        self.assertTrue(function('0') is False)
+        self.assertEqual(function('db'), 'db')
+        self.assertEqual(function(' "*.port" '), '*.port')
+        self.assertRaises(ValueError, function, 99)
+
     #--------------------------------------------------------------------------
     def test_arbitrary_object_to_string(self):
         function = converters.py_obj_to_str
@@ -409,6 +518,344 @@ class TestCase(unittest.TestCase):
         from configman import tests as tests_module
         self.assertEqual(function(tests_module), 'configman.tests')
 
+    #--------------------------------------------------------------------------
+    def test_arbitrary_object_to_string_strategy_cache(self):
+        probes = []
+
+        class Named(object):
+            def __init__(self, name):
+                self.__name__ = name
+
+            def __getattr__(self, name):
+                # only called for the attributes that are missing
+                probes.append(name)
+                raise AttributeError(name)
+
+        converters._to_str_strategy_cache.clear()
+        self.assertEqual(
+            converters.arbitrary_object_to_string(Named('fred')),
+            'configman.tests.test_converters.fred'
+        )
+        self.assertTrue('to_str' in probes)
+        del probes[:]
+        self.assertEqual(
+            converters.arbitrary_object_to_string(Named('wilma')),
+            'configman.tests.test_converters.wilma'
+        )
+        # the failed probes were skipped
+        self.assertEqual(probes, [])
+
+        # an object unlike the others of its type still converts
+        a_named = Named('barney')
+        a_named.to_str = lambda: 'betty'
+        self.assertEqual(
+            converters.arbitrary_object_to_string(a_named),
+            'betty'
+        )
+        a_named = Named('pebbles')
+        a_named.a_type = int
+        del a_named.__name__
+        self.assertEqual(
+            converters.arbitrary_object_to_string(a_named),
+            'int'
+        )
+
+        # classes are remembered one by one, not by their type
+        self.assertEqual(
+            converters.arbitrary_object_to_string(Beta),
+            'configman.tests.test_converters.Beta'
+        )
+        a_class_list = converters.classes_in_namespaces_converter()(
+            'configman.tests.test_converters.Beta'
+        )
+        self.assertEqual(
+            converters.arbitrary_object_to_string(a_class_list),
+            'configman.tests.test_converters.Beta'
+        )
+
+        class OldStyle:
+            def to_str(self):
+                return 'old style'
+
+        class OtherOldStyle:
+            pass
+
+        self.assertEqual(
+            converters.arbitrary_object_to_string(OldStyle()),
+            'old style'
+        )
+        self.assertTrue(
+            converters.arbitrary_object_to_string(OtherOldStyle())
+            .startswith('<configman.tests.test_converters.OtherOldStyle')
+        )
+        converters._to_str_strategy_cache.clear()
+
+    #--------------------------------------------------------------------------
+    def test_sorted_tuple(self):
+        a_tuple = converters.SortedTuple([5, 1, 3, 3])
+        self.assertEqual(a_tuple, (1, 3, 3, 5))
+        self.assertTrue(3 in a_tuple)
+        self.assertFalse(4 in a_tuple)
+        self.assertFalse(6 in a_tuple)
+        self.assertEqual(a_tuple.index(5), 3)
+        self.assertRaises(ValueError, a_tuple.index, 0)
+        self.assertEqual(a_tuple.count(3), 2)
+        self.assertEqual(a_tuple.count(4), 0)
+        self.assertFalse(1 in converters.SortedTuple())
+        self.assertEqual(repr(a_tuple), 'SortedTuple((1, 3, 3, 5))')
+
+    #--------------------------------------------------------------------------
+    def test_typed_collection_converters(self):
+        self.assertEqual(
+            converters.str_to_frozenset('a, b,, a'),
+            frozenset(['a', 'b'])
+        )
+        self.assertEqual(
+            converters.str_to_sorted_tuple('9, 10, 8', int),
+            (8, 9, 10)
+        )
+        an_array = converters.str_to_array('1, 2.5')
+        self.assertEqual(an_array.typecode, 'd')
+        self.assertEqual(an_array.tolist(), [1.0, 2.5])
+        self.assertEqual(converters.str_to_array('', 'i').tolist(), [])
+        self.assertRaises(ValueError, converters.str_to_array, '1, x', 'i')
+        self.assertRaises(ValueError, converters.str_to_array, '-1', 'I')
+
+        converter = converters.typed_collection_converter(frozenset, int)
+        self.assertEqual(converter('1, 2'), frozenset([1, 2]))
+        self.assertEqual(converter.__name__, 'str_to_frozenset_of_int')
+        self.assertTrue(
+            converter is converters.typed_collection_converter(frozenset, int)
+        )
+        # it can be found by the name that the json writer records
+        self.assertTrue(
+            converters.str_to_python_object(
+                'configman.converters.str_to_frozenset_of_int'
+            ) is converter
+        )
+        # without being made an attribute of the module
+        self.assertFalse(hasattr(converters, 'str_to_frozenset_of_int'))
+        converter = converters.typed_collection_converter(array.array, 'h')
+        self.assertEqual(converter('1, 2'), array.array('h', [1, 2]))
+
+        self.assertEqual(
+            converters.to_str(frozenset(['b', 'c', 'a'])),
+            'a, b, c'
+        )
+        self.assertEqual(
+            converters.to_str(converters.SortedTuple([2, 1])),
+            '1, 2'
+        )
+        self.assertEqual(converters.to_str(array.array('l', [3, 4])), '3, 4')
+
+    #--------------------------------------------------------------------------
+    def test_converter_cache(self):
+        calls = []
+
+        def a_converter(input_str):
+            calls.append(input_str)
+            if input_str == 'mutable':
+                return [input_str]
+            return input_str.upper()
+
+        a_cache = converters.ConverterCache(a_converter, max_cache_size=2)
+        self.assertEqual(a_cache('a'), 'A')
+        self.assertEqual(a_cache('a'), 'A')
+        self.assertEqual(a_cache(u'a'), u'A')
+        self.assertEqual(calls, ['a', u'a'])
+        # 'a' has been used since it was added and u'a' hasn't, so u'a' is
+        # the one dropped
+        a_cache('b')
+        self.assertEqual(
+            sorted(a_cache._cache.keys()),
+            [(str, 'a'), (str, 'b')]
+        )
+        # the clock has passed 'a', now it goes before 'b', which was used
+        a_cache('b')
+        a_cache('c')
+        self.assertEqual(
+            sorted(a_cache._cache.keys()),
+            [(str, 'b'), (str, 'c')]
+        )
+        # mutable results are never shared
+        self.assertFalse(a_cache('mutable') is a_cache('mutable'))
+        self.assertEqual(
+            a_cache.statistics(),
+            {
+                'hits': 2,
+                'misses': 4,
+                'uncacheable': 2,
+                'hit_rate': 2.0 / 8,
+                'entries': 2,
+            }
+        )
+        a_cache.clear()
+        self.assertEqual(a_cache.statistics()['entries'], 0)
+        self.assertEqual(a_cache.statistics()['hit_rate'], 0.0)
+
+    #--------------------------------------------------------------------------
+    def test_is_immutable(self):
+        for a_value in (
+            None, 1, 2L, 1.5, 'a', u'a', True, datetime.date(2000, 1, 1),
+            (1, ('a', 2.0)), frozenset([1]), converters.SortedTuple([2, 1]),
+            converters.regex_converter('x'),
+        ):
+            self.assertTrue(converters.is_immutable(a_value), a_value)
+        for a_value in (
+            [], {}, (1, []), array.array('l'), DotDict(), object(), Foo,
+        ):
+            self.assertFalse(converters.is_immutable(a_value), a_value)
+
+    #--------------------------------------------------------------------------
+    def test_pure_converters(self):
+        @converters.register_pure_converter
+        def to_pattern(input_str):
+            return converters.regex_converter(input_str)
+        try:
+            first = Option('x', '', from_string_converter=to_pattern)
+            first.set_value('a+')
+            second = Option('y', '', from_string_converter=to_pattern)
+            second.set_value('a+')
+            self.assertTrue(first.value is second.value)
+            statistics = converters.converter_cache_statistics()[
+                'configman.tests.test_converters.to_pattern'
+            ]
+            self.assertEqual(statistics['hits'], 1)
+        finally:
+            del converters._converter_caches[to_pattern]
+        self.assertTrue(
+            converters.regex_converter in converters._converter_caches
+        )
+        # errors aren't cached
+        an_option = Option('z', datetime.datetime(2000, 1, 1))
+        self.assertRaises(CannotConvertError, an_option.set_value, 'junk')
+        self.assertRaises(CannotConvertError, an_option.set_value, 'junk')
+        # int is cheaper than a lookup
+        self.assertFalse(int in converters._converter_caches)
+        self.assertEqual(converters.convert_from_string(int, '17'), 17)
+
+    #--------------------------------------------------------------------------
+    def test_regex_set(self):
+        patterns = [
+            r'^/static/',
+            r'^/api/v\d{1,3}/health$',
+            r'^/(en|fr)/about$',
+            r'(?i)^/ADMIN',
+            r'^(\w+)-\1$',
+            r'^/(?P<year>\d{4})/$',
+            r'^/',
+        ]
+        a_set = converters.RegexSet(patterns)
+        self.assertEqual(len(a_set), 7)
+        self.assertEqual(list(a_set), patterns)
+        self.assertTrue(a_set.compile_seconds >= 0)
+        for a_string, expected in (
+            ('/static/app.js', patterns[0]),
+            ('/api/v12/health', patterns[1]),
+            ('/fr/about', patterns[2]),
+            ('/admin/users', patterns[3]),
+            ('ab-ab', patterns[4]),
+            ('/2014/', patterns[5]),
+            ('/api/v12/health/x', patterns[6]),
+            ('static/', None),
+        ):
+            self.assertEqual(a_set.match(a_string), expected, a_string)
+        self.assertEqual(
+            converters.RegexSet(['b', 'a']).search('xab'),
+            'a'
+        )
+        self.assertEqual(converters.RegexSet([]).match('x'), None)
+        # a conditional group refers to its group by number, it is matched
+        # on its own
+        a_set = converters.RegexSet(['zzz', r'(<)?x(?(1)>|)'])
+        self.assertEqual(a_set.match('<x'), None)
+        self.assertEqual(a_set.match('<x>'), r'(<)?x(?(1)>|)')
+        self.assertEqual(a_set.match('x'), r'(<)?x(?(1)>|)')
+        # anchored patterns are only tried at the beginning of the string,
+        # unless an alternative isn't anchored
+        a_set = converters.RegexSet(['^a', '^b|c', r'^\d+$', 'x$'])
+        for a_string, expected in (
+            ('ab', '^a'),
+            ('ba', '^b|c'),
+            ('ac', '^a'),
+            ('zc', '^b|c'),
+            ('12', r'^\d+$'),
+            ('z12', None),
+            ('zax', 'x$'),
+            ('za', None),
+        ):
+            self.assertEqual(a_set.search(a_string), expected, a_string)
+        # more groups than the re module compiles in one pattern
+        patterns = [r'^/p%d/(\d+)/(x)$' % i for i in range(200)]
+        a_set = converters.RegexSet(patterns)
+        for i in (0, 33, 34, 199):
+            self.assertEqual(a_set.match('/p%d/5/x' % i), patterns[i])
+        # a pattern with as many groups as the re module allows can't be
+        # wrapped in a group of its own, it is matched on its own
+        patterns = ['a', '(x)' * 99, '(y)' * 98, 'b']
+        a_set = converters.RegexSet(patterns)
+        for a_string, expected in (
+            ('x' * 99, patterns[1]),
+            ('y' * 98, patterns[2]),
+            ('b', patterns[3]),
+        ):
+            self.assertEqual(a_set.match(a_string), expected)
+            self.assertEqual(a_set.search(a_string), expected)
+
+    #--------------------------------------------------------------------------
+    def test_regex_set_compiles_each_pattern_once(self):
+        patterns = ['^a', 'b', '^c']
+        compiled = []
+        original_compile = converters.re.compile
+
+        def counting_compile(a_pattern, *args):
+            compiled.append(a_pattern)
+            return original_compile(a_pattern, *args)
+        converters.re.compile = counting_compile
+        try:
+            a_set = converters.RegexSet(patterns)
+            self.assertEqual(compiled, patterns)
+            self.assertEqual(a_set.match('b'), 'b')
+            self.assertEqual(a_set.search('xc'), None)
+            self.assertEqual(a_set.search('xb'), 'b')
+        finally:
+            converters.re.compile = original_compile
+        # only the alternations are compiled besides, as they are needed
+        self.assertEqual(
+            compiled,
+            patterns + ['(^a)|(b)|(^c)', '(^a)|(^c)', '(b)']
+        )
+
+    #--------------------------------------------------------------------------
+    def test_str_to_regex_set(self):
+        function = converters.str_to_regex_set
+        a_set = function(
+            r"'^/api/v\d{1,3}/, (a,b)$, [,x]y, a\,b, ^/static/'"
+        )
+        self.assertEqual(
+            a_set.patterns,
+            (r'^/api/v\d{1,3}/', '(a,b)$', '[,x]y', r'a\,b', '^/static/')
+        )
+        self.assertEqual(a_set.match('a,b'), '(a,b)$')
+        self.assertEqual(a_set.match(',y'), '[,x]y')
+        self.assertEqual(function(converters.to_str(a_set)), a_set)
+        # the commas that would separate patterns are escaped when written
+        a_set = converters.RegexSet(['a,b', '[]]'])
+        self.assertEqual(converters.to_str(a_set), r'a\,b, []]')
+        self.assertEqual(
+            function(converters.to_str(a_set)).match('a,b'),
+            r'a\,b'
+        )
+        self.assertEqual(function('').patterns, ())
+        self.assertRaises(ValueError, function, 'a, (b')
+        self.assertRaises(ValueError, function, 17)
+
+        an_option = Option('skip', default=a_set)
+        self.assertEqual(an_option.from_string_converter, function)
+        an_option.set_value('^/x, ^/y')
+        self.assertEqual(an_option.value.match('/y'), '^/y')
+        self.assertRaises(CannotConvertError, an_option.set_value, '(')
+
     #--------------------------------------------------------------------------
     def test_list_to_str(self):
         function = converters.list_to_str
@@ -490,3 +937,325 @@ class TestCase(unittest.TestCase):
         import re
         r = re.compile('.*')
         self.assertEqual(converters.to_str(r), '.*')
+
+
+#==============================================================================
+class FileReferenceTestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.tmp_dir, 'cert.pem')
+        with open(self.file_name, 'w') as f:
+            f.write('BEGIN CERTIFICATE\nprivate key data\n')
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def test_str_to_file_reference(self):
+        function = converters.str_to_file_reference
+        a_reference = function(" '@file:%s' " % self.file_name)
+        self.assertTrue(isinstance(a_reference, converters.FileReference))
+        self.assertEqual(a_reference.path, self.file_name)
+        self.assertEqual(str(a_reference), '@file:%s' % self.file_name)
+        self.assertEqual(
+            converters.to_str(a_reference),
+            '@file:%s' % self.file_name
+        )
+        self.assertEqual(a_reference, function('@file:%s' % self.file_name))
+        # any other value is the value itself
+        self.assertEqual(function('inline value'), 'inline value')
+        self.assertEqual(
+            function('@file:~/x.pem').path,
+            os.path.expanduser('~/x.pem')
+        )
+        self.assertRaises(ValueError, function, 17)
+
+    #--------------------------------------------------------------------------
+    def test_the_file_is_read_on_first_use(self):
+        missing = converters.str_to_file_reference(
+            '@file:%s' % os.path.join(self.tmp_dir, 'missing')
+        )
+        self.assertTrue(missing)
+        self.assertEqual(
+            missing,
+            converters.FileReference(os.path.join(self.tmp_dir, 'missing'))
+        )
+        self.assertRaises(OSError, getattr, missing, 'data')
+
+        a_reference = converters.FileReference(self.file_name)
+        self.assertEqual(a_reference._data, None)
+        self.assertEqual(
+            a_reference.data,
+            'BEGIN CERTIFICATE\nprivate key data\n'
+        )
+        self.assertTrue(a_reference.data is a_reference.data)
+        self.assertEqual(len(a_reference), 35)
+        self.assertEqual(a_reference[:5], 'BEGIN')
+        self.assertTrue('private key' in a_reference)
+        self.assertEqual(a_reference.splitlines()[1], 'private key data')
+
+        # a changed file is read again
+        with open(self.file_name, 'w') as f:
+            f.write('new stuff')
+        stat = os.stat(self.file_name)
+        os.utime(self.file_name, (stat.st_atime, stat.st_mtime + 10))
+        self.assertEqual(a_reference.data, 'new stuff')
+
+    #--------------------------------------------------------------------------
+    def test_large_files_are_memory_mapped(self):
+        original_threshold = converters.file_reference_mmap_threshold
+        converters.file_reference_mmap_threshold = 10
+        try:
+            a_reference = converters.FileReference(self.file_name)
+            self.assertTrue(isinstance(a_reference.data, mmap.mmap))
+            self.assertEqual(a_reference[:5], 'BEGIN')
+            self.assertTrue('private key' in a_reference)
+            self.assertFalse('public' in a_reference)
+        finally:
+            converters.file_reference_mmap_threshold = original_threshold
+
+    #--------------------------------------------------------------------------
+    def test_contents_are_never_shown(self):
+        n = Namespace()
+        n.add_option(
+            'cert',
+            default='@file:%s' % self.file_name,
+            from_string_converter=converters.str_to_file_reference
+        )
+        n.add_option(
+            'inline',
+            default='@file:%s' % self.file_name,
+            from_string_converter=converters.str_to_file_reference
+        )
+        cm = ConfigurationManager(
+            [n],
+            values_source_list=[{'inline': 'inline stuff'}],
+            argv_source=[],
+            use_auto_help=False
+        )
+        config = cm.get_config()
+        self.assertEqual(config.inline, 'inline stuff')
+        self.assertTrue('private key data' in config.cert.data)
+
+        class FakeLogger(object):
+            def __init__(self):
+                self.log = []
+
+            def info(self, *args):
+                self.log.append(args[0] % args[1:])
+
+        a_logger = FakeLogger()
+        cm.log_config(a_logger)
+        self.assertTrue(
+            'cert: @file:%s' % self.file_name in a_logger.log
+        )
+        s = StringIO()
+        cm.output_summary(s)
+        self.assertTrue(
+            '(default: @file:%s)' % self.file_name in s.getvalue()
+        )
+        for a_value_source in (for_conf, for_json):
+            written = StringIO()
+            cm.write_conf(a_value_source, lambda: ContextStringIO(written))
+            self.assertTrue(self.file_name in written.getvalue())
+            self.assertFalse('private key' in written.getvalue())
+        self.assertFalse('private key' in s.getvalue())
+        self.assertFalse('private key' in ''.join(a_logger.log))
+
+
+#==============================================================================
+class ContextStringIO(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_string_io):
+        self.a_string_io = a_string_io
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self.a_string_io
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        pass
+
+
+#==============================================================================
+class NumpyTestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        if numpy is None:
+            raise SkipTest('numpy is not installed')
+        self.tmp_dir = tempfile.mkdtemp()
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def test_str_to_numpy_array(self):
+        function = converters.str_to_numpy_array
+        an_array = function('1.5, 2, -3e2')
+        self.assertEqual(an_array.dtype, numpy.float64)
+        self.assertEqual(an_array.tolist(), [1.5, 2.0, -300.0])
+        an_array = function("'1, 2'", 'int32')
+        self.assertEqual(an_array.dtype, numpy.int32)
+        self.assertEqual(an_array.tolist(), [1, 2])
+        self.assertEqual(function('').shape, (0,))
+        # nothing is quietly dropped
+        self.assertRaises(ValueError, function, '1, x')
+        self.assertRaises(ValueError, function, '1,,2')
+        self.assertRaises(ValueError, function, '1.5', int)
+        self.assertRaises(ValueError, function, 17)
+
+    #--------------------------------------------------------------------------
+    def test_npy_files_are_memory_mapped(self):
+        file_name = os.path.join(self.tmp_dir, 'weights.npy')
+        numpy.save(file_name, numpy.arange(6, dtype='float32').reshape(2, 3))
+        an_array = converters.str_to_numpy_array(' %s ' % file_name)
+        self.assertTrue(isinstance(an_array, numpy.memmap))
+        self.assertEqual(an_array.shape, (2, 3))
+        self.assertEqual(an_array[1, 2], 5.0)
+        self.assertFalse(an_array.flags.writeable)
+        self.assertEqual(converters.to_str(an_array), file_name)
+        self.assertEqual(
+            converters.numpy_array_to_summary_str(an_array),
+            '%s (shape=(2, 3), dtype=float32)' % file_name
+        )
+        self.assertRaises(
+            ValueError,
+            converters.str_to_numpy_array,
+            os.path.join(self.tmp_dir, 'missing.npy')
+        )
+
+    #--------------------------------------------------------------------------
+    def test_numpy_array_to_str(self):
+        self.assertEqual(
+            converters.to_str(numpy.array([0.1, 2.0, 1e-20])),
+            '0.1, 2.0, 1e-20'
+        )
+        self.assertEqual(
+            converters.to_str(numpy.array([[1, 2], [3, 4]])),
+            '1, 2, 3, 4'
+        )
+        an_array = numpy.array([0.1, 1.0 / 3])
+        self.assertEqual(
+            converters.str_to_numpy_array(converters.to_str(an_array))
+            .tolist(),
+            an_array.tolist()
+        )
+
+    #--------------------------------------------------------------------------
+    def test_numpy_array_option(self):
+        opt = Option('thresholds', default=numpy.array([1, 2], 'int32'))
+        self.assertTrue(
+            opt.from_string_converter is
+            converters.numpy_array_converter('int32')
+        )
+        self.assertEqual(
+            opt.from_string_converter.__name__,
+            'str_to_ndarray_of_int32'
+        )
+        self.assertTrue(
+            converters.str_to_python_object(
+                'configman.converters.str_to_ndarray_of_int32'
+            ) is opt.from_string_converter
+        )
+        self.assertFalse(hasattr(converters, 'str_to_ndarray_of_int32'))
+        opt.set_value('3, 4, 5')
+        self.assertEqual(opt.value.dtype, numpy.int32)
+        self.assertTrue(opt.has_changed is True)
+        opt.set_value(numpy.array([3, 4, 5], 'int32'))
+        self.assertTrue(opt.has_changed is False)
+        self.assertRaises(CannotConvertError, opt.set_value, '3, x')
+
+    #--------------------------------------------------------------------------
+    def test_numpy_array_overlay(self):
+        for overlay, changed in (
+            (numpy.array([1.0, 2.0]), False),
+            (numpy.array([1.0, 3.0]), True),
+        ):
+            n = Namespace()
+            n.add_option('weights', default=numpy.array([1.0, 2.0]))
+            cm = ConfigurationManager(
+                [n],
+                values_source_list=[{'weights': overlay}],
+                argv_source=[],
+                use_auto_help=False
+            )
+            self.assertTrue(
+                cm.option_definitions.weights.has_changed is changed
+            )
+
+    #--------------------------------------------------------------------------
+    def test_help_shows_shape_and_dtype(self):
+        n = Namespace()
+        n.add_option(
+            'weights',
+            default=numpy.zeros(1000),
+            doc='the weights'
+        )
+        cm = ConfigurationManager(
+            [n],
+            values_source_list=[],
+            argv_source=[],
+            use_auto_help=False
+        )
+        s = StringIO()
+        cm.output_summary(s)
+        self.assertTrue(
+            '(default: array(shape=(1000,), dtype=float64))' in s.getvalue()
+        )
+
+    #--------------------------------------------------------------------------
+    def test_without_numpy(self):
+        # as if numpy couldn't be imported
+        sys.modules['numpy'] = None
+        try:
+            self.assertRaises(
+                CannotConvertError,
+                converters.str_to_numpy_array,
+                '1, 2'
+            )
+            self.assertEqual(
+                converters.converter_for_typed_default(numpy.zeros(2)),
+                None
+            )
+        finally:
+            sys.modules['numpy'] = numpy
+
+    #--------------------------------------------------------------------------
+    def test_importing_configman_imports_no_numpy(self):
+        script = (
+            "import sys, configman\n"
+            "from configman import Namespace, ConfigurationManager\n"
+            "n = Namespace()\n"
+            "n.add_option('a', default=1)\n"
+            "ConfigurationManager([n], values_source_list=[],\n"
+            "    argv_source=[], use_auto_help=False).get_config()\n"
+            "print 'numpy' in sys.modules\n"
+            "from configman.converters import str_to_python_object, to_str\n"
+            "import numpy\n"
+            "print to_str(numpy.array([3, 4]))\n"
+            "converter = str_to_python_object(\n"
+            "    'configman.converters.str_to_ndarray_of_int32')\n"
+            "print to_str(converter('1, 2'))\n"
+        )
+        output = subprocess.check_output(
+            [sys.executable, '-c', script],
+            env=dict(
+                os.environ,
+                PYTHONPATH=os.path.dirname(
+                    os.path.dirname(os.path.abspath(configman.__file__))
+                )
+            )
+        )
+        self.assertEqual(output.splitlines(), ['False', '3, 4', '1, 2'])
+        self.assertRaises(
+            CannotConvertError,
+            converters.str_to_python_object,
+            'configman.converters.str_to_ndarray_of_no_such_dtype'
+        )
@@ -37,6 +37,41 @@ class TestCase(unittest.TestCase):
         self.assertRaises(ValueError, function, '2011-02-26T23:10:00.xxx')
         self.assertRaises(ValueError, function, '211-05-32')
         self.assertRaises(ValueError, function, '2011-05-32')
+        self.assertRaises(ValueError, function, '2011-05-04T15:10')
+        self.assertRaises(ValueError, function, '2011-05-04T15:10:00\n')
+        self.assertRaises(ValueError, function, '2011-05-04 15:10:00')
+        self.assertRaises(TypeError, function, 17)
+
+    #--------------------------------------------------------------------------
+    def test_datetime_from_ISO_string_fractions_and_offsets(self):
+        function = datetime_util.datetime_from_ISO_string
+
+        self.assertEqual(
+            function('2011-5-4T3:1:0.5'),
+            datetime.datetime(2011, 5, 4, 3, 1, 0, 500000)
+        )
+        self.assertEqual(function('2011-05-04T15:10:00.000001').microsecond, 1)
+
+        inp = '2011-05-04T15:10:00.666000+05:30'
+        out = function(inp)
+        self.assertEqual(out.isoformat(), inp)
+        self.assertEqual(out.utcoffset(), datetime.timedelta(hours=5.5))
+        self.assertEqual(out.tzname(), '+05:30')
+        self.assertEqual(
+            function('2011-05-04T15:10:00-0800').utcoffset(),
+            datetime.timedelta(hours=-8)
+        )
+        out = function('2011-05-04T15:10:00Z')
+        self.assertEqual(out.utcoffset(), datetime.timedelta(0))
+        self.assertEqual(out.tzname(), 'UTC')
+        self.assertEqual(out, function('2011-05-04T10:10:00-05:00'))
+        # time zones are shared by the datetimes with the same offset
+        self.assertTrue(out.tzinfo is function('2012-01-01T00:00:00Z').tzinfo)
+
+        self.assertRaises(ValueError, function, '2011-05-04T15:10:00+24:00')
+        self.assertRaises(ValueError, function, '2011-05-04T15:10:00+5:30')
+        self.assertRaises(ValueError, function, '2011-05-04T15:10:00.1234567')
+        self.assertRaises(ValueError, function, '2011-05-04Z')
 
     #--------------------------------------------------------------------------
     def test_date_from_ISO_string(self):
@@ -147,3 +182,36 @@ class TestCase(unittest.TestCase):
             datetime.timedelta(seconds=1)
         )
         self.assertRaises(TypeError, function, 10.1)
+        self.assertEqual(
+            function(u'4 03:02:01'),
+            datetime.timedelta(days=4, hours=3, minutes=2, seconds=1)
+        )
+        self.assertEqual(
+            function('-1:30:00'),
+            datetime.timedelta(hours=-1, minutes=30)
+        )
+        self.assertEqual(
+            function('1 25:61:61'),
+            datetime.timedelta(days=2, hours=2, minutes=2, seconds=1)
+        )
+        # more than four parts, the leading ones are ignored
+        self.assertEqual(
+            function('9:1:1:1:01'),
+            datetime.timedelta(days=1, hours=1, minutes=1, seconds=1)
+        )
+        self.assertRaises(ValueError, function, '1::01')
+        self.assertRaises(ValueError, function, '')
+
+    #--------------------------------------------------------------------------
+    def test_str_to_timedelta_round_trip(self):
+        for a_timedelta in (
+            datetime.timedelta(0),
+            datetime.timedelta(seconds=59),
+            datetime.timedelta(days=400, hours=23, minutes=59, seconds=59),
+        ):
+            self.assertEqual(
+                datetime_util.str_to_timedelta(
+                    datetime_util.timedelta_to_str(a_timedelta)
+                ),
+                a_timedelta
+            )
@@ -8,6 +8,10 @@ from configman import (
     option, dotdict, namespace, ConfigurationManager, class_converter
 )
 from configman.def_sources import for_mappings
+from configman.requirements_manifest import (
+    RequirementsManifest,
+    make_manifest,
+)
 
 
 #==============================================================================
@@ -75,3 +79,24 @@ class TestCase(unittest.TestCase):
         )
         self.assertTrue(c.cls is MooseBase)
 
+
+    #--------------------------------------------------------------------------
+    def test_class_options_are_converted_unless_in_the_manifest(self):
+        class_path = 'configman.tests.test_def_for_mappings.MooseBase'
+
+        def make_definitions():
+            n = namespace.Namespace()
+            n.add_option(
+                'cls',
+                default=class_path,
+                from_string_converter=class_converter
+            )
+            return n
+        d = dotdict.DotDict()
+        for_mappings.setup_definitions(make_definitions(), d)
+        self.assertTrue(d.cls.value is MooseBase)
+
+        a_manifest = RequirementsManifest(make_manifest([class_path]))
+        d = dotdict.DotDict()
+        for_mappings.setup_definitions(make_definitions(), d, a_manifest)
+        self.assertEqual(d.cls.value, class_path)
@@ -6,9 +6,13 @@ import unittest
 from configman.dotdict import (
     DotDict,
     DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition,
     iteritems_breadth_first,
     configman_keys,
-    create_key_translating_dot_dict
+    create_key_translating_dot_dict,
+    create_deferring_dot_dict,
+    view_or_copy
 )
 from configman.orderedset import OrderedSet
 from configman import Namespace
@@ -575,3 +579,143 @@ class TestCase(unittest.TestCase):
         self.assertTrue(
             isinstance(d.a_a.b_b, HyphenUnderscoreNamespace)
         )
+
+    #--------------------------------------------------------------------------
+    def test_view(self):
+        source = {
+            'a': 1,
+            'x.b': 2,
+            'x.y.c': 3,
+            'x.y.d': 4,
+        }
+        v = DotDict.view(source)
+        self.assertTrue(isinstance(v, DotDictView))
+        self.assertEqual(v['a'], 1)
+        self.assertEqual(v['x.y.c'], 3)
+        self.assertEqual(v.x.y.d, 4)
+        self.assertEqual(v['x'].b, 2)
+        self.assertTrue(isinstance(v['x.y'], DotDict))
+        # namespaces are built once
+        self.assertTrue(v['x.y'] is v.x.y)
+        self.assertRaises(KeyError, v.__getitem__, 'x.y.z')
+        self.assertRaises(KeyError, getattr, v, 'z')
+        self.assertEqual(v, DotDict(source))
+        self.assertEqual(sorted(v), ['a', 'x'])
+        self.assertEqual(len(v), 2)
+        self.assertEqual(
+            sorted(v.keys_breadth_first()),
+            sorted(DotDict(source).keys_breadth_first())
+        )
+        self.assertEqual(
+            sorted(v.keys_breadth_first(include_dicts=True)),
+            sorted(DotDict(source).keys_breadth_first(include_dicts=True))
+        )
+        # the mapping is neither copied nor changed
+        self.assertTrue(v._source is source)
+        self.assertEqual(len(source), 4)
+
+    #--------------------------------------------------------------------------
+    def test_view_with_acquisition(self):
+        source = {
+            'a': 1,
+            'x.b': 2,
+            'x.y.c': 3,
+        }
+        v = DotDictWithAcquisition.view(source)
+        d = DotDictWithAcquisition(source)
+        self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
+        for key in ('a', 'x.a', 'x.y.a', 'x.y.z.a', 'x.y.b', 'x.y.z.c'):
+            self.assertEqual(v[key], d[key])
+        self.assertEqual(v.x.y.a, 1)
+        self.assertEqual(v.x.y.b, 2)
+        self.assertRaises(KeyError, v.__getitem__, 'x.y.z')
+
+    #--------------------------------------------------------------------------
+    def test_view_with_key_translation(self):
+        HyphenUnderscoreDict = create_key_translating_dot_dict(
+            "HyphenUnderscoreDict",
+            (('-', '_'),)
+        )
+        source = {
+            'a-a.b-b.c-c': 17,
+            'a_a.x-x': 99,
+        }
+        v = HyphenUnderscoreDict.view(source)
+        # translation waits for the first lookup
+        self.assertTrue(v._table is None)
+        self.assertEqual(v['a_a.b_b.c_c'], 17)
+        self.assertEqual(v['a-a.b-b.c-c'], 17)
+        self.assertEqual(v.a_a.x_x, 99)
+        self.assertTrue(isinstance(v.a_a, HyphenUnderscoreDict))
+        self.assertEqual(v.a_a['b-b'].c_c, 17)
+        self.assertEqual(
+            sorted(v.keys_breadth_first()),
+            ['a_a.b_b.c_c', 'a_a.x_x']
+        )
+
+    #--------------------------------------------------------------------------
+    def test_view_or_copy(self):
+        source = {'a': 1, 'x.b': 2}
+        v = view_or_copy(source)
+        self.assertTrue(isinstance(v, DotDictView))
+        v = view_or_copy(source, DotDictWithAcquisition)
+        self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
+
+        # a derivative that doesn't offer its own view gets a copy
+        class UpperCaseValueDotDict(DotDict):
+            def __setattr__(self, key, value):
+                if isinstance(value, basestring):
+                    value = value.upper()
+                super(UpperCaseValueDotDict, self).__setattr__(key, value)
+        v = view_or_copy({'a': 'x', 'y.b': 'z'}, UpperCaseValueDotDict)
+        self.assertTrue(isinstance(v, UpperCaseValueDotDict))
+        self.assertEqual(v.y.b, 'Z')
+        v = view_or_copy(source, Namespace)
+        self.assertTrue(isinstance(v, Namespace))
+
+    #--------------------------------------------------------------------------
+    def test_defer(self):
+        calls = []
+
+        def make_value():
+            calls.append(1)
+            return 'made'
+
+        DeferringDotDict = create_deferring_dot_dict(DotDict)
+        self.assertTrue(DeferringDotDict is create_deferring_dot_dict(DotDict))
+        self.assertFalse(hasattr(DotDict, 'defer'))
+        d = DeferringDotDict()
+        d.a = 1
+        d.defer('b', make_value)
+        self.assertTrue('b' in d)
+        self.assertEqual(list(d), ['a', 'b'])
+        self.assertEqual(len(d), 2)
+        self.assertEqual(calls, [])
+        self.assertEqual(d.b, 'made')
+        self.assertEqual(d['b'], 'made')
+        self.assertEqual(calls, [1])
+        self.assertRaises(KeyError, d.__getattr__, 'c')
+
+        # an assignment replaces a deferred value
+        d.defer('c', make_value)
+        d.c = 'assigned'
+        self.assertEqual(d.c, 'assigned')
+        d.defer('e', make_value)
+        del d.e
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+        self.assertRaises(KeyError, d.__getitem__, 'e')
+        self.assertEqual(calls, [1])
+
+        DeferringDotDictWithAcquisition = create_deferring_dot_dict(
+            DotDictWithAcquisition
+        )
+        d = DeferringDotDictWithAcquisition()
+        d.defer('a', make_value)
+        d.x = DeferringDotDictWithAcquisition()
+        d.x.defer('b', lambda: 'local')
+        self.assertTrue('x.b' in d)
+        self.assertEqual(calls, [1])
+        self.assertEqual(d.x.b, 'local')
+        self.assertEqual(d.x.a, 'made')
+        self.assertEqual(d['x.y.a'], 'made')
+        self.assertEqual(calls, [1, 1])
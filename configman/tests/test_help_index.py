@@ -0,0 +1,69 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+
+from configman.help_index import HelpIndex
+from configman.namespace import Namespace
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        n = Namespace()
+        n.add_option('dba', default=1)
+        n.add_option('db-x', default=2)
+        n.add_option('user_password', default='xyzzy')
+        n.add_option('token', default='t', secret=True)
+        n.add_option('target', default='here', is_argument=True)
+        n.add_option('db.host', default='localhost')
+        n.add_option('db.port', default=5432)
+        n.add_option('db.pool.size', default=5)
+        n.add_option('dbx.port', default=6543)
+        n.add_option('cmd', default=None, is_argument=True)
+        n.add_aggregation('an_aggregation', lambda *args: None)
+        self.index = HelpIndex(n)
+
+    #--------------------------------------------------------------------------
+    def _names(self, topic):
+        return [an_entry.name for an_entry in self.index.select(topic)]
+
+    #--------------------------------------------------------------------------
+    def test_entries(self):
+        self.assertEqual(len(self.index), 10)
+        self.assertEqual(self.index.names, sorted(self.index.names))
+        self.assertEqual(
+            [an_option.name for an_option in self.index.arguments],
+            ['target', 'cmd']
+        )
+        secrets = [
+            an_entry.name for an_entry in self.index.entries
+            if an_entry.is_secret
+        ]
+        self.assertEqual(secrets, ['token', 'user_password'])
+
+    #--------------------------------------------------------------------------
+    def test_select(self):
+        self.assertEqual(self._names(None), self.index.names)
+        self.assertEqual(self._names(''), self.index.names)
+        self.assertEqual(
+            self._names('db'),
+            ['db.host', 'db.pool.size', 'db.port']
+        )
+        self.assertEqual(self._names('dba'), ['dba'])
+        self.assertEqual(self._names('db.pool'), ['db.pool.size'])
+        self.assertEqual(self._names('db.port'), ['db.port'])
+        self.assertEqual(self._names('db-x'), ['db-x'])
+        self.assertEqual(self._names('nothing'), [])
+        self.assertEqual(self._names('zzz'), [])
+        self.assertEqual(self._names('*.port'), ['db.port', 'dbx.port'])
+        self.assertEqual(self._names('db?'), ['dba'])
+        self.assertEqual(self._names('t*'), ['target', 'token'])
+        self.assertEqual(
+            self._names('[cd]*'),
+            ['cmd', 'db-x', 'db.host', 'db.pool.size', 'db.port', 'dba',
+             'dbx.port']
+        )
@@ -9,6 +9,7 @@ import functools
 import configman.config_manager as config_manager
 from configman.datetime_util import datetime_from_ISO_string
 
+from configman.namespace import FilteredNamespace
 from configman.option import Option
 from configman.orderedset import OrderedSet
 
@@ -260,3 +261,38 @@ class TestCase(unittest.TestCase):
             [k for k in d.keys_breadth_first(include_dicts=True)]
         )
 
+
+    #--------------------------------------------------------------------------
+    def test_filtered_namespace(self):
+        n = config_manager.Namespace()
+        n.add_option('a', default=1)
+        n.add_option('password', default='xyzzy', secret=True)
+        n.add_option('admin.password', default='plugh', secret=True)
+        n.add_option('x.y.b', default=2)
+        n.add_option('x.z.c', default=3)
+        n.add_aggregation('g', lambda *args: None)
+        n.namespace('empty')
+
+        f = FilteredNamespace(n, set(['x.z.c', 'g']), mask_secrets=True)
+        self.assertTrue(isinstance(f, config_manager.Namespace))
+        self.assertEqual(
+            list(f.keys_breadth_first(include_dicts=True)),
+            ['a', 'password', 'admin', 'x', 'admin.password', 'x.y', 'x.y.b']
+        )
+        self.assertTrue(f.a is n.a)
+        self.assertTrue(f['x.y.b'] is n.x.y.b)
+        self.assertTrue(f.x.y is f['x.y'])
+        self.assertRaises(KeyError, lambda: f['x.z'])
+        self.assertRaises(KeyError, lambda: f.g)
+        self.assertRaises(KeyError, lambda: f.empty)
+        # secrets are masked in a copy, the original is untouched
+        self.assertEqual(f.password.value, '*' * 16)
+        self.assertEqual(str(f.password), '*' * 16)
+        self.assertEqual(n.password.value, 'xyzzy')
+        self.assertEqual(f.admin.password.value, 'plugh')
+        self.assertRaises(TypeError, setattr, f, 'a', 2)
+        self.assertRaises(TypeError, delattr, f, 'a')
+
+        f = FilteredNamespace(n)
+        self.assertEqual(f.password.value, 'xyzzy')
+        self.assertEqual(len(f), len(n) - 1)
@@ -3,6 +3,7 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from decimal import Decimal
+import array
 import datetime
 import unittest
 import re
@@ -12,6 +13,9 @@ from configman.converters import (
     list_converter,
     timedelta_converter,
     regex_converter,
+    str_to_frozenset,
+    SortedTuple,
+    to_str,
 )
 from configman.datetime_util import (
     datetime_from_ISO_string,
@@ -264,6 +268,52 @@ class TestCase(unittest.TestCase):
         opt.set_value('list, of, things')
         self.assertEqual(opt.value, ['list', 'of', 'things'])
 
+    #--------------------------------------------------------------------------
+    def test_typed_collection_converters_inOption(self):
+        opt = Option('hosts', default=frozenset())
+        self.assertEqual(opt.from_string_converter, str_to_frozenset)
+        opt.set_value('b.example.com, a.example.com')
+        self.assertEqual(
+            opt.value,
+            frozenset(['a.example.com', 'b.example.com'])
+        )
+        self.assertEqual(str(opt), 'a.example.com, b.example.com')
+
+        # the items are converted to the type of the default's items
+        opt = Option('ports', default=frozenset([80]))
+        opt.set_value('443, 8080')
+        self.assertEqual(opt.value, frozenset([443, 8080]))
+        self.assertRaises(CannotConvertError, opt.set_value, '443, https')
+
+        opt = Option('limits', default=SortedTuple([1.5]))
+        opt.set_value('3, 1, 2.5')
+        self.assertEqual(opt.value, (1.0, 2.5, 3.0))
+        self.assertTrue(isinstance(opt.value, SortedTuple))
+        self.assertEqual(
+            Option('limits', default=SortedTuple([1.5])).from_string_converter,
+            opt.from_string_converter
+        )
+
+        for typecode, value in (
+            ('l', '1, -2, 3'),
+            ('B', '0, 255'),
+            ('d', '0.5, 1.0, 2.0'),
+            ('c', 'a, b'),
+        ):
+            opt = Option('numbers', default=array.array(typecode))
+            opt.set_value(value)
+            self.assertTrue(isinstance(opt.value, array.array))
+            self.assertEqual(opt.value.typecode, typecode)
+            self.assertEqual(to_str(opt.value), value)
+            # what is written can be read back
+            self.assertEqual(
+                opt.from_string_converter(str(opt)),
+                opt.value
+            )
+        opt = Option('numbers', default=array.array('B'))
+        self.assertRaises(CannotConvertError, opt.set_value, '256')
+        self.assertRaises(CannotConvertError, opt.set_value, '1.5')
+
     #--------------------------------------------------------------------------
     def test_timedelta_converter_inOption(self):
         one_day = datetime.timedelta(days=1)
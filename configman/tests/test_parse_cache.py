@@ -0,0 +1,130 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import os
+import shutil
+import tempfile
+
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.value_sources import for_configobj
+from configman.value_sources.parse_cache import (
+    ParseCache,
+    parse_cache,
+    flatten,
+)
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        parse_cache.clear()
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        parse_cache.clear()
+
+    #--------------------------------------------------------------------------
+    def _write(self, base_name, contents):
+        file_name = os.path.join(self.tmp_dir, base_name)
+        with open(file_name, 'w') as f:
+            f.write(contents)
+        return file_name
+
+    #--------------------------------------------------------------------------
+    def test_flatten(self):
+        self.assertEqual(
+            flatten({'a': 1, 'b': {'c': 2, 'd': {'e': 3}}}),
+            {'a': 1, 'b.c': 2, 'b.d.e': 3}
+        )
+
+    #--------------------------------------------------------------------------
+    def test_hits_misses_and_clear(self):
+        file_name = self._write('a.conf', 'a=1\n')
+        calls = []
+
+        def parser(path):
+            calls.append(path)
+            return {'a': '1'}
+
+        cache = ParseCache()
+        first = cache.get(file_name, 'conf', parser)
+        second = cache.get(file_name, 'conf', parser)
+        self.assertTrue(first is second)
+        self.assertEqual(calls, [os.path.realpath(file_name)])
+        # the same file as a different format is a different entry
+        cache.get(file_name, 'other', parser)
+        self.assertEqual(
+            cache.statistics(),
+            {'hits': 1, 'misses': 2, 'entries': 2}
+        )
+        cache.clear()
+        self.assertEqual(
+            cache.statistics(),
+            {'hits': 0, 'misses': 0, 'entries': 0}
+        )
+
+    #--------------------------------------------------------------------------
+    def test_changed_file_is_reparsed(self):
+        file_name = self._write('a.conf', 'a=1\n')
+        cache = ParseCache()
+        cache.get(file_name, 'conf', lambda path: {'a': '1'})
+        self._write('a.conf', 'a=100\n')
+        result = cache.get(file_name, 'conf', lambda path: {'a': '100'})
+        self.assertEqual(result, {'a': '100'})
+        self.assertEqual(cache.misses, 2)
+
+    #--------------------------------------------------------------------------
+    def test_parser_errors_are_not_cached(self):
+        file_name = self._write('a.conf', 'a=1\n')
+        cache = ParseCache()
+
+        def bad_parser(path):
+            raise ValueError(path)
+
+        self.assertRaises(ValueError, cache.get, file_name, 'conf', bad_parser)
+        self.assertEqual(len(cache), 0)
+
+    #--------------------------------------------------------------------------
+    def test_shared_across_configuration_managers(self):
+        n = Namespace()
+        n.add_option('a', default=0)
+        n.add_option('b', default='')
+        ini_file_name = self._write('app.ini', 'a=1\n')
+        json_file_name = self._write('app.json', '{"b": "x"}')
+        conf_file_name = self._write('app.conf', 'a=3\n')
+        for i in range(3):
+            config = ConfigurationManager(
+                n,
+                values_source_list=[
+                    ini_file_name,
+                    json_file_name,
+                    conf_file_name
+                ],
+                use_admin_controls=False,
+                use_auto_help=False,
+                argv_source=[]
+            ).get_config()
+            self.assertEqual(config.a, 3)
+            self.assertEqual(config.b, 'x')
+        self.assertEqual(parse_cache.misses, 3)
+        self.assertEqual(parse_cache.hits, 6)
+
+    #--------------------------------------------------------------------------
+    def test_changed_include_invalidates_ini(self):
+        self._write('db.ini', 'host=alpha\n')
+        ini_file_name = self._write('app.ini', '[db]\n+include ./db.ini\n')
+        o = for_configobj.ValueSource(ini_file_name)
+        self.assertEqual(o.get_values(1, True)['db.host'], 'alpha')
+        o = for_configobj.ValueSource(ini_file_name)
+        self.assertEqual(parse_cache.hits, 1)
+        self._write('db.ini', 'host=beta,gamma\n')
+        o = for_configobj.ValueSource(ini_file_name)
+        self.assertEqual(o.get_values(1, True)['db.host'], ['beta', 'gamma'])
+        self.assertEqual(parse_cache.misses, 2)
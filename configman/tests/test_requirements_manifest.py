@@ -0,0 +1,253 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from cStringIO import StringIO
+
+from configman import converters
+from configman.config_manager import ConfigurationManager
+from configman.converters import class_converter
+from configman.namespace import Namespace
+from configman.value_sources import for_json
+from configman.requirements_manifest import (
+    RequirementsManifest,
+    make_manifest,
+    namespace_to_entries,
+    load_manifest,
+    check_manifest,
+    main,
+)
+
+plugin_module_name = 'configman_manifest_test_plugin'
+
+plugin_source = """
+from configman import RequiredConfig, Namespace
+from configman.converters import class_converter
+
+
+class Driver(RequiredConfig):
+    required_config = Namespace()
+    required_config.add_option('host', default='localhost', doc='the host')
+    required_config.add_option('port', default=5432)
+    required_config.add_option('password', default='', secret=True)
+    required_config.namespace('pool', doc='the pool')
+    required_config.pool.add_option('size', default=5)
+    required_config.add_option(
+        'cipher',
+        default='%s.Cipher',
+        from_string_converter=class_converter
+    )
+
+
+class Cipher(RequiredConfig):
+    required_config = Namespace()
+    required_config.add_option('rounds', default=10)
+""" % plugin_module_name
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(
+            os.path.join(self.tmp_dir, '%s.py' % plugin_module_name),
+            'w'
+        ) as f:
+            f.write(plugin_source)
+        sys.path.insert(0, self.tmp_dir)
+        self.manifest = make_manifest(['%s.Driver' % plugin_module_name])
+        self._forget_plugin()
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        sys.path.remove(self.tmp_dir)
+        self._forget_plugin()
+        shutil.rmtree(self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def _forget_plugin(self):
+        sys.modules.pop(plugin_module_name, None)
+        converters.clear_import_cache()
+
+    #--------------------------------------------------------------------------
+    def _definitions(self):
+        n = Namespace()
+        n.add_option(
+            'driver',
+            default='%s.Driver' % plugin_module_name,
+            from_string_converter=class_converter
+        )
+        return n
+
+    #--------------------------------------------------------------------------
+    def test_make_manifest(self):
+        classes = self.manifest['classes']
+        self.assertEqual(
+            list(classes),
+            ['%s.Driver' % plugin_module_name,
+             '%s.Cipher' % plugin_module_name]
+        )
+        driver_entries = classes['%s.Driver' % plugin_module_name]
+        self.assertEqual(driver_entries['port']['default'], 5432)
+        self.assertTrue(driver_entries['password']['secret'])
+        self.assertEqual(driver_entries['pool']['kind'], 'namespace')
+        self.assertEqual(driver_entries['pool']['doc'], 'the pool')
+        self.assertEqual(
+            driver_entries['cipher']['from_string_converter'],
+            'configman.converters.str_to_python_object'
+        )
+
+        # a round trip through json gives back the same options
+        manifest = RequirementsManifest(json.loads(json.dumps(self.manifest)))
+        plugin = __import__(plugin_module_name)
+        for a_class in (plugin.Driver, plugin.Cipher):
+            class_path = '%s.%s' % (plugin_module_name, a_class.__name__)
+            self.assertEqual(
+                json.loads(json.dumps(namespace_to_entries(
+                    manifest[class_path]
+                ))),
+                json.loads(json.dumps(namespace_to_entries(
+                    a_class.get_required_config()
+                )))
+            )
+        self.assertTrue(manifest[class_path] is manifest[class_path])
+
+    #--------------------------------------------------------------------------
+    def test_imports_are_deferred(self):
+        manifest_file_name = os.path.join(self.tmp_dir, 'app.manifest')
+        with open(manifest_file_name, 'w') as f:
+            json.dump(self.manifest, f)
+        cm = ConfigurationManager(
+            [self._definitions()],
+            values_source_list=[{'port': 6543, 'rounds': 20}],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[],
+            requirements_manifest=manifest_file_name
+        )
+        self.assertFalse(plugin_module_name in sys.modules)
+        self.assertEqual(
+            sorted(cm.get_option_names()),
+            ['admin.dump_conf', 'admin.expose_secrets',
+             'admin.print_conf', 'admin.strict', 'cipher', 'driver',
+             'host', 'password', 'pool.size', 'port', 'rounds']
+        )
+
+        # help and writing a config file don't need the classes
+        s = StringIO()
+        cm.output_summary(s)
+        self.assertTrue('(default: %s.Cipher)' % plugin_module_name
+                        in s.getvalue())
+        s = StringIO()
+        cm.write_conf(for_json, lambda: ContextStringIO(s))
+        written = json.loads(s.getvalue())
+        self.assertEqual(written['driver']['default'],
+                         '%s.Driver' % plugin_module_name)
+        self.assertEqual(written['port']['default'], '6543')
+        self.assertFalse(plugin_module_name in sys.modules)
+
+        config = cm.get_config()
+        self.assertFalse(plugin_module_name in sys.modules)
+        self.assertEqual(config.port, 6543)
+        self.assertEqual(config.rounds, 20)
+        self.assertEqual(config.pool.size, 5)
+        self.assertEqual(config.host, 'localhost')
+        self.assertTrue('driver' in list(config))
+        self.assertFalse(plugin_module_name in sys.modules)
+        # looking up the class imports it
+        self.assertEqual(config.driver.__name__, 'Driver')
+        self.assertTrue(plugin_module_name in sys.modules)
+        self.assertTrue(config.driver is config.driver)
+        self.assertTrue(
+            config.cipher is sys.modules[plugin_module_name].Cipher
+        )
+
+    #--------------------------------------------------------------------------
+    def test_classes_not_in_the_manifest(self):
+        manifest = RequirementsManifest({'version': 1, 'classes': {}})
+        config = ConfigurationManager(
+            [self._definitions()],
+            values_source_list=[],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[],
+            requirements_manifest=manifest
+        ).get_config()
+        self.assertTrue(plugin_module_name in sys.modules)
+        self.assertEqual(config.rounds, 10)
+        self.assertTrue(
+            config.driver is sys.modules[plugin_module_name].Driver
+        )
+
+    #--------------------------------------------------------------------------
+    def test_check_manifest(self):
+        manifest = RequirementsManifest(json.loads(json.dumps(self.manifest)))
+        self.assertEqual(check_manifest(manifest), {})
+        manifest.classes['%s.Cipher' % plugin_module_name]['rounds'][
+            'default'
+        ] = 12
+        manifest.classes['%s.Gone' % plugin_module_name] = {}
+        self.assertEqual(
+            check_manifest(manifest),
+            {
+                '%s.Cipher' % plugin_module_name:
+                    'required_config has changed',
+                '%s.Gone' % plugin_module_name:
+                    'cannot be imported: %s.Gone cannot be found'
+                    % plugin_module_name,
+            }
+        )
+
+    #--------------------------------------------------------------------------
+    def test_main(self):
+        manifest_file_name = os.path.join(self.tmp_dir, 'app.manifest')
+        self.assertEqual(
+            main([
+                'write',
+                manifest_file_name,
+                '%s.Driver' % plugin_module_name
+            ]),
+            0
+        )
+        self.assertEqual(len(load_manifest(manifest_file_name)), 2)
+        original_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.assertEqual(main(['check', manifest_file_name]), 0)
+            with open(manifest_file_name) as f:
+                manifest = json.load(f)
+            manifest['classes']['%s.Driver' % plugin_module_name].pop('port')
+            with open(manifest_file_name, 'w') as f:
+                json.dump(manifest, f)
+            self.assertEqual(main(['check', manifest_file_name]), 1)
+            self.assertEqual(
+                sys.stdout.getvalue(),
+                '%s.Driver: required_config has changed\n'
+                % plugin_module_name
+            )
+        finally:
+            sys.stdout = original_stdout
+
+
+#==============================================================================
+class ContextStringIO(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_string_io):
+        self.a_string_io = a_string_io
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self.a_string_io
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        pass
@@ -0,0 +1,188 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import os
+import shutil
+import tempfile
+
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.converters import class_converter
+from configman.value_sources import for_cmb
+from configman.value_sources.for_cmb import (
+    ValueSource,
+    CmbMapping,
+    NotACmbFileError,
+    write_cmb,
+)
+from configman.value_sources.source_exceptions import CantHandleTypeException
+from configman.dotdict import (
+    DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition
+)
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def _write(self, base_name, items):
+        file_name = os.path.join(self.tmp_dir, base_name)
+        with open(file_name, 'wb') as f:
+            write_cmb(items, f)
+        return file_name
+
+    #--------------------------------------------------------------------------
+    def test_typed_values(self):
+        items = {
+            'none': None,
+            'yes': True,
+            'no': False,
+            'int': -17,
+            'long': 2 ** 40,
+            'float': 3.5,
+            'str': 'wilma',
+            'empty': '',
+            'unicode': u'fr\xe9d',
+            'huge': 2 ** 70,
+        }
+        m = CmbMapping(self._write('a.cmb', items.iteritems()))
+        self.assertEqual(len(m), len(items))
+        for key, value in items.iteritems():
+            if key == 'huge':
+                # too big for an int64, it's stored as a string
+                self.assertEqual(m[key], str(value))
+            else:
+                self.assertEqual(m[key], value)
+                self.assertTrue(type(m[key]) is type(value), key)
+
+    #--------------------------------------------------------------------------
+    def test_binary_search(self):
+        items = [
+            ('namespace%d.key%d' % (i % 13, i), i)
+            for i in range(1000)
+        ]
+        m = CmbMapping(self._write('a.cmb', items))
+        for key, value in items:
+            self.assertEqual(m[key], value)
+        self.assertEqual(list(m), sorted(key for key, value in items))
+        for missing in ('', 'a', 'namespace1', 'namespace1.key0', 'zzz'):
+            self.assertRaises(KeyError, m.__getitem__, missing)
+        self.assertTrue(m.is_namespace('namespace1'))
+        self.assertTrue(m.is_namespace(u'namespace12'))
+        self.assertFalse(m.is_namespace('namespace13'))
+        self.assertFalse(m.is_namespace('namespace1.key1'))
+        m = CmbMapping(self._write('b.cmb', []))
+        self.assertEqual(len(m), 0)
+        self.assertRaises(KeyError, m.__getitem__, 'a')
+        self.assertFalse(m.is_namespace('a'))
+
+    #--------------------------------------------------------------------------
+    def test_get_values(self):
+        file_name = self._write(
+            'a.cmb',
+            [('a', 1), ('x.b', 2), ('x.y.c', 'three')]
+        )
+        vs = ValueSource(file_name)
+        v = vs.get_values(None, True)
+        self.assertTrue(isinstance(v, DotDictView))
+        self.assertEqual(v['x.y.c'], 'three')
+        self.assertEqual(v.x.b, 2)
+        self.assertEqual(v, {'a': 1, 'x': {'b': 2, 'y': {'c': 'three'}}})
+        v = vs.get_values(None, True, DotDictWithAcquisition)
+        self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
+        self.assertEqual(v['x.y.a'], 1)
+        self.assertFalse(hasattr(vs, 'always_ignore_mismatches'))
+
+        file_name = self._write(
+            'b.cmb',
+            [('always_ignore_mismatches', True)]
+        )
+        self.assertTrue(ValueSource(file_name).always_ignore_mismatches)
+
+    #--------------------------------------------------------------------------
+    def test_not_a_cmb_file(self):
+        self.assertRaises(CantHandleTypeException, ValueSource, 'a.ini')
+        self.assertRaises(CantHandleTypeException, ValueSource, 17)
+        self.assertRaises(
+            NotACmbFileError,
+            ValueSource,
+            os.path.join(self.tmp_dir, 'missing.cmb')
+        )
+        for base_name, contents in (
+            ('empty.cmb', ''),
+            ('short.cmb', 'CMB'),
+            ('text.cmb', 'a=1\nb=2\n'),
+            ('truncated.cmb', 'CMB\x01\x05\x00\x00\x00'),
+        ):
+            file_name = os.path.join(self.tmp_dir, base_name)
+            with open(file_name, 'wb') as f:
+                f.write(contents)
+            self.assertRaises(NotACmbFileError, ValueSource, file_name)
+
+    #--------------------------------------------------------------------------
+    def test_dump_and_load(self):
+        n = Namespace()
+        n.add_option('a', default=17)
+        n.add_option('b', default='wilma')
+        n.add_option('c', default=True)
+        n.namespace('x')
+        n.x.add_option('d', default=2.5)
+        n.x.add_option('e', default=None)
+        n.x.add_option(
+            'f',
+            default='configman.tests.test_val_for_cmb.TestCase',
+            from_string_converter=class_converter
+        )
+        file_name = os.path.join(self.tmp_dir, 'app.cmb')
+        ConfigurationManager(
+            [n],
+            values_source_list=[{
+                'a': 18,
+                'b': 'fred',
+                'x.d': 0.5,
+                'x.f': 'configman.namespace.Namespace',
+            }],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[]
+        ).dump_conf(file_name)
+        m = CmbMapping(file_name)
+        self.assertEqual(
+            list(m),
+            ['a', 'b', 'c', 'x.d', 'x.e', 'x.f']
+        )
+        self.assertEqual(m['x.f'], 'configman.namespace.Namespace')
+
+        config = ConfigurationManager(
+            [n],
+            values_source_list=[file_name],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[]
+        ).get_config()
+        self.assertEqual(config.a, 18)
+        self.assertEqual(config.b, 'fred')
+        self.assertEqual(config.c, True)
+        self.assertEqual(config.x.d, 0.5)
+        self.assertEqual(config.x.e, None)
+        self.assertTrue(config.x.f is Namespace)
+
+    #--------------------------------------------------------------------------
+    def test_registered(self):
+        from configman.value_sources import file_extension_dispatch
+        self.assertEqual(
+            file_extension_dispatch['cmb'],
+            for_cmb.ValueSource.write
+        )
@@ -4,16 +4,25 @@
 
 import unittest
 import os
+import subprocess
+import sys
 import tempfile
 import contextlib
 from cStringIO import StringIO
 
+import configman
 from configman.datetime_util import datetime_from_ISO_string
 
 from configman.value_sources import for_conf
+from configman.value_sources.parse_cache import parse_cache
 from configman.namespace import Namespace
 from configman.config_manager import ConfigurationManager
-from configman.dotdict import DotDict, DotDictWithAcquisition
+from configman.dotdict import (
+    DotDict,
+    DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition
+)
 
 
 def stringIO_context_wrapper(a_stringIO_instance):
@@ -85,13 +94,92 @@ class TestCase(unittest.TestCase):
             self.assertEqual(o.get_values(2, True), {'limit': '20'})
 
             v = o.get_values(None, True, DotDict)
-            self.assertTrue(isinstance(v, DotDict))
+            self.assertTrue(isinstance(v, DotDictView))
             v = o.get_values(None, None, obj_hook=DotDictWithAcquisition)
-            self.assertTrue(isinstance(v, DotDictWithAcquisition))
+            self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
         finally:
             if os.path.isfile(tmp_filename):
                 os.remove(tmp_filename)
 
+    #--------------------------------------------------------------------------
+    def test_for_conf_continuations_and_whitespace(self):
+        tmp_filename = os.path.join(tempfile.gettempdir(), 'test.conf')
+        with open(tmp_filename, 'w') as f:
+            f.write('# comment\n')
+            f.write('  # indented comment\n')
+            f.write('c.fred = stupid\n')
+            f.write('long=alpha,\n')
+            f.write(' beta,\n')
+            f.write('\tgamma\n')
+            f.write('flag\n')
+            f.write('c.fred=crabby\n')
+        try:
+            for use_mmap in (False, True):
+                parse_cache.clear()
+                o = for_conf.ValueSource(tmp_filename, use_mmap=use_mmap)
+                self.assertEqual(
+                    o.values,
+                    {
+                        'c.fred': 'crabby',
+                        'long': 'alpha,beta,gamma',
+                        'flag': '',
+                    }
+                )
+                v = o.get_values(None, True, DotDict)
+                self.assertEqual(v.c.fred, 'crabby')
+        finally:
+            if os.path.isfile(tmp_filename):
+                os.remove(tmp_filename)
+
+    #--------------------------------------------------------------------------
+    def test_for_conf_mmap_empty_file(self):
+        tmp_filename = os.path.join(tempfile.gettempdir(), 'test.conf')
+        open(tmp_filename, 'w').close()
+        try:
+            parse_cache.clear()
+            o = for_conf.ValueSource(tmp_filename, use_mmap=True)
+            self.assertEqual(o.values, {})
+        finally:
+            if os.path.isfile(tmp_filename):
+                os.remove(tmp_filename)
+
+    #--------------------------------------------------------------------------
+    def test_mmap_is_imported_only_to_map_a_file(self):
+        tmp_filename = os.path.join(tempfile.gettempdir(), 'test.conf')
+        with open(tmp_filename, 'w') as f:
+            f.write('a=1\n')
+        script = (
+            "import sys, configman\n"
+            "from configman.value_sources import for_conf\n"
+            "for_conf.ValueSource(%r, use_mmap=False)\n"
+            "print 'mmap' in sys.modules\n"
+            "for_conf.parse_cache.clear()\n"
+            "for_conf.ValueSource(%r, use_mmap=True)\n"
+            "print 'mmap' in sys.modules\n"
+            % (tmp_filename, tmp_filename)
+        )
+        try:
+            output = subprocess.check_output(
+                [sys.executable, '-c', script],
+                env=dict(
+                    os.environ,
+                    PYTHONPATH=os.path.dirname(
+                        os.path.dirname(os.path.abspath(configman.__file__))
+                    )
+                )
+            )
+        finally:
+            os.remove(tmp_filename)
+        self.assertEqual(output.split(), ['False', 'True'])
+
+    #--------------------------------------------------------------------------
+    def test_parse_conf(self):
+        lines = StringIO('a=1\nb=x\n y\n z\n\n#b=3\nc=\n')
+        self.assertEqual(
+            for_conf.parse_conf(lines),
+            {'a': '1', 'b': 'xyz', 'c': ''}
+        )
+
     #--------------------------------------------------------------------------
     def donttest_for_conf_nested_namespaces(self):
         n = self._some_namespaces()
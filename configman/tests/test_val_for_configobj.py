@@ -14,7 +14,13 @@ from configman.datetime_util import (
 from configman.namespace import Namespace
 from configman.config_manager import ConfigurationManager
 from configman.config_exceptions import NotAnOptionError
-from configman.dotdict import DotDict, DotDictWithAcquisition
+from configman.dotdict import (
+    DotDict,
+    DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition
+)
+from configman.value_sources.parse_cache import flatten
 
 try:
     #from ..value_sources.for_configobj import ValueSource
@@ -92,9 +98,9 @@ foo=bar  # other comment
                 self.assertEqual(o.get_values(3, True), r)
 
                 v = o.get_values(None, True, DotDict)
-                self.assertTrue(isinstance(v, DotDict))
+                self.assertTrue(isinstance(v, DotDictView))
                 v = o.get_values(None, None, obj_hook=DotDictWithAcquisition)
-                self.assertTrue(isinstance(v, DotDictWithAcquisition))
+                self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
 
             finally:
                 if os.path.isfile(tmp_filename):
@@ -395,6 +401,202 @@ bad_option=bar  # other comment
                 if os.path.isfile(ini_file_name):
                     os.remove(ini_file_name)
 
+        #----------------------------------------------------------------------
+        def test_configobj_include_cache(self):
+            for_configobj.ConfigObjWithIncludes.clear_include_cache()
+            tmp_dir = tempfile.mkdtemp()
+            include_file_name = os.path.join(tmp_dir, 'db.ini')
+            ini_file_name = os.path.join(tmp_dir, 'app.ini')
+            try:
+                with open(include_file_name, 'w') as f:
+                    f.write('dbhostname=myserver\n')
+                with open(ini_file_name, 'w') as f:
+                    f.write(
+                        '[source]\n'
+                        '+include ./db.ini\n'
+                        '[destination]\n'
+                        '    +include ./db.ini\n'
+                    )
+                config = for_configobj.ConfigObjWithIncludes(ini_file_name)
+                self.assertEqual(config['source']['dbhostname'], 'myserver')
+                self.assertEqual(
+                    config['destination']['dbhostname'],
+                    'myserver'
+                )
+                # app.ini & db.ini were read, the 2nd db.ini came from cache
+                self.assertEqual(config.include_reads, 2)
+                self.assertEqual(config.include_cache_hits, 1)
+
+                config = for_configobj.ConfigObjWithIncludes(ini_file_name)
+                self.assertEqual(config.include_reads, 0)
+                self.assertEqual(config.include_cache_hits, 3)
+
+                # a change in size invalidates the cached contents
+                with open(include_file_name, 'w') as f:
+                    f.write('dbhostname=otherserver\n')
+                config = for_configobj.ConfigObjWithIncludes(ini_file_name)
+                self.assertEqual(
+                    config['destination']['dbhostname'],
+                    'otherserver'
+                )
+                self.assertEqual(config.include_reads, 1)
+            finally:
+                for_configobj.ConfigObjWithIncludes.clear_include_cache()
+                for a_file_name in (include_file_name, ini_file_name):
+                    if os.path.isfile(a_file_name):
+                        os.remove(a_file_name)
+                os.rmdir(tmp_dir)
+
+        #----------------------------------------------------------------------
+        def test_configobj_include_cache_is_bounded(self):
+            for_configobj.ConfigObjWithIncludes.clear_include_cache()
+            tmp_dir = tempfile.mkdtemp()
+            file_names = [
+                os.path.join(tmp_dir, 'include%d.ini' % i) for i in range(4)
+            ]
+            ini_file_name = os.path.join(tmp_dir, 'app.ini')
+            original_max = (
+                for_configobj.ConfigObjWithIncludes.max_include_cache_size
+            )
+            for_configobj.ConfigObjWithIncludes.max_include_cache_size = 2
+            try:
+                with open(ini_file_name, 'w') as f:
+                    for i, a_file_name in enumerate(file_names):
+                        with open(a_file_name, 'w') as g:
+                            g.write('x%d=%d\n' % (i, i))
+                        f.write('+include %s\n' % a_file_name)
+                config = for_configobj.ConfigObjWithIncludes(ini_file_name)
+                self.assertEqual(config['x3'], '3')
+                self.assertEqual(config.include_reads, 5)
+                self.assertTrue(
+                    len(for_configobj.ConfigObjWithIncludes._include_cache)
+                    <= 2
+                )
+            finally:
+                for_configobj.ConfigObjWithIncludes.max_include_cache_size = (
+                    original_max
+                )
+                for_configobj.ConfigObjWithIncludes.clear_include_cache()
+                for a_file_name in file_names + [ini_file_name]:
+                    if os.path.isfile(a_file_name):
+                        os.remove(a_file_name)
+                os.rmdir(tmp_dir)
+
+        #----------------------------------------------------------------------
+        def test_configobj_include_cycle(self):
+            tmp_dir = tempfile.mkdtemp()
+            a_file_name = os.path.join(tmp_dir, 'a.ini')
+            b_file_name = os.path.join(tmp_dir, 'b.ini')
+            try:
+                with open(a_file_name, 'w') as f:
+                    f.write('x=1\n[b]\n+include ./b.ini\n')
+                with open(b_file_name, 'w') as f:
+                    f.write('y=2\n+include ./a.ini\n')
+                self.assertRaises(
+                    for_configobj.IncludeCycleException,
+                    for_configobj.ConfigObjWithIncludes,
+                    a_file_name
+                )
+                self.assertRaises(
+                    for_configobj.LoadingIniFileFailsException,
+                    for_configobj.ValueSource,
+                    a_file_name
+                )
+            finally:
+                for_configobj.ConfigObjWithIncludes.clear_include_cache()
+                for a_file_name in (a_file_name, b_file_name):
+                    if os.path.isfile(a_file_name):
+                        os.remove(a_file_name)
+                os.rmdir(tmp_dir)
+
+        #----------------------------------------------------------------------
+        def test_native_ini_parser_matches_configobj(self):
+            lines = [
+                '# comment',
+                'a=1',
+                'b = two words ',
+                'c=  x, y ,z',
+                'd="q, r"',
+                "e='secret \"message\"' # comment",
+                'f=x # comment',
+                'g=',
+                'h=a,',
+                'i=b=c',
+                '[s]',
+                'k=v',
+                '    [[t]]  # comment',
+                '    k=w',
+                '[u]',
+                "  k = waspish's",
+            ]
+            expected = flatten(for_configobj.configobj.ConfigObj(lines))
+            result = for_configobj.parse_ini(lines)
+            self.assertEqual(result, expected)
+
+        #----------------------------------------------------------------------
+        def test_native_ini_parser_unsupported_syntax(self):
+            for lines in (
+                ['a="x", "y"'],
+                ["a='''x'''"],
+                ['a=%(b)s', 'b=1'],
+                ['"a"=1'],
+                ['a=,'],
+                ['a=1', 'a=2'],
+                ['a=1', '[a]', 'x=1'],
+                ['[[a]]', 'x=1'],
+                ['[a]]', 'x=1'],
+                ['no value'],
+            ):
+                self.assertRaises(
+                    for_configobj.UnsupportedIniSyntaxException,
+                    for_configobj.parse_ini,
+                    lines
+                )
+
+        #----------------------------------------------------------------------
+        def test_native_ini_parser_value_source(self):
+            tmp_dir = tempfile.mkdtemp()
+            include_file_name = os.path.join(tmp_dir, 'db.ini')
+            ini_file_name = os.path.join(tmp_dir, 'app.ini')
+            try:
+                with open(include_file_name, 'w') as f:
+                    f.write('hosts=alpha, beta\n')
+                with open(ini_file_name, 'w') as f:
+                    f.write('[source]\n+include ./db.ini\n')
+                o = for_configobj.ValueSource(
+                    ini_file_name,
+                    native_parser=True
+                )
+                self.assertEqual(
+                    o.get_values(1, True),
+                    {'source': {'hosts': ['alpha', 'beta']}}
+                )
+                # syntax beyond the native subset falls back to ConfigObj
+                with open(include_file_name, 'w') as f:
+                    f.write('hosts="alpha", "beta, gamma"\n')
+                o = for_configobj.ValueSource(
+                    ini_file_name,
+                    native_parser=True
+                )
+                self.assertEqual(
+                    o.get_values(1, True),
+                    {'source': {'hosts': ['alpha', 'beta, gamma']}}
+                )
+                # errors are still reported by ConfigObj
+                with open(include_file_name, 'w') as f:
+                    f.write('hosts=1\nhosts=2\n')
+                self.assertRaises(
+                    for_configobj.LoadingIniFileFailsException,
+                    for_configobj.ValueSource,
+                    ini_file_name,
+                    native_parser=True
+                )
+            finally:
+                for a_file_name in (include_file_name, ini_file_name):
+                    if os.path.isfile(a_file_name):
+                        os.remove(a_file_name)
+                os.rmdir(tmp_dir)
+
         #----------------------------------------------------------------------
         def test_configobj_includes_outside_a_section(self):
             include_file_name = ''
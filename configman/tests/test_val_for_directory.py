@@ -0,0 +1,118 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.value_sources.for_directory import (
+    ValueSource,
+    FragmentLoadingError,
+    find_fragments,
+)
+from configman.value_sources.parse_cache import parse_cache
+from configman.value_sources.source_exceptions import CantHandleTypeException
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        parse_cache.clear()
+        self._write('10-defaults.json', '{"a": 1, "x": {"b": "json"}}')
+        self._write('20-site.ini', 'b=ini\n[x]\nb=ini\nc=ini\n')
+        self._write('30-local.conf', 'x.c=conf\n')
+        self._write('README', 'not a fragment')
+        self._write('40-notes.txt', 'not a fragment either')
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        parse_cache.clear()
+
+    #--------------------------------------------------------------------------
+    def _write(self, base_name, contents):
+        file_name = os.path.join(self.tmp_dir, base_name)
+        with open(file_name, 'w') as f:
+            f.write(contents)
+        return file_name
+
+    #--------------------------------------------------------------------------
+    def test_find_fragments(self):
+        os.mkdir(os.path.join(self.tmp_dir, '50-subdirectory.ini'))
+        self.assertEqual(
+            [os.path.basename(x) for x in find_fragments(self.tmp_dir)],
+            ['10-defaults.json', '20-site.ini', '30-local.conf']
+        )
+
+    #--------------------------------------------------------------------------
+    def test_merged_in_lexical_order(self):
+        for workers in (None, 1):
+            vs = ValueSource(self.tmp_dir, workers=workers)
+            self.assertEqual(
+                dict(vs.values),
+                {'a': 1, 'b': 'ini', 'x.b': 'ini', 'x.c': 'conf'}
+            )
+            v = vs.get_values(None, True)
+            self.assertEqual(v.x.c, 'conf')
+            self.assertEqual(v['a'], 1)
+
+    #--------------------------------------------------------------------------
+    def test_no_threads_outlive_the_load(self):
+        threads_before = set(threading.enumerate())
+        ValueSource(self.tmp_dir, workers=3)
+        self.assertEqual(set(threading.enumerate()), threads_before)
+
+    #--------------------------------------------------------------------------
+    def test_only_changed_fragments_are_parsed_again(self):
+        ValueSource(self.tmp_dir)
+        self.assertEqual(parse_cache.misses, 3)
+        ValueSource(self.tmp_dir)
+        self.assertEqual(parse_cache.misses, 3)
+        self.assertEqual(parse_cache.hits, 3)
+        # make sure the change is seen even on file systems with coarse
+        # modification times
+        file_name = self._write('30-local.conf', 'x.c=changed\n')
+        os.utime(file_name, (time.time() + 10, time.time() + 10))
+        vs = ValueSource(self.tmp_dir)
+        self.assertEqual(parse_cache.misses, 4)
+        self.assertEqual(vs.values['x.c'], 'changed')
+
+    #--------------------------------------------------------------------------
+    def test_errors(self):
+        self.assertRaises(CantHandleTypeException, ValueSource, 17)
+        self.assertRaises(
+            CantHandleTypeException,
+            ValueSource,
+            os.path.join(self.tmp_dir, '30-local.conf')
+        )
+        self._write('25-broken.json', '{"a": ')
+        self.assertRaises(FragmentLoadingError, ValueSource, self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def test_as_a_value_source(self):
+        n = Namespace()
+        n.add_option('a', default=0)
+        n.add_option('b', default='')
+        n.namespace('x')
+        n.x.add_option('b', default='')
+        n.x.add_option('c', default='')
+        config = ConfigurationManager(
+            [n],
+            values_source_list=[self.tmp_dir],
+            use_admin_controls=False,
+            use_auto_help=False,
+            argv_source=[]
+        ).get_config()
+        self.assertEqual(config.a, 1)
+        self.assertEqual(config.b, 'ini')
+        self.assertEqual(config.x.b, 'ini')
+        self.assertEqual(config.x.c, 'conf')
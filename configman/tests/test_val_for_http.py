@@ -0,0 +1,239 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.value_sources import for_http
+from configman.value_sources.for_http import (
+    ValueSource,
+    ResponseCache,
+    HttpSourceUnavailableError,
+)
+from configman.value_sources.source_exceptions import CantHandleTypeException
+
+
+#==============================================================================
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+#==============================================================================
+class KeyValueRequestHandler(BaseHTTPRequestHandler):
+    """a stand-in for a key/value service, serving the 'namespaces' of its
+    server"""
+    protocol_version = 'HTTP/1.1'
+
+    #--------------------------------------------------------------------------
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.connections.add(self.client_address)
+        namespace = self.path.strip('/')
+        if namespace not in self.server.namespaces:
+            self._respond(404, '')
+            return
+        body = json.dumps(self.server.namespaces[namespace])
+        etag = '"%d"' % hash(body)
+        if self.headers.getheader('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self._respond(304, '')
+            return
+        self._respond(200, body, etag)
+
+    #--------------------------------------------------------------------------
+    def _respond(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    #--------------------------------------------------------------------------
+    def log_message(self, *args):
+        pass
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.cache_directory = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            KeyValueRequestHandler
+        )
+        self.server.namespaces = {
+            '': {'a': 1, 'always_ignore_mismatches': False},
+            'db': {'host': 'alpha', 'pool': {'size': 5}},
+            'cache': {'size': 100},
+            'unused': {'x': 'y'},
+        }
+        self.server.requests = []
+        self.server.connections = set()
+        self.server.not_modified = 0
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/config' % self.server.server_port
+        self.server.namespaces = dict(
+            ('config/%s' % k if k else 'config', v)
+            for k, v in self.server.namespaces.iteritems()
+        )
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        self._stop_server()
+        for_http.connection_pool.clear()
+        shutil.rmtree(self.cache_directory)
+
+    #--------------------------------------------------------------------------
+    def _stop_server(self):
+        if self.server is not None:
+            for_http.connection_pool.clear()
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    #--------------------------------------------------------------------------
+    def _definitions(self):
+        n = Namespace()
+        n.add_option('a', default=0)
+        n.namespace('db')
+        n.db.add_option('host', default='')
+        n.db.add_option('port', default=5432)
+        return n
+
+    #--------------------------------------------------------------------------
+    def test_not_a_url(self):
+        self.assertRaises(CantHandleTypeException, ValueSource, 'a.ini')
+        self.assertRaises(CantHandleTypeException, ValueSource, 17)
+
+    #--------------------------------------------------------------------------
+    def test_fetches_only_needed_namespaces(self):
+        vs = ValueSource(self.url, cache_directory=self.cache_directory)
+        self.assertEqual(self.server.requests, ['/config/'])
+        v = vs.get_values(None, True)
+        self.assertEqual(v['a'], 1)
+        self.assertEqual(v['db.pool.size'], 5)
+        self.assertEqual(v.db.host, 'alpha')
+        self.assertRaises(KeyError, v.__getitem__, 'nothing.here')
+        self.assertEqual(
+            sorted(self.server.requests),
+            ['/config/', '/config/db', '/config/nothing']
+        )
+        # all over the one persistent connection
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertTrue(vs.always_ignore_mismatches)
+
+    #--------------------------------------------------------------------------
+    def test_as_a_value_source(self):
+        config = ConfigurationManager(
+            [self._definitions()],
+            values_source_list=[self.url],
+            use_admin_controls=False,
+            use_auto_help=False,
+            argv_source=[],
+        )
+        # the namespaces of the options are fetched in one batch
+        self.assertEqual(
+            sorted(self.server.requests),
+            ['/config/', '/config/db']
+        )
+        config = config.get_config()
+        self.assertEqual(config.a, 1)
+        self.assertEqual(config.db.host, 'alpha')
+        self.assertEqual(config.db.port, 5432)
+
+    #--------------------------------------------------------------------------
+    def test_conditional_requests_on_warm_start(self):
+        for i in range(2):
+            ValueSource(
+                self.url,
+                cache_directory=self.cache_directory
+            ).get_values(None, True)['db.host']
+        self.assertEqual(self.server.not_modified, 2)
+        self.server.namespaces['config/db']['host'] = 'beta'
+        v = ValueSource(
+            self.url,
+            cache_directory=self.cache_directory
+        ).get_values(None, True)
+        self.assertEqual(v['db.host'], 'beta')
+
+    #--------------------------------------------------------------------------
+    def test_falls_back_to_the_cache(self):
+        ValueSource(
+            self.url,
+            cache_directory=self.cache_directory
+        ).get_values(None, True)['db.host']
+        self._stop_server()
+        vs = ValueSource(self.url, cache_directory=self.cache_directory)
+        v = vs.get_values(None, True)
+        self.assertEqual(v['db.host'], 'alpha')
+        self.assertEqual(v['a'], 1)
+        self.assertEqual(vs.values.stale_namespaces, set(['', 'db']))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertRaises(KeyError, v.__getitem__, 'cache.size')
+            self.assertEqual(len(caught), 1)
+
+    #--------------------------------------------------------------------------
+    def test_unavailable_without_a_cache(self):
+        self._stop_server()
+        self.assertRaises(
+            HttpSourceUnavailableError,
+            ValueSource,
+            self.url,
+            cache_directory=self.cache_directory
+        )
+
+    #--------------------------------------------------------------------------
+    def test_the_default_cache_is_private(self):
+        response_cache = ResponseCache()
+        self.assertTrue(
+            response_cache.directory.endswith('-%d' % os.getuid())
+        )
+        response_cache.put(self.url, None, {'a': 1})
+        self.assertEqual(
+            os.stat(response_cache.directory).st_mode & 0777,
+            0700
+        )
+        self.assertEqual(response_cache.get(self.url), (None, {'a': 1}))
+
+    #--------------------------------------------------------------------------
+    def test_an_untrusted_cache_is_not_used(self):
+        shared_directory = os.path.join(self.cache_directory, 'shared')
+        os.mkdir(shared_directory)
+        os.chmod(shared_directory, 0777)
+        response_cache = ResponseCache(shared_directory)
+        # a planted fallback is not read, and nothing is written there
+        with open(response_cache._file_name(self.url), 'w') as f:
+            json.dump({'etag': None, 'values': {'a': 'planted'}}, f)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(response_cache.get(self.url), None)
+            response_cache.put(self.url + '/db', None, {'host': 'alpha'})
+            self.assertEqual(len(caught), 2)
+        self.assertEqual(len(os.listdir(shared_directory)), 1)
+
+        # nor is a link to a private directory
+        private_directory = os.path.join(self.cache_directory, 'private')
+        os.mkdir(private_directory, 0700)
+        linked_directory = os.path.join(self.cache_directory, 'link')
+        os.symlink(private_directory, linked_directory)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response_cache = ResponseCache(linked_directory)
+            self.assertEqual(response_cache.get(self.url), None)
+            self.assertEqual(len(caught), 1)
@@ -14,7 +14,13 @@ from configman.config_manager import ConfigurationManager
 from configman.datetime_util import datetime_from_ISO_string
 from configman.value_sources import for_json
 from configman.value_sources.for_json import ValueSource
-from configman.dotdict import DotDict, DotDictWithAcquisition
+from configman.value_sources.parse_cache import parse_cache
+from configman.dotdict import (
+    DotDict,
+    DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition
+)
 
 
 #------------------------------------------------------------------------------
@@ -159,11 +165,115 @@ class TestCase(unittest.TestCase):
         try:
             jvs = ValueSource(tmp_filename)
             vals = jvs.get_values(None, True, DotDict)
-            self.assertTrue(isinstance(vals, DotDict))
+            self.assertTrue(isinstance(vals, DotDictView))
             vals = jvs.get_values(None, True, DotDictWithAcquisition)
-            self.assertTrue(isinstance(vals, DotDictWithAcquisition))
+            self.assertTrue(isinstance(vals, DotDictViewWithAcquisition))
             self.assertEqual(vals.d.b, 2)
         finally:
             if os.path.isfile(tmp_filename):
                 os.remove(tmp_filename)
 
+
+    #--------------------------------------------------------------------------
+    def test_lazy_json_mapping(self):
+        text = json.dumps({
+            'a': 1,
+            'svc1': {'x': 'X', 'inner': {'y.z': [1, 2]}},
+            'svc2': {'x': 'other'},
+            'dotted.key': True,
+        })
+        m = for_json.LazyJsonMapping(text)
+        self.assertEqual(sorted(m.keys()), ['a', 'dotted.key', 'svc1', 'svc2'])
+        self.assertEqual(m.decoded_keys(), [])
+        self.assertEqual(m['svc1.x'], 'X')
+        self.assertEqual(m['svc1.inner.y.z'], [1, 2])
+        self.assertEqual(m['dotted.key'], True)
+        self.assertEqual(sorted(m.decoded_keys()), ['dotted.key', 'svc1'])
+        self.assertRaises(KeyError, m.__getitem__, 'svc1.nope')
+        self.assertRaises(KeyError, m.__getitem__, 'a.b')
+        self.assertTrue('svc1.inner' in m)
+        self.assertFalse('svc3' in m)
+        self.assertEqual(
+            sorted(m.keys_breadth_first()),
+            ['a', 'dotted.key', 'svc1.inner.y.z', 'svc1.x', 'svc2.x']
+        )
+        # walking all the keys doesn't retain the undecoded values
+        self.assertTrue('svc2' not in m.decoded_keys())
+
+        self.assertTrue(
+            isinstance(m['svc1.inner'], for_json.LazyJsonMapping)
+        )
+        self.assertEqual(sorted(m['svc1'].decoded_keys()), ['inner', 'x'])
+
+        self.assertEqual(len(for_json.LazyJsonMapping(' {  } ')), 0)
+        for bad_text in ('[1, 2]', '{"a": 1', '{"a" 1}', '{"a": 1} x', '{a}'):
+            self.assertRaises(ValueError, for_json.LazyJsonMapping, bad_text)
+
+    #--------------------------------------------------------------------------
+    def test_lazy_json_mapping_decodes_nothing_to_index(self):
+        text = (
+            '{"a": "x\\"}{[", "b": {"c": [1, {"d": "]}"}], "e": {}},'
+            ' "f": nonsense}'
+        )
+        m = for_json.LazyJsonMapping(text)
+        self.assertEqual(m.decoded_keys(), [])
+        self.assertEqual(m['a'], 'x"}{[')
+        self.assertEqual(m['b.c'], [1, {'d': ']}'}])
+        self.assertEqual(len(m['b.e']), 0)
+        self.assertRaises(ValueError, m.__getitem__, 'f')
+        flat = for_json.FlatLazyJsonMapping(m)
+        self.assertEqual(sorted(flat), ['a', 'b.c', 'f'])
+        self.assertRaises(KeyError, flat.__getitem__, 'b')
+        self.assertTrue(flat.is_namespace('b'))
+        self.assertFalse(flat.is_namespace('b.e'))
+        self.assertFalse(flat.is_namespace('a'))
+
+    #--------------------------------------------------------------------------
+    def test_lazy_json_value_source(self):
+        n = Namespace()
+        n.namespace('svc1')
+        n.svc1.add_option('x', default='')
+        n.svc1.add_option('y', default=0)
+        j = {
+            'always_ignore_mismatches': True,
+            'svc1': {'x': 'from json', 'y': {'default': '17'}},
+            'svc2': {'x': 'never decoded'},
+        }
+        tmp_filename = os.path.join(tempfile.gettempdir(), 'test.json')
+        with open(tmp_filename, 'w') as f:
+            json.dump(j, f)
+        try:
+            parse_cache.clear()
+            jvs = ValueSource(tmp_filename, lazy=True)
+            self.assertTrue(isinstance(jvs.values, for_json.LazyJsonMapping))
+            self.assertTrue(jvs.always_ignore_mismatches)
+            self.assertTrue(jvs.get_values(None, True) is jvs.values)
+            vals = jvs.get_values(None, True, DotDictWithAcquisition)
+            self.assertTrue(isinstance(vals, DotDictViewWithAcquisition))
+            self.assertTrue('svc2' not in jvs.values.decoded_keys())
+            self.assertEqual(vals.svc2.x, 'never decoded')
+            self.assertTrue('svc2' in jvs.values.decoded_keys())
+            self.assertEqual(vals.svc2.always_ignore_mismatches, True)
+
+            parse_cache.clear()
+            threshold = for_json.lazy_decoding_threshold
+            for_json.lazy_decoding_threshold = 0
+            try:
+                cm = ConfigurationManager(
+                    n,
+                    values_source_list=[tmp_filename],
+                    use_admin_controls=True,
+                    use_auto_help=False,
+                    argv_source=[]
+                )
+            finally:
+                for_json.lazy_decoding_threshold = threshold
+            config = cm.get_config()
+            self.assertEqual(config.svc1.x, 'from json')
+            self.assertEqual(config.svc1.y, 17)
+            lazy_values = cm.values_source_list[0].values
+            self.assertTrue(isinstance(lazy_values, for_json.LazyJsonMapping))
+            self.assertTrue('svc2' not in lazy_values.decoded_keys())
+        finally:
+            if os.path.isfile(tmp_filename):
+                os.remove(tmp_filename)
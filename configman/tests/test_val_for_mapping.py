@@ -6,7 +6,11 @@ import unittest
 import os
 
 from configman.value_sources.for_mapping import ValueSource
-from configman.dotdict import DotDict, DotDictWithAcquisition
+from configman.dotdict import (
+    DotDictWithAcquisition,
+    DotDictView,
+    DotDictViewWithAcquisition
+)
 
 #==============================================================================
 class TestCase(unittest.TestCase):
@@ -57,9 +61,9 @@ class TestCase(unittest.TestCase):
         }
         vs = ValueSource(m)
         v = vs.get_values(None, None)
-        self.assertTrue(isinstance(v, DotDict))
+        self.assertTrue(isinstance(v, DotDictView))
         v = vs.get_values(None, None, obj_hook=DotDictWithAcquisition)
-        self.assertTrue(isinstance(v, DotDictWithAcquisition))
+        self.assertTrue(isinstance(v, DotDictViewWithAcquisition))
         self.assertEqual(v.d.b, 2)
 
 
@@ -0,0 +1,298 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+from cStringIO import StringIO
+
+from configman import RequiredConfig
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.converters import class_converter
+from configman.value_sources import for_sqlite
+from configman.value_sources.for_sqlite import (
+    ValueSource,
+    SqliteMapping,
+    NotASqliteDatabaseError,
+    write_rows,
+)
+from configman.value_sources.source_exceptions import CantHandleTypeException
+from configman.dotdict import DotDictWithAcquisition, DotDictView
+
+
+#==============================================================================
+class Alpha(RequiredConfig):
+    required_config = Namespace()
+    required_config.add_option('depth', default=1)
+
+
+#==============================================================================
+class CountingConnection(sqlite3.Connection):
+    """a connection that keeps the statements it has executed"""
+    statements = []
+
+    #--------------------------------------------------------------------------
+    def execute(self, sql, *args):
+        self.statements.append(sql)
+        return super(CountingConnection, self).execute(sql, *args)
+
+
+#==============================================================================
+class CountingNamespace(Namespace):
+    """a namespace that counts the times its keys are listed"""
+    listings = 0
+
+    #--------------------------------------------------------------------------
+    def keys_breadth_first(self, *args, **kwargs):
+        CountingNamespace.listings += 1
+        return super(CountingNamespace, self).keys_breadth_first(
+            *args,
+            **kwargs
+        )
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.tmp_dir, 'values.sqlite')
+        connection = sqlite3.connect(self.file_name)
+        write_rows(
+            connection,
+            [('a', 1), ('x.b', 'shared'), ('x.c', 2.5), ('x.y.d', 'deep')]
+        )
+        write_rows(connection, [('x.b', 'acme b'), ('e', 'acme e')], 'acme')
+        write_rows(connection, [('x.b', 'wile b')], 'wile')
+        connection.close()
+        CountingConnection.statements = []
+
+    #--------------------------------------------------------------------------
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    #--------------------------------------------------------------------------
+    def test_scopes(self):
+        m = SqliteMapping(self.file_name)
+        self.assertEqual(m['x.b'], 'shared')
+        self.assertEqual(m['x.c'], 2.5)
+        self.assertRaises(KeyError, m.__getitem__, 'e')
+        self.assertEqual(list(m), ['a', 'x.b', 'x.c', 'x.y.d'])
+        m = SqliteMapping(self.file_name, 'acme')
+        self.assertEqual(m['x.b'], 'acme b')
+        self.assertEqual(m['e'], 'acme e')
+        self.assertEqual(m['a'], 1)
+        self.assertEqual(list(m), ['a', 'e', 'x.b', 'x.c', 'x.y.d'])
+        self.assertEqual(m['x.b'], 'acme b')
+        for source, expected in (
+            (self.file_name, 'shared'),
+            (self.file_name + '?scope=wile', 'wile b'),
+        ):
+            v = ValueSource(source).get_values(None, True)
+            self.assertTrue(isinstance(v, DotDictView))
+            self.assertEqual(v.x.b, expected)
+        v = ValueSource(
+            self.file_name + '?scope=wile',
+            scope='acme'
+        ).get_values(None, True)
+        self.assertEqual(v['x.b'], 'acme b')
+
+    #--------------------------------------------------------------------------
+    def test_namespaces(self):
+        v = ValueSource(self.file_name).get_values(None, True)
+        self.assertEqual(v.x.y.d, 'deep')
+        self.assertEqual(v['x.y'], {'d': 'deep'})
+        self.assertRaises(KeyError, v.__getitem__, 'x.z')
+        self.assertRaises(KeyError, v.__getitem__, 'x.b.q')
+        m = SqliteMapping(self.file_name)
+        self.assertTrue(m.is_namespace('x'))
+        self.assertTrue(m.is_namespace('x.y'))
+        self.assertFalse(m.is_namespace('x.b'))
+        self.assertFalse(m.is_namespace('w'))
+        v = ValueSource(self.file_name).get_values(
+            None,
+            True,
+            DotDictWithAcquisition
+        )
+        self.assertEqual(v['x.y.a'], 1)
+
+    #--------------------------------------------------------------------------
+    def test_keys_are_fetched_in_batches(self):
+        n = Namespace()
+        n.add_option('a', default=0)
+        n.add_option('e', default='')
+        n.namespace('x')
+        n.x.add_option('b', default='')
+        n.x.add_option('c', default=0.0)
+        n.x.namespace('y')
+        n.x.y.add_option('d', default='')
+        n.add_option(
+            'alpha',
+            default='configman.tests.test_val_for_sqlite.Alpha',
+            from_string_converter=class_converter
+        )
+        original_connect = sqlite3.connect
+        sqlite3.connect = lambda *args, **kwargs: original_connect(
+            factory=CountingConnection,
+            *args,
+            **kwargs
+        )
+        try:
+            config = ConfigurationManager(
+                [n],
+                values_source_list=[self.file_name + '?scope=acme'],
+                use_admin_controls=True,
+                use_auto_help=False,
+                argv_source=[]
+            ).get_config()
+        finally:
+            sqlite3.connect = original_connect
+        self.assertEqual(config.a, 1)
+        self.assertEqual(config.e, 'acme e')
+        self.assertEqual(config.x.b, 'acme b')
+        self.assertEqual(config.x.c, 2.5)
+        self.assertEqual(config.depth, 1)
+        key_queries = [
+            s for s in CountingConnection.statements if 'key IN' in s
+        ]
+        # one for all the options known when the ValueSource was made, and
+        # one for the option that Alpha brought in
+        self.assertEqual(len(key_queries), 2)
+
+    #--------------------------------------------------------------------------
+    def test_option_keys_are_listed_once(self):
+        n = CountingNamespace()
+        n.add_option('a', default=0)
+        n.x = Namespace()
+        n.x.add_option('b', default='')
+
+        class FakeConfigManager(object):
+            option_definitions = n
+        m = SqliteMapping(self.file_name, 'acme', FakeConfigManager())
+        self.assertEqual(m['a'], 1)
+        self.assertTrue(m.is_namespace('x'))
+        self.assertEqual(m['x.b'], 'acme b')
+        self.assertEqual(CountingNamespace.listings, 1)
+        # a key that wasn't defined when they were listed lists them again
+        n.add_option('e', default='')
+        self.assertEqual(m['e'], 'acme e')
+        self.assertEqual(CountingNamespace.listings, 2)
+
+    #--------------------------------------------------------------------------
+    def test_not_a_database(self):
+        self.assertRaises(CantHandleTypeException, ValueSource, 'a.ini')
+        self.assertRaises(CantHandleTypeException, ValueSource, 17)
+        missing = os.path.join(self.tmp_dir, 'missing.sqlite')
+        self.assertRaises(NotASqliteDatabaseError, ValueSource, missing)
+        self.assertFalse(os.path.exists(missing))
+        for base_name, contents in (
+            ('empty.sqlite', ''),
+            ('text.sqlite', 'a=1\nb=2\n' * 100),
+        ):
+            file_name = os.path.join(self.tmp_dir, base_name)
+            with open(file_name, 'w') as f:
+                f.write(contents)
+            self.assertRaises(NotASqliteDatabaseError, ValueSource, file_name)
+
+    #--------------------------------------------------------------------------
+    def test_dump_and_load(self):
+        n = Namespace()
+        n.add_option('a', default=17)
+        n.add_option('b', default='wilma')
+        n.add_option('c', default=True)
+        n.namespace('x')
+        n.x.add_option('d', default=2.5)
+        n.x.add_option('e', default=None)
+        n.x.add_option(
+            'f',
+            default='configman.tests.test_val_for_sqlite.Alpha',
+            from_string_converter=class_converter
+        )
+        file_name = os.path.join(self.tmp_dir, 'app.sqlite')
+        cm = ConfigurationManager(
+            [n],
+            values_source_list=[{'a': 18, 'x.d': 0.5, 'c': False}],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[]
+        )
+        cm.dump_conf(file_name)
+        m = SqliteMapping(file_name)
+        self.assertEqual(
+            list(m),
+            ['a', 'b', 'c', 'x.d', 'x.depth', 'x.e', 'x.f']
+        )
+        self.assertEqual(m['c'], 'False')
+        self.assertEqual(
+            m['x.f'],
+            'configman.tests.test_val_for_sqlite.Alpha'
+        )
+        config = ConfigurationManager(
+            [n],
+            values_source_list=[file_name],
+            use_admin_controls=True,
+            use_auto_help=False,
+            argv_source=[]
+        ).get_config()
+        self.assertEqual(config.a, 18)
+        self.assertEqual(config.b, 'wilma')
+        self.assertEqual(config.c, False)
+        self.assertEqual(config.x.d, 0.5)
+        self.assertEqual(config.x.e, None)
+        self.assertTrue(config.x.f is Alpha)
+
+        # a binary stream is given the database file, even if it is not
+        # a file itself
+        s = BinaryStream()
+        cm.write_conf(for_sqlite, lambda: ContextStringIO(s))
+        copy_name = os.path.join(self.tmp_dir, 'copy.sqlite')
+        with open(copy_name, 'wb') as f:
+            f.write(''.join(s.chunks))
+        self.assertEqual(SqliteMapping(copy_name)['a'], 18)
+
+        # a text stream is given the database as SQL
+        s = StringIO()
+        cm.write_conf(for_sqlite, lambda: ContextStringIO(s))
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(s.getvalue())
+        self.assertEqual(
+            connection.execute(
+                "SELECT value FROM configman_values WHERE key = 'a'"
+            ).fetchall(),
+            [(18,)]
+        )
+
+
+#==============================================================================
+class BinaryStream(object):
+    """a stream, opened for binary writes, that is not a file"""
+    mode = 'wb'
+
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        self.chunks = []
+
+    #--------------------------------------------------------------------------
+    def write(self, data):
+        self.chunks.append(data)
+
+
+#==============================================================================
+class ContextStringIO(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_string_io):
+        self.a_string_io = a_string_io
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        return self.a_string_io
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, *args):
+        pass
@@ -0,0 +1,449 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import unittest
+import contextlib
+import getopt
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+import configman
+from configman.namespace import Namespace
+from configman.config_manager import ConfigurationManager
+from configman.config_file_future_proxy import ConfigFileFutureProxy
+from configman.dotdict import DotDict
+from configman.value_sources import (
+    DispatchByType,
+    type_handler_dispatch,
+    file_extension_dispatch,
+    wrap_with_value_source_api,
+    SourceWithOptions,
+)
+from configman.value_sources.source_exceptions import (
+    NoHandlerForType,
+    AllHandlersFailedException,
+)
+from configman.value_sources import (
+    for_cmb,
+    for_conf,
+    for_configobj,
+    for_directory,
+    for_getopt,
+    for_http,
+    for_json,
+    for_mapping,
+    for_modules,
+    for_sqlite,
+)
+
+
+#==============================================================================
+class ThreadPoolExecutor(object):
+    """the part of the concurrent.futures executor interface used by
+    wrap_with_value_source_api"""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, workers):
+        self.pool = ThreadPool(workers)
+
+    #--------------------------------------------------------------------------
+    def submit(self, fn, *args):
+        a_result = self.pool.apply_async(fn, args)
+        a_result.result = a_result.get
+        return a_result
+
+    #--------------------------------------------------------------------------
+    def shutdown(self):
+        self.pool.close()
+        self.pool.join()
+
+
+#------------------------------------------------------------------------------
+def slow_conf_source(contents, delay):
+    """return a conf value source that takes 'delay' seconds to read"""
+    @contextlib.contextmanager
+    def opener():
+        time.sleep(delay)
+        yield contents.splitlines()
+    return opener
+
+
+#==============================================================================
+class TestCase(unittest.TestCase):
+
+    #--------------------------------------------------------------------------
+    def test_registrations_agree_with_handlers(self):
+        for module_name, can_handle in type_handler_dispatch._registrations:
+            a_handler = type_handler_dispatch.load(module_name)
+            resolved = [
+                type_handler_dispatch._resolve_name(x) for x in can_handle
+            ]
+            self.assertEqual(
+                sorted(id(x) for x in resolved),
+                sorted(id(x) for x in a_handler.can_handle),
+                module_name
+            )
+        expected = {
+            'cmb': for_cmb,
+            'conf': for_conf,
+            'ini': for_configobj,
+            'json': for_json,
+            'py': for_modules,
+            'sqlite': for_sqlite,
+        }
+        self.assertEqual(sorted(file_extension_dispatch), sorted(expected))
+        for extension, a_handler in expected.iteritems():
+            self.assertEqual(extension, a_handler.file_name_extension)
+            self.assertEqual(
+                file_extension_dispatch[extension],
+                a_handler.ValueSource.write
+            )
+
+    #--------------------------------------------------------------------------
+    def test_get_handlers(self):
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers(os.environ)),
+            [for_mapping]
+        )
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers(DotDict())),
+            [for_mapping]
+        )
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers(getopt)),
+            [for_getopt, for_modules]
+        )
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers(['--a=1'])),
+            [for_getopt]
+        )
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers('app.ini')),
+            [
+                for_json,
+                for_conf,
+                for_configobj,
+                for_modules,
+            ]
+        )
+        # only an existing directory is offered to for_directory
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers(
+                os.path.dirname(__file__)
+            ))[-1],
+            for_directory
+        )
+        # the binary formats are only tried for their own file names
+        self.assertTrue(
+            for_cmb in type_handler_dispatch.get_handlers('app.cmb')
+        )
+        self.assertTrue(
+            for_sqlite in type_handler_dispatch.get_handlers(
+                'app.sqlite?scope=x'
+            )
+        )
+        # and the service only for URLs
+        self.assertEqual(
+            list(type_handler_dispatch.get_handlers('http://host/config'))[0],
+            for_http
+        )
+        self.assertRaises(
+            NoHandlerForType,
+            type_handler_dispatch.get_handlers,
+            17
+        )
+
+    #--------------------------------------------------------------------------
+    def test_text_writers_write_once(self):
+        n = Namespace()
+        n.add_option('a', default=1, doc='the a')
+        n.add_option('b', default='x, y')
+        n.namespace('c', doc='the c')
+        n.c.add_option('d', default=2.5)
+        n.c.namespace('e')
+        n.c.e.add_option('f', default='configman.dotdict.DotDict')
+        n.namespace('empty')
+
+        #======================================================================
+        class RecordingStream(object):
+            def __init__(self):
+                self.writes = []
+
+            def write(self, a_string):
+                self.writes.append(a_string)
+
+        written = {}
+        for a_handler in (for_conf, for_configobj, for_json, for_modules):
+            written[a_handler] = output_stream = RecordingStream()
+            a_handler.ValueSource.write(n, output_stream=output_stream)
+            self.assertEqual(len(output_stream.writes), 1)
+            self.assertEqual(
+                output_stream.writes[0],
+                ''.join(a_handler.ValueSource.emit(n))
+            )
+        self.assertEqual(
+            set(for_json.json.loads(written[for_json].writes[0])),
+            set(['a', 'b', 'c'])
+        )
+
+    #--------------------------------------------------------------------------
+    def test_handlers_by_name_are_loaded_lazily(self):
+        dispatch = DispatchByType()
+        dispatch.register(
+            'configman.tests.no_such_module',
+            ('__builtin__.int',)
+        )
+        dispatch.register(
+            'configman.value_sources.for_mapping',
+            ('collections.Mapping', '__builtin__.int')
+        )
+        dispatch.register(
+            'configman.tests.no_such_module',
+            ('some_module_never_imported.SomeType',)
+        )
+        self.assertEqual(
+            list(dispatch.get_handler_names(17)),
+            [
+                'configman.tests.no_such_module',
+                'configman.value_sources.for_mapping'
+            ]
+        )
+        # the type is only worked out once
+        self.assertTrue(int in dispatch._type_cache)
+        handlers = dispatch.iter_handlers({})
+        self.assertTrue(next(handlers) is for_mapping)
+        handlers = dispatch.iter_handlers(17)
+        self.assertRaises(ImportError, next, handlers)
+        self.assertEqual(
+            dispatch._pending_names,
+            [(
+                'some_module_never_imported.SomeType',
+                'configman.tests.no_such_module'
+            )]
+        )
+
+    #--------------------------------------------------------------------------
+    def test_dispatch_from_many_threads(self):
+        dispatch = DispatchByType()
+        dispatch.register(
+            'configman.value_sources.for_mapping',
+            ('collections.Mapping',)
+        )
+        mapping_types = [
+            type('Mapping%d' % i, (dict,), {}) for i in range(50)
+        ]
+        results = []
+
+        def dispatch_them_all():
+            for a_type in mapping_types:
+                results.append(list(dispatch.iter_handlers(a_type())))
+
+        threads = [
+            threading.Thread(target=dispatch_them_all) for i in range(8)
+        ]
+        for a_thread in threads:
+            a_thread.start()
+        for a_thread in threads:
+            a_thread.join()
+        self.assertEqual(results, [[for_mapping]] * 400)
+        self.assertEqual(len(dispatch._type_cache), 50)
+
+    #--------------------------------------------------------------------------
+    def test_importing_configman_imports_no_file_formats(self):
+        script = (
+            "import sys, configman\n"
+            "print sorted(m for m in sys.modules if m == 'configobj' or "
+            "m.startswith('configman.value_sources.for_'))\n"
+        )
+        output = subprocess.check_output(
+            [sys.executable, '-c', script],
+            env=dict(
+                os.environ,
+                PYTHONPATH=os.path.dirname(
+                    os.path.dirname(os.path.abspath(configman.__file__))
+                )
+            )
+        )
+        self.assertEqual(
+            output.strip(),
+            "['configman.value_sources.for_getopt']"
+        )
+
+    #--------------------------------------------------------------------------
+    def test_an_ini_source_imports_no_other_formats(self):
+        tmp_dir = tempfile.mkdtemp()
+        ini_file_name = os.path.join(tmp_dir, 'app.ini')
+        with open(ini_file_name, 'w') as f:
+            f.write('a=2\n')
+        script = (
+            "import sys\n"
+            "from configman import Namespace, ConfigurationManager\n"
+            "n = Namespace()\n"
+            "n.add_option('a', default=1)\n"
+            "ConfigurationManager([n], values_source_list=[%r],\n"
+            "    argv_source=[], use_auto_help=False).get_config()\n"
+            "print sorted(m for m in ('httplib', 'sqlite3',\n"
+            "    'configman.value_sources.for_cmb',\n"
+            "    'configman.value_sources.for_http',\n"
+            "    'configman.value_sources.for_sqlite') if m in sys.modules)\n"
+            % ini_file_name
+        )
+        try:
+            output = subprocess.check_output(
+                [sys.executable, '-c', script],
+                env=dict(
+                    os.environ,
+                    PYTHONPATH=os.path.dirname(
+                        os.path.dirname(os.path.abspath(configman.__file__))
+                    )
+                )
+            )
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertEqual(output.strip(), '[]')
+
+    #--------------------------------------------------------------------------
+    def test_wrap_with_an_executor(self):
+        executor = ThreadPoolExecutor(4)
+        sources = [
+            slow_conf_source('a=%d' % i, 0.2)
+            for i in range(4)
+        ]
+        sources.insert(2, None)  # degenerate sources are still dropped
+        sources.append({'a': 'mapping'})
+        start = time.time()
+        try:
+            wrapped = wrap_with_value_source_api(
+                sources,
+                None,
+                executor=executor
+            )
+        finally:
+            executor.shutdown()
+        self.assertTrue(time.time() - start < 0.6)
+        self.assertEqual(
+            [x.get_values(None, True)['a'] for x in wrapped],
+            ['0', '1', '2', '3', 'mapping']
+        )
+        self.assertTrue(isinstance(wrapped[-1], for_mapping.ValueSource))
+
+    #--------------------------------------------------------------------------
+    def test_failures_with_an_executor(self):
+        executor = ThreadPoolExecutor(4)
+        sources = [
+            {'a': 1},
+            'no_such_file.ini',
+            'no_such_module.no_such_class',
+        ]
+        errors = []
+        try:
+            for an_executor in (None, executor):
+                try:
+                    wrap_with_value_source_api(
+                        sources,
+                        None,
+                        executor=an_executor
+                    )
+                except AllHandlersFailedException, x:
+                    errors.append(str(x))
+            self.assertEqual(len(errors), 2)
+            self.assertEqual(errors[0], errors[1])
+            self.assertTrue('no_such_file.ini' in errors[0])
+            self.assertRaises(
+                NoHandlerForType,
+                wrap_with_value_source_api,
+                [{'a': 1}, 17],
+                None,
+                executor=executor
+            )
+        finally:
+            executor.shutdown()
+
+    #--------------------------------------------------------------------------
+    def test_configuration_manager_with_an_executor(self):
+        n = Namespace()
+        n.add_option('a', default=0)
+        executor = ThreadPoolExecutor(2)
+        try:
+            config = ConfigurationManager(
+                [n],
+                values_source_list=[
+                    slow_conf_source('a=1', 0),
+                    {'a': 2},
+                    slow_conf_source('a=3', 0.05),
+                ],
+                use_admin_controls=False,
+                use_auto_help=False,
+                argv_source=[],
+                value_source_executor=executor
+            ).get_config()
+        finally:
+            executor.shutdown()
+        self.assertEqual(config.a, 3)
+
+    #--------------------------------------------------------------------------
+    def test_options_for_one_source(self):
+        tmp_dir = tempfile.mkdtemp()
+        json_filename = os.path.join(tmp_dir, 'app.json')
+        with open(json_filename, 'w') as f:
+            f.write('{"a": 1}')
+        try:
+            lazy_source, eager_source = wrap_with_value_source_api(
+                [
+                    SourceWithOptions(json_filename, lazy=True),
+                    SourceWithOptions(json_filename, lazy=False),
+                ],
+                None
+            )
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertTrue(
+            isinstance(lazy_source.values, for_json.LazyJsonMapping)
+        )
+        self.assertFalse(
+            isinstance(eager_source.values, for_json.LazyJsonMapping)
+        )
+        self.assertEqual(lazy_source.values['a'], 1)
+        self.assertEqual(eager_source.values['a'], 1)
+
+    #--------------------------------------------------------------------------
+    def test_options_no_handler_takes(self):
+        self.assertRaises(
+            NoHandlerForType,
+            wrap_with_value_source_api,
+            [SourceWithOptions({'a': 1}, lazy=True)],
+            None
+        )
+
+    #--------------------------------------------------------------------------
+    def test_options_for_the_config_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        ini_filename = os.path.join(tmp_dir, 'app.ini')
+        with open(ini_filename, 'w') as f:
+            f.write('a=3\n')
+        n = Namespace()
+        n.add_option('a', default=0)
+        try:
+            cm = ConfigurationManager(
+                [n],
+                values_source_list=[
+                    SourceWithOptions(
+                        ConfigFileFutureProxy,
+                        native_parser=True
+                    ),
+                ],
+                argv_source=['--admin.conf=%s' % ini_filename],
+                use_auto_help=False,
+            )
+            config = cm.get_config()
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertTrue('admin.conf' in cm.option_definitions)
+        self.assertEqual(config.a, 3)
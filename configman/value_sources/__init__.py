@@ -5,6 +5,15 @@
 import collections
 import inspect
 import os
+import sys
+import threading
+import types
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
 
 from configman.value_sources.source_exceptions import (
     NoHandlerForType,
@@ -19,96 +28,438 @@ from configman.converters import str_to_python_object
 from configman.config_file_future_proxy import ConfigFileFutureProxy
 from configman.config_exceptions import CannotConvertError
 
-# replace with dynamic discovery and loading
-#from configman.value_sources import for_argparse
-#from configman.value_sources import or_xml
-from configman.value_sources import for_getopt
-from configman.value_sources import for_json
-from configman.value_sources import for_conf
-from configman.value_sources import for_mapping
-from configman.value_sources import for_configobj
-from configman.value_sources import for_modules
-
-# please replace with dynamic discovery
-for_handlers = [
-    for_mapping,
-    for_getopt,
-    for_json,
-    for_conf,
-    for_configobj,
-    for_modules,
-]
+from configman.value_sources import for_getopt, handles
 
 
 #==============================================================================
-# create a dispatch table of types/objects to modules.  Each type should have
-# a list of modules that can handle that type.
-class DispatchByType(collections.defaultdict):
+class DispatchByType(object):
+    """This class maps value sources to the handler modules that can handle
+    them.  Handlers are registered by module name, along with the qualified
+    names of the types and objects that they can handle, so a handler module
+    is not imported until a value source that it may handle is seen.
+
+    A candidate value source is matched first by identity, as with the
+    'os.environ' mapping or the 'getopt' module, and then by type.  The
+    handlers for a given type are worked out once and cached, so a dispatch
+    costs a dictionary lookup or two rather than a scan of every registered
+    type.  Value sources may be dispatched from many threads at once, so the
+    registrations and the caches are changed only with the lock held."""
+
     #--------------------------------------------------------------------------
-    def get_handlers(self, candidate):
-        handlers_set = OrderedSet()
-        # find exact candidate matches first
-        for key, handler_list in self.iteritems():
-            if candidate is key:
-                for a_handler in handler_list:
-                    handlers_set.add(a_handler)
-        # then find the "instance of" candidate matches
-        for key, handler_list in self.iteritems():
-            if self._is_instance_of(candidate, key):
-                for a_handler in handler_list:
-                    handlers_set.add(a_handler)
-        if not handlers_set:
-            raise NoHandlerForType("no hander for %s is available" %
-                                   candidate)
-        return handlers_set
+    def __init__(self):
+        # a list of 2-tuples (module name, can handle) in the order of
+        # registration, which is the order of precedence
+        self._registrations = []
+        # the names of the types and objects not yet resolved, because their
+        # modules haven't yet been imported.  Until they are, there can be no
+        # candidates that are or are instances of them.
+        self._pending_names = []
+        self._by_identity = {}
+        self._types = []
+        self._type_cache = {}
+        self._modules = {}
+        # the module names of the handlers that can turn down a candidate
+        # before they are imported, and the functions that tell
+        self._accepts = {}
+        self._lock = threading.Lock()
+
+    #--------------------------------------------------------------------------
+    def register(self, module_name, can_handle, accepts=None):
+        """register a handler module.
+
+        parameters:
+            module_name - the full dotted name of the handler module
+            can_handle - a sequence of the types and objects that the module
+                         can handle.  Any of them may be given as a qualified
+                         name, like 'configobj.ConfigObj', so that its module
+                         need not be imported to register it.
+            accepts - optional, a function that, given a candidate that the
+                      module can handle by type, returns False if the module
+                      would surely turn it down, as for a file name with
+                      another extension.  The module is then not imported
+                      for it."""
+        with self._lock:
+            self._registrations.append((module_name, tuple(can_handle)))
+            if accepts is not None:
+                self._accepts[module_name] = accepts
+            self._pending_names.extend(
+                (a_thing, module_name) for a_thing in can_handle
+            )
+            self._resolve_pending_names()
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def _is_instance_of(candidate, some_type):
+    def _resolve_name(qualified_name):
+        """return the object with a qualified name, or None if its module
+        has yet to be imported"""
+        if qualified_name in sys.modules:
+            return sys.modules[qualified_name]
+        module_name, _, attribute_name = qualified_name.rpartition('.')
         try:
-            return isinstance(candidate, some_type)
+            return getattr(sys.modules[module_name], attribute_name)
+        except KeyError:
+            return None
+
+    #--------------------------------------------------------------------------
+    def _resolve_pending_names(self):
+        """called with the lock held"""
+        still_pending = []
+        for a_thing, module_name in self._pending_names:
+            if isinstance(a_thing, basestring):
+                resolved = self._resolve_name(a_thing)
+                if resolved is None:
+                    still_pending.append((a_thing, module_name))
+                    continue
+                a_thing = resolved
+            self._by_identity.setdefault(id(a_thing), (a_thing, []))[1] \
+                .append(module_name)
+            if isinstance(a_thing, (type, types.ClassType)):
+                self._types.append((a_thing, module_name))
+            elif a_thing.__class__.__hash__ is None:
+                # likely this is an instance of a handleable type that is not
+                # hashable. Its base type is handled too.
+                self._types.append((type(a_thing), module_name))
+        if len(still_pending) == len(self._pending_names):
+            return
+        self._pending_names = still_pending
+        self._types.sort(key=self._precedence)
+        self._type_cache = {}
+
+    #--------------------------------------------------------------------------
+    def _precedence(self, a_type_and_module_name):
+        for i, (module_name, _) in enumerate(self._registrations):
+            if module_name == a_type_and_module_name[1]:
+                return i
+
+    #--------------------------------------------------------------------------
+    def _handler_names_for_type(self, a_type):
+        """called with the lock held"""
+        try:
+            return self._type_cache[a_type]
+        except KeyError:
+            pass
+        handler_names = OrderedSet()
+        for some_type, module_name in self._types:
+            if self._is_subclass_of(a_type, some_type):
+                handler_names.add(module_name)
+        self._type_cache[a_type] = handler_names
+        return handler_names
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _is_subclass_of(a_type, some_type):
+        try:
+            return issubclass(a_type, some_type)
         except TypeError:
             return False
 
+    #--------------------------------------------------------------------------
+    def get_handler_names(self, candidate):
+        """return an ordered set of the names of the modules that may handle
+        the candidate value source"""
+        handler_names = OrderedSet()
+        with self._lock:
+            if self._pending_names:
+                self._resolve_pending_names()
+            # find exact candidate matches first
+            try:
+                a_thing, module_names = self._by_identity[id(candidate)]
+                if a_thing is candidate:
+                    for module_name in module_names:
+                        handler_names.add(module_name)
+            except KeyError:
+                pass
+            # then find the "instance of" candidate matches
+            for module_name in self._handler_names_for_type(
+                getattr(candidate, '__class__', type(candidate))
+            ):
+                accepts = self._accepts.get(module_name)
+                if accepts is None or accepts(candidate):
+                    handler_names.add(module_name)
+        if not handler_names:
+            raise NoHandlerForType("no hander for %s is available" %
+                                   candidate)
+        return handler_names
 
-#------------------------------------------------------------------------------
-type_handler_dispatch = DispatchByType(list)
-for a_handler in for_handlers:
-    try:
-        for a_supported_value_source in a_handler.can_handle:
+    #--------------------------------------------------------------------------
+    def load(self, module_name):
+        """import a handler module and check its 'can_handle' attribute"""
+        with self._lock:
             try:
-                type_handler_dispatch[a_supported_value_source].append(
-                    a_handler
-                )
-            except TypeError:
-                # likely this is an instance of a handleable type that is not
-                # hashable. Replace it with its base type and try to continue.
-                type_handler_dispatch[type(a_supported_value_source)].append(
-                    a_handler
-                )
-    except AttributeError:
-        # this module has no can_handle attribute, therefore cannot really
-        # be a handler and an error should be raised
-        raise ModuleHandlesNothingException(
-            "%s has no 'can_handle' attribute" % str(a_handler)
-        )
+                return self._modules[module_name]
+            except KeyError:
+                pass
+        # the lock is not held while importing, as the module may register
+        # handlers of its own
+        __import__(module_name)
+        a_handler = sys.modules[module_name]
+        if not hasattr(a_handler, 'can_handle'):
+            # this module has no can_handle attribute, therefore cannot really
+            # be a handler and an error should be raised
+            raise ModuleHandlesNothingException(
+                "%s has no 'can_handle' attribute" % str(a_handler)
+            )
+        with self._lock:
+            return self._modules.setdefault(module_name, a_handler)
 
-file_extension_dispatch = {}
-for a_handler in for_handlers:
-    try:
-        file_extension_dispatch[a_handler.file_name_extension] = (
-            a_handler.ValueSource.write
-        )
-    except AttributeError:
-        # this handler doesn't have a 'file_name_extension' or ValueSource
-        # therefore it is not eligible for the write file dispatcher
-        pass
+    #--------------------------------------------------------------------------
+    def iter_handlers(self, candidate):
+        """a generator of the modules that may handle the candidate value
+        source.  Each is imported only as the iteration reaches it."""
+        for module_name in self.get_handler_names(candidate):
+            yield self.load(module_name)
+
+    #--------------------------------------------------------------------------
+    def get_handlers(self, candidate):
+        """return an ordered set of the modules that may handle the candidate
+        value source, importing all of them"""
+        return OrderedSet(self.iter_handlers(candidate))
+
+
+#==============================================================================
+class FileExtensionDispatch(collections.Mapping):
+    """a mapping of file name extensions to the 'write' functions of the
+    ValueSources that write files of that type.  The handler module is only
+    imported when its extension is looked up."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, dispatch):
+        self._dispatch = dispatch
+        self._module_names = OrderedDict()
+
+    #--------------------------------------------------------------------------
+    def register(self, file_name_extension, module_name):
+        self._module_names[file_name_extension] = module_name
+
+    #--------------------------------------------------------------------------
+    def get_handler(self, file_name_extension):
+        """return the handler module for a file name extension, importing
+        it if need be"""
+        return self._dispatch.load(self._module_names[file_name_extension])
+
+    #--------------------------------------------------------------------------
+    def is_binary(self, file_name_extension):
+        """return True if the files of a file name extension are binary, so
+        must be opened in binary mode to write them.  Unknown extensions are
+        taken to be text."""
+        try:
+            a_handler = self.get_handler(file_name_extension)
+        except KeyError:
+            return False
+        return getattr(a_handler, 'binary_file_format', False)
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, file_name_extension):
+        return self.get_handler(file_name_extension).ValueSource.write
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self._module_names)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._module_names)
+
+
+#------------------------------------------------------------------------------
+type_handler_dispatch = DispatchByType()
+file_extension_dispatch = FileExtensionDispatch(type_handler_dispatch)
 
 
 #------------------------------------------------------------------------------
-def wrap_with_value_source_api(value_source_list, a_config_manager):
-    wrapped_sources = []
+def register_value_source_handler(
+    module_name,
+    can_handle,
+    file_name_extension=None,
+    accepts=None
+):
+    """make a value source handler module known to configman without
+    importing it.  Handlers registered earlier take precedence.
+
+    parameters:
+        module_name - the full dotted name of the handler module
+        can_handle - the types and objects that the handler can handle, as
+                     in the module's own 'can_handle'.  Qualified names, like
+                     'configobj.ConfigObj', may be given instead.
+        file_name_extension - if the module's ValueSource can write files,
+                              the file name extension that it writes.
+        accepts - optional, a function that, given a candidate of a type that
+                  the module can handle, returns False if the module would
+                  turn it down, so that the module need not be imported to
+                  find that out."""
+    type_handler_dispatch.register(module_name, can_handle, accepts)
+    if file_name_extension is not None:
+        file_extension_dispatch.register(file_name_extension, module_name)
+
+
+# the handlers that come with configman.  These must agree with the
+# 'can_handle' and 'file_name_extension' attributes of the modules, and each
+# 'accepts' is the test in the 'handles' module that the ValueSource asks.
+#
+# A string is offered to the handlers in the order below until one takes it.
+# for_json, for_conf and for_configobj turn down strings without their file
+# name extension.  for_modules tries any string as the name of a module, so
+# only the handlers after it see the strings that are neither files nor
+# modules: for_directory, for one, takes only existing directories.
+register_value_source_handler(
+    'configman.value_sources.for_mapping',
+    ('os.environ', 'collections.Mapping'),
+)
+register_value_source_handler(
+    'configman.value_sources.for_getopt',
+    ('getopt', '__builtin__.list'),
+)
+register_value_source_handler(
+    'configman.value_sources.for_http',
+    ('__builtin__.basestring',),
+    accepts=handles.http_url
+)
+register_value_source_handler(
+    'configman.value_sources.for_json',
+    ('__builtin__.basestring', 'json'),
+    'json'
+)
+register_value_source_handler(
+    'configman.value_sources.for_conf',
+    ('__builtin__.basestring', 'types.FunctionType'),
+    'conf'
+)
+register_value_source_handler(
+    'configman.value_sources.for_cmb',
+    ('__builtin__.basestring',),
+    'cmb',
+    accepts=handles.cmb_file
+)
+register_value_source_handler(
+    'configman.value_sources.for_sqlite',
+    ('__builtin__.basestring',),
+    'sqlite',
+    accepts=handles.sqlite_file
+)
+register_value_source_handler(
+    'configman.value_sources.for_configobj',
+    ('configobj', 'configobj.ConfigObj', '__builtin__.basestring'),
+    'ini'
+)
+register_value_source_handler(
+    'configman.value_sources.for_modules',
+    ('types.ModuleType', '__builtin__.basestring'),
+    'py'
+)
+register_value_source_handler(
+    'configman.value_sources.for_directory',
+    ('__builtin__.basestring',),
+    accepts=handles.directory
+)
+
+
+#==============================================================================
+class SourceWithOptions(object):
+    """a value source along with keyword arguments for the ValueSource that
+    reads it, for the choices that apply to one source rather than to all
+    of its kind, like the 'native_parser' of for_configobj:
+
+        values_source_list=[
+            SourceWithOptions(ConfigFileFutureProxy, native_parser=True),
+            environment,
+            command_line,
+        ]
+
+    Only the handlers whose ValueSource takes all of the keyword arguments
+    are tried for the source.  Without them, a ValueSource uses the module
+    level defaults of its handler."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, source, **options):
+        self.source = source
+        self.options = options
+
+    #--------------------------------------------------------------------------
+    def __repr__(self):  # pragma: no cover
+        return '<SourceWithOptions: %r, %r>' % (self.source, self.options)
+
+
+#------------------------------------------------------------------------------
+def unwrap_source(a_source):
+    """return a 2-tuple: a value source, without any SourceWithOptions about
+    it, and the keyword arguments for its ValueSource"""
+    if isinstance(a_source, SourceWithOptions):
+        return a_source.source, a_source.options
+    return a_source, {}
+
+
+#------------------------------------------------------------------------------
+def _takes_options(a_value_source_class, options):
+    """True if the constructor of a ValueSource class has all the keyword
+    arguments"""
+    arguments, _, keywords, _ = inspect.getargspec(
+        a_value_source_class.__init__
+    )
+    return keywords is not None or set(options).issubset(arguments)
+
+
+#------------------------------------------------------------------------------
+def wrap_a_value_source(a_source, a_config_manager, options=None):
+    """return the ValueSource made by the first of the handlers for a source
+    that accepts it.  'options' are keyword arguments for the ValueSource,
+    only the handlers that take them are tried."""
+    if options is None:
+        options = {}
+    wrapped_source = None
+    error_history = []
+    for a_handler in type_handler_dispatch.iter_handlers(a_source):
+        if options and not _takes_options(a_handler.ValueSource, options):
+            continue
+        try:
+            wrapped_source = a_handler.ValueSource(
+                a_source,
+                a_config_manager,
+                **options
+            )
+            break
+        except (ValueException, CannotConvertError), x:
+            # a failure is not necessarily fatal, we need to try all of
+            # the handlers.  It's only fatal when they've all failed
+            exception_as_str = str(x)
+            if exception_as_str:
+                error_history.append(str(x))
+    if wrapped_source is None:
+        if error_history:
+            errors = '; '.join(error_history)
+            raise AllHandlersFailedException(errors)
+        elif options:
+            raise NoHandlerForType(
+                "no handler for %r takes the options %s"
+                % (a_source, ', '.join(sorted(options)))
+            )
+        else:
+            raise NoHandlerForType(type(a_source))
+    return wrapped_source
+
+
+#------------------------------------------------------------------------------
+def wrap_with_value_source_api(
+    value_source_list,
+    a_config_manager,
+    executor=None
+):
+    """return a list of ValueSources, one for each of the value sources in
+    the list that isn't degenerate, in the same order.
+
+    parameters:
+        value_source_list - the value sources in order of precedence.  Any
+                            of them may be given as a SourceWithOptions
+        a_config_manager - the ConfigurationManager being set up
+        executor - optional, an object with a 'submit' method like that of
+                   the 'concurrent.futures' executors.  If given, the
+                   ValueSources are made concurrently, each through a call
+                   to 'submit' that returns an object with a 'result'
+                   method.  If the making of more than one fails, the
+                   exception for the one of lowest precedence is raised,
+                   just as it would have been without the executor."""
+    sources = []
     for a_source in value_source_list:
+        a_source, options = unwrap_source(a_source)
         if a_source is ConfigFileFutureProxy:
             a_source = a_config_manager._get_option('admin.conf').default
             # raise hell if the config file doesn't exist
@@ -128,28 +479,22 @@ def wrap_with_value_source_api(value_source_list, a_config_manager):
             # this means the source is degenerate - like the case where
             # the config file name has not been specified
             continue
-        handlers = type_handler_dispatch.get_handlers(a_source)
-        wrapped_source = None
-        error_history = []
-        for a_handler in handlers:
-            try:
-                wrapped_source = a_handler.ValueSource(a_source,
-                                                       a_config_manager)
-                break
-            except (ValueException, CannotConvertError), x:
-                # a failure is not necessarily fatal, we need to try all of
-                # the handlers.  It's only fatal when they've all failed
-                exception_as_str = str(x)
-                if exception_as_str:
-                    error_history.append(str(x))
-        if wrapped_source is None:
-            if error_history:
-                errors = '; '.join(error_history)
-                raise AllHandlersFailedException(errors)
-            else:
-                raise NoHandlerForType(type(a_source))
-        wrapped_sources.append(wrapped_source)
-    return wrapped_sources
+        sources.append((a_source, options))
+    if executor is None:
+        return [
+            wrap_a_value_source(a_source, a_config_manager, options)
+            for a_source, options in sources
+        ]
+    futures = [
+        executor.submit(
+            wrap_a_value_source,
+            a_source,
+            a_config_manager,
+            options
+        )
+        for a_source, options in sources
+    ]
+    return [a_future.result() for a_future in futures]
 
 
 #------------------------------------------------------------------------------
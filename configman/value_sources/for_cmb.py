@@ -0,0 +1,285 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""This module implements a configuration value source for the compact
+binary config file format, '.cmb'.  Unlike the text formats, nothing is
+parsed when the file is loaded.  The file is memory mapped and each lookup is
+a binary search of a sorted key index, decoding only the value that was
+asked for.  Loading takes the same time whatever the size of the file.
+
+The layout of a file, all integers little endian:
+
+    header - the magic string 'CMB\\x01' and the number of keys, an uint32
+    index  - for each key, in the byte order of the utf-8 encoded keys:
+             the offset and length of the key, the offset and length of the
+             value, each an uint32, and the type of the value, an uint8
+    data   - the utf-8 encoded keys and the encoded values
+
+Values of the types None, bool, int, long and float are stored in binary
+form, so they need no conversion on loading.  Every other value is stored as
+the string that its option's to_string_converter makes of it, for the
+option's from_string_converter to convert back.
+
+The file must not be rewritten in place while a ValueSource has it mapped.
+Write a new file and rename it over the old one instead."""
+
+import collections
+import mmap
+import struct
+import sys
+
+from configman.option import Option
+from configman.value_sources import handles
+from configman.value_sources.source_exceptions import (
+    ValueException,
+    CantHandleTypeException
+)
+from configman.dotdict import DotDict, iteritems_breadth_first, view_or_copy
+from configman.memoize import memoize
+
+can_handle = (
+    basestring,
+)
+
+file_name_extension = 'cmb'
+# the files are packed binary, they must be opened with 'rb' or 'wb'
+binary_file_format = True
+
+magic = 'CMB\x01'
+header_struct = struct.Struct('<4sI')
+index_entry_struct = struct.Struct('<IIIIB')
+int_struct = struct.Struct('<q')
+float_struct = struct.Struct('<d')
+
+# the value types
+NONE_TYPE, BOOL_TYPE, INT_TYPE, FLOAT_TYPE, STR_TYPE, UNICODE_TYPE = range(6)
+
+
+#==============================================================================
+class NotACmbFileError(ValueException):
+    pass
+
+
+#------------------------------------------------------------------------------
+def encode_value(value):
+    """return a 2-tuple of the type code and the encoded form of a value"""
+    value_type = type(value)
+    if value is None:
+        return NONE_TYPE, ''
+    if value_type is bool:
+        return BOOL_TYPE, '\x01' if value else '\x00'
+    if value_type in (int, long) and -2 ** 63 <= value < 2 ** 63:
+        return INT_TYPE, int_struct.pack(value)
+    if value_type is float:
+        return FLOAT_TYPE, float_struct.pack(value)
+    if value_type is unicode:
+        return UNICODE_TYPE, value.encode('utf8')
+    return STR_TYPE, str(value)
+
+
+#------------------------------------------------------------------------------
+def decode_value(value_type, buffer, offset, length):
+    if value_type == STR_TYPE:
+        return buffer[offset:offset + length]
+    if value_type == INT_TYPE:
+        return int_struct.unpack_from(buffer, offset)[0]
+    if value_type == BOOL_TYPE:
+        return buffer[offset] != '\x00'
+    if value_type == FLOAT_TYPE:
+        return float_struct.unpack_from(buffer, offset)[0]
+    if value_type == UNICODE_TYPE:
+        return buffer[offset:offset + length].decode('utf8')
+    if value_type == NONE_TYPE:
+        return None
+    raise NotACmbFileError('unknown value type %d' % value_type)
+
+
+#------------------------------------------------------------------------------
+def write_cmb(items, output_stream):
+    """write an iterable of (key, value) pairs in the cmb format.  The
+    values should already have been reduced to the types that encode_value
+    stores natively or to strings."""
+    entries = []
+    for key, value in items:
+        if isinstance(key, unicode):
+            key = key.encode('utf8')
+        value_type, encoded_value = encode_value(value)
+        entries.append((key, value_type, encoded_value))
+    entries.sort()
+    offset = header_struct.size + index_entry_struct.size * len(entries)
+    index = []
+    data = []
+    for key, value_type, encoded_value in entries:
+        key_offset = offset
+        value_offset = key_offset + len(key)
+        offset = value_offset + len(encoded_value)
+        index.append(index_entry_struct.pack(
+            key_offset,
+            len(key),
+            value_offset,
+            len(encoded_value),
+            value_type
+        ))
+        data.append(key)
+        data.append(encoded_value)
+    output_stream.write(''.join(
+        [header_struct.pack(magic, len(entries))] + index + data
+    ))
+
+
+#==============================================================================
+class CmbMapping(collections.Mapping):
+    """a read-only flat mapping of the dotted keys of a cmb file to their
+    values.  Lookups are binary searches of the file's key index."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            try:
+                self._buffer = mmap.mmap(
+                    f.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                # an empty file cannot be mapped
+                raise NotACmbFileError('%s is empty' % file_name)
+        if len(self._buffer) < header_struct.size:
+            raise NotACmbFileError('%s is truncated' % file_name)
+        file_magic, self._length = header_struct.unpack_from(self._buffer, 0)
+        if file_magic != magic:
+            raise NotACmbFileError('%s is not a cmb file' % file_name)
+        if len(self._buffer) < (
+            header_struct.size + index_entry_struct.size * self._length
+        ):
+            raise NotACmbFileError('%s is truncated' % file_name)
+
+    #--------------------------------------------------------------------------
+    def _entry(self, i):
+        return index_entry_struct.unpack_from(
+            self._buffer,
+            header_struct.size + index_entry_struct.size * i
+        )
+
+    #--------------------------------------------------------------------------
+    def _key(self, i):
+        key_offset, key_length = self._entry(i)[:2]
+        return self._buffer[key_offset:key_offset + key_length]
+
+    #--------------------------------------------------------------------------
+    def _lower_bound(self, key):
+        """return the index of the first key not less than 'key'"""
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _encode_key(key):
+        if isinstance(key, unicode):
+            return key.encode('utf8')
+        return key
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        encoded_key = self._encode_key(key)
+        i = self._lower_bound(encoded_key)
+        if i < self._length:
+            key_offset, key_length, value_offset, value_length, value_type = \
+                self._entry(i)
+            if (
+                key_length == len(encoded_key)
+                and self._buffer[key_offset:key_offset + key_length]
+                    == encoded_key
+            ):
+                return decode_value(
+                    value_type,
+                    self._buffer,
+                    value_offset,
+                    value_length
+                )
+        raise KeyError(key)
+
+    #--------------------------------------------------------------------------
+    def is_namespace(self, key):
+        """return True if there are keys of the form 'key.x'.  Like a lookup,
+        this is a binary search."""
+        prefix = self._encode_key(key) + '.'
+        i = self._lower_bound(prefix)
+        return i < self._length and self._key(i).startswith(prefix)
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        for i in xrange(self._length):
+            yield self._key(i)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return self._length
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        self._buffer.close()
+
+
+#==============================================================================
+class ValueSource(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, source, the_config_manager=None):
+        """parameters:
+            source - the name of a cmb file
+            the_config_manager - a dummy value for this ValueSource"""
+        if not (isinstance(source, basestring) and handles.cmb_file(source)):
+            raise CantHandleTypeException()
+        try:
+            self.values = CmbMapping(source)
+        except (IOError, OSError), x:
+            raise NotACmbFileError(
+                "Cmb couldn't open %s as a config file: %s" % (source, str(x))
+            )
+        try:
+            self.always_ignore_mismatches = bool(
+                self.values["always_ignore_mismatches"]
+            )
+        except KeyError:
+            pass
+
+    #--------------------------------------------------------------------------
+    @memoize()
+    def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
+        """the 'config_manager' and 'ignore_mismatches' are dummy values for
+        this implementation of a ValueSource."""
+        return view_or_copy(self.values, obj_hook)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def write(source_mapping, output_stream=sys.stdout):
+        """write the values of the Options of a mapping of Options in the
+        cmb format"""
+        write_cmb(
+            (
+                (key, ValueSource._storable_value(value))
+                for key, value in iteritems_breadth_first(source_mapping)
+                if isinstance(value, Option)
+            ),
+            output_stream
+        )
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _storable_value(an_option):
+        """return the value of an option if it can be stored in binary form,
+        otherwise the option's value as a string"""
+        value = an_option.value
+        if value is None or type(value) in (bool, float):
+            return value
+        if type(value) in (int, long) and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return str(an_option)
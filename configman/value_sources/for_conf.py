@@ -10,7 +10,10 @@ a ContextManager, the value source will assume it is a file pathname and try
 to open it.
 """
 
+import contextlib
 import functools
+import operator
+import os
 import sys
 
 from configman import namespace
@@ -21,7 +24,8 @@ from configman.value_sources.source_exceptions import (
     ValueException,
     CantHandleTypeException
 )
-from configman.dotdict import DotDict
+from configman.value_sources.parse_cache import parse_cache
+from configman.dotdict import DotDict, view_or_copy
 from configman.memoize import memoize
 
 function_type = type(lambda x: x)  # TODO: just how do you express the Fuction
@@ -38,54 +42,149 @@ can_handle = (
 
 file_name_extension = 'conf'
 
+# the size of the read buffer used when opening a conf file by name
+read_buffer_size = 64 * 1024
+
+# conf files at least this large (in bytes) are read through mmap rather than
+# through a regular buffered file.  Set to None to never mmap automatically.
+# One source can choose for itself as SourceWithOptions(source, use_mmap=True).
+mmap_threshold = 8 * 1024 * 1024
+
 
 #==============================================================================
 class NotAConfigFileError(ValueException):
     pass
 
 
+#------------------------------------------------------------------------------
+def parse_conf(lines):
+    """read an iterable of lines in a single pass and return a flat mapping
+    of the dotted keys to their string values.  Blank lines and lines whose
+    first non-whitespace character is '#' are ignored.  A line that begins
+    with a space or tab is a continuation of the value of the previous key.
+    The pieces of a continued value are accumulated in a list and joined
+    only once at the end, so long folded values cost linear time."""
+    values = {}
+    continued = {}  # key -> list of the parts of a folded value
+    previous_key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped[0] == '#':
+            continue
+        if previous_key is not None and line[0] in ' \t':
+            try:
+                continued[previous_key].append(line[1:].rstrip())
+            except KeyError:
+                continued[previous_key] = [
+                    values[previous_key],
+                    line[1:].rstrip()
+                ]
+            continue
+        key, equal_sign, value = stripped.partition('=')
+        if equal_sign:
+            key = key.rstrip()
+            value = value.lstrip()
+        values[key] = value
+        continued.pop(key, None)  # a repeated key replaces the earlier value
+        previous_key = key
+    for key, parts in continued.iteritems():
+        values[key] = ''.join(parts)
+    return values
+
+
+#------------------------------------------------------------------------------
+@contextlib.contextmanager
+def mmap_lines(file_name):
+    """a context manager that yields an iterator over the lines of a file
+    that has been memory mapped rather than read into a buffer."""
+    # imported here, so that configs that aren't mapped never import it
+    import mmap
+    with open(file_name, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            # an empty file cannot be mapped
+            yield iter(())
+            return
+        mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield iter(mapped_file.readline, '')
+        finally:
+            mapped_file.close()
+
+
 #==============================================================================
 class ValueSource(object):
 
     #--------------------------------------------------------------------------
-    def __init__(self, candidate, the_config_manager=None):
+    def __init__(self, candidate, the_config_manager=None, use_mmap=None):
+        """parameters:
+            candidate - a file name or a function that returns a context
+                        manager that, in turn, offers an iterable of lines
+            the_config_manager - a dummy value for this ValueSource
+            use_mmap - True to read the file through mmap, False to use a
+                       buffered read, None to choose by comparing the size
+                       of the file to the module level 'mmap_threshold'
+        """
         if (
             isinstance(candidate, basestring) and
             candidate.endswith(file_name_extension)
         ):
-            # we're trusting the string represents a filename
-            opener = functools.partial(open, candidate)
+            # we're trusting the string represents a filename.  Files are
+            # parsed through the process wide cache so that other instances
+            # reading the same unchanged file get the already parsed values
+            parser = functools.partial(self._parse_file, use_mmap=use_mmap)
+            load = functools.partial(
+                parse_cache.get,
+                candidate,
+                file_name_extension,
+                parser
+            )
         elif isinstance(candidate, function_type):
             # we're trusting that the function when called with no parameters
             # will return a Context Manager Type.
-            opener = candidate
+            load = functools.partial(self._parse_stream, candidate)
         else:
             raise CantHandleTypeException()
-        self.values = {}
         try:
-            with opener() as f:
-                previous_key = None
-                for line in f:
-                    if line.strip().startswith('#') or not line.strip():
-                        continue
-                    if line[0] in ' \t' and previous_key:
-                        line = line[1:]
-                        self.values[previous_key] = (
-                            '%s%s' % (self.values[previous_key],line.rstrip())
-                        )
-                        continue
-                    try:
-                        key, value = line.split("=", 1)
-                        self.values[key.strip()] = value.strip()
-                        previous_key = key
-                    except ValueError:
-                        self.values[line] = ''
+            self.values = load()
         except Exception, x:
             raise NotAConfigFileError(
                 "Conf couldn't interpret %s as a config file: %s"
                 % (candidate, str(x))
             )
 
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _parse_stream(opener):
+        with opener() as f:
+            return parse_conf(f)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _parse_file(file_name, use_mmap=None):
+        if use_mmap is None:
+            use_mmap = ValueSource._is_large_file(file_name)
+        if use_mmap:
+            opener = functools.partial(mmap_lines, file_name)
+        else:
+            opener = functools.partial(
+                open,
+                file_name,
+                'r',
+                read_buffer_size
+            )
+        return ValueSource._parse_stream(opener)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _is_large_file(file_name):
+        if mmap_threshold is None:
+            return False
+        try:
+            return os.path.getsize(file_name) >= mmap_threshold
+        except OSError:
+            # let the open fail with a more meaningful error
+            return False
+
     #--------------------------------------------------------------------------
     @memoize()
     def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
@@ -93,53 +192,57 @@ class ValueSource(object):
         this implementation of a ValueSource."""
         if isinstance(self.values, obj_hook):
             return self.values
-        return obj_hook(initializer=self.values)
+        return view_or_copy(self.values, obj_hook)
 
     #--------------------------------------------------------------------------
     @staticmethod
     def write(source_dict, namespace_name=None, output_stream=sys.stdout):
-        options = [
-            value
-            for value in source_dict.values()
-            if isinstance(value, Option)
-        ]
-        options.sort(cmp=lambda x, y: cmp(x.name, y.name))
-        namespaces = [
-            (key, value)
-            for key, value in source_dict.items()
-            if isinstance(value, namespace.Namespace)
-        ]
+        """write the whole file with one call, rather than a line at a time,
+        so that writing to a pipe or an unbuffered stream stays cheap"""
+        output_stream.write(
+            ''.join(ValueSource.emit(source_dict, namespace_name))
+        )
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def emit(source_dict, namespace_name=None):
+        """a generator of the chunks of text of the file, in order"""
+        options = []
+        namespaces = []
+        for key, value in source_dict.iteritems():
+            if isinstance(value, Option):
+                options.append(value)
+            elif isinstance(value, namespace.Namespace):
+                namespaces.append((key, value))
+        options.sort(key=operator.attrgetter('name'))
         for an_option in options:
             if namespace_name:
                 option_name = "%s.%s" % (namespace_name, an_option.name)
             else:
                 option_name = an_option.name
-            print >>output_stream, "# name: %s" % option_name
-            print >>output_stream, "# doc: %s" % an_option.doc
             option_value = str(an_option)
             if isinstance(option_value, unicode):
                 option_value = option_value.encode('utf8')
 
             if an_option.likely_to_be_changed:
-                option_format = '%s=%r\n'
+                option_format = '# name: %s\n# doc: %s\n%s=%r\n\n'
             else:
-                option_format = '# %s=%r\n'
-            print >>output_stream, option_format % (
-              option_name,
-              option_value
+                option_format = '# name: %s\n# doc: %s\n# %s=%r\n\n'
+            yield option_format % (
+                option_name,
+                an_option.doc,
+                option_name,
+                option_value
             )
         for key, a_namespace in namespaces:
             if namespace_name:
                 namespace_label = ''.join((namespace_name, '.', key))
             else:
                 namespace_label = key
-            print >> output_stream, '#%s' % ('-' * 79)
-            print >> output_stream, '# %s - %s\n' % (
+            yield '#%s\n# %s - %s\n\n' % (
+                '-' * 79,
                 namespace_label,
                 a_namespace._doc
             )
-            ValueSource.write(
-              a_namespace,
-              namespace_name=namespace_label,
-              output_stream=output_stream
-            )
+            for a_chunk in ValueSource.emit(a_namespace, namespace_label):
+                yield a_chunk
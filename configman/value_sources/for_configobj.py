@@ -4,6 +4,7 @@
 
 import sys
 import re
+import operator
 import os.path
 
 import configobj
@@ -16,11 +17,19 @@ from configman.value_sources.source_exceptions import (
 from configman.namespace import Namespace
 from configman.option import Option
 
-from configman.dotdict import DotDict
+from configman.value_sources.parse_cache import parse_cache, flatten
+from configman.dotdict import DotDict, view_or_copy
 from configman.memoize import memoize
 
 file_name_extension = 'ini'
 
+# the default choice of reader for ini files: False for ConfigObj, True for
+# the faster native reader that falls back to ConfigObj for any syntax that
+# it does not support.  Rather than changing this default for every ini file,
+# give the choice to one source as
+# SourceWithOptions(source, native_parser=True).
+use_native_parser = False
+
 can_handle = (
     configobj,
     configobj.ConfigObj,
@@ -29,7 +38,126 @@ can_handle = (
 
 
 #==============================================================================
-class ConfigObjWithIncludes(configobj.ConfigObj):
+class IncludeCycleException(ValueException):
+    pass
+
+
+#==============================================================================
+class IncludeExpander(object):
+    """This class implements the '+include' preprocessing of ini files.  It
+    spools the lines of an ini file, replacing each '+include' line with the
+    lines of the named file, indented to match the '+include' line.  Both
+    the ConfigObj based reader and the native reader use it."""
+    _include_re = re.compile(r'^(\s*)\+include\s+(.*?)\s*$')
+
+    # a cache of the contents of files that have been read by the expander.
+    # The key is the real path of a file, the value is a tuple:
+    #     ((mtime, size), list_of_entries)
+    # where each entry is either a list of consecutive lines of text or, for
+    # an include directive, a 2-tuple: (indent, include_file_name).
+    # Indentation is not stored in the cache, it is applied as the lines are
+    # spooled into the output.  Like the ParseCache, if the cache reaches
+    # max_include_cache_size entries, it is thrown out and a new one made.
+    _include_cache = {}
+    max_include_cache_size = 1000
+
+    #--------------------------------------------------------------------------
+    @classmethod
+    def clear_include_cache(cls):
+        cls._include_cache.clear()
+
+    #--------------------------------------------------------------------------
+    def _read_file_entries(self, file_name):
+        """return the list of entries of a file, reading the file only if it
+        is not in the cache or if it has changed since it was cached."""
+        real_path = os.path.realpath(file_name)
+        self.files_read.add(real_path)
+        file_stat = os.stat(real_path)
+        signature = (file_stat.st_mtime, file_stat.st_size)
+        try:
+            cached_signature, entries = self._include_cache[real_path]
+            if cached_signature == signature:
+                self.include_cache_hits += 1
+                return real_path, entries
+        except KeyError:
+            pass
+        entries = []
+        lines = []
+        with open(real_path) as f:
+            for a_line in f:
+                match = IncludeExpander._include_re.match(a_line)
+                if match:
+                    if lines:
+                        entries.append(lines)
+                        lines = []
+                    entries.append((match.group(1), match.group(2)))
+                else:
+                    lines.append(a_line.rstrip())
+        if lines:
+            entries.append(lines)
+        self.include_reads += 1
+        if len(self._include_cache) >= self.max_include_cache_size:
+            # emptied in place, it is shared by all the expanders
+            self._include_cache.clear()
+        self._include_cache[real_path] = (signature, entries)
+        return real_path, entries
+
+    #--------------------------------------------------------------------------
+    def _expand_files(self, file_name, original_path, output, indent="",
+                      include_stack=()):
+        """This recursive function accepts a file name, fetches the contents
+        of the file and spools its lines with the given indent into the
+        'output' list.  If it detects a line beginning with "+include", it
+        assumes the string immediately following is a file name.  Recursing,
+        the new file's contents are spooled in place of the "+include" line.
+        The contents of each file are read only once and then reused from a
+        cache for as long as the file's mtime and size remain unchanged.
+
+        An include cycle, a file that includes itself directly or through
+        other files, raises IncludeCycleException."""
+        real_path, entries = self._read_file_entries(file_name)
+        if real_path in include_stack:
+            raise IncludeCycleException(
+                "include cycle: %s" % ' -> '.join(include_stack + (real_path,))
+            )
+        include_stack = include_stack + (real_path,)
+        for an_entry in entries:
+            if isinstance(an_entry, tuple):
+                include_indent, include_file = an_entry
+                include_file = os.path.join(original_path, include_file)
+                self._expand_files(
+                    include_file,
+                    os.path.dirname(include_file),
+                    output,
+                    indent + include_indent,
+                    include_stack
+                )
+            elif indent:
+                output.extend([indent + a_line for a_line in an_entry])
+            else:
+                output.extend(an_entry)
+
+    #--------------------------------------------------------------------------
+    def expand_includes(self, file_name):
+        """return the list of lines of an ini file with all its includes
+        expanded"""
+        # the number of files actually read from disk and the number of
+        # reads that were satisfied by the include cache
+        self.include_reads = 0
+        self.include_cache_hits = 0
+        # the real paths of all the files that make up this config
+        self.files_read = set()
+        expanded_file_contents = []
+        self._expand_files(
+            file_name,
+            os.path.dirname(file_name),
+            expanded_file_contents
+        )
+        return expanded_file_contents
+
+
+#==============================================================================
+class ConfigObjWithIncludes(IncludeExpander, configobj.ConfigObj):
     """This derived class is an extention to ConfigObj that adds nested
     includes to ini files.  Here's an example:
 
@@ -61,35 +189,6 @@ class ConfigObjWithIncludes(configobj.ConfigObj):
         dbuser=dwight
         dbpassword=secrets
     """
-    _include_re = re.compile(r'^(\s*)\+include\s+(.*?)\s*$')
-
-    #--------------------------------------------------------------------------
-    def _expand_files(self, file_name, original_path, indent=""):
-        """This recursive function accepts a file name, opens the file and then
-        spools the contents of the file into a list, examining each line as it
-        does so.  If it detects a line beginning with "+include", it assumes
-        the string immediately following is a file name.  Recursing, the file
-        new file is openned and its contents are spooled into the accumulating
-        list."""
-        expanded_file_contents = []
-        with open(file_name) as f:
-            for a_line in f:
-                match = ConfigObjWithIncludes._include_re.match(a_line)
-                if match:
-                    include_file = match.group(2)
-                    include_file = os.path.join(
-                        original_path,
-                        include_file
-                    )
-                    new_lines = self._expand_files(
-                        include_file,
-                        os.path.dirname(include_file),
-                        indent + match.group(1)
-                    )
-                    expanded_file_contents.extend(new_lines)
-                else:
-                    expanded_file_contents.append(indent + a_line.rstrip())
-        return expanded_file_contents
 
     #--------------------------------------------------------------------------
     def _load(self, infile, configspec):
@@ -99,8 +198,7 @@ class ConfigObjWithIncludes(configobj.ConfigObj):
         function of the same name.  ConfigObj proceeds, completely unaware
         that it's input file has been preprocessed."""
         if isinstance(infile, basestring):
-            original_path = os.path.dirname(infile)
-            expanded_file_contents = self._expand_files(infile, original_path)
+            expanded_file_contents = self.expand_includes(infile)
             super(ConfigObjWithIncludes, self)._load(
                 expanded_file_contents,
                 configspec
@@ -109,6 +207,103 @@ class ConfigObjWithIncludes(configobj.ConfigObj):
             super(ConfigObjWithIncludes, self)._load(infile, configspec)
 
 
+#==============================================================================
+class UnsupportedIniSyntaxException(ValueException):
+    """raised by the native ini reader when it meets syntax that it leaves
+    to ConfigObj"""
+    pass
+
+
+#------------------------------------------------------------------------------
+def native_ini_value(value):
+    """convert the text to the right of the '=' in an ini line into a value
+    the same way that ConfigObj does: quotes are removed, unquoted values
+    with commas become lists and a '#' begins a trailing comment.  Anything
+    fancier raises UnsupportedIniSyntaxException."""
+    if not value:
+        return ''
+    if '%(' in value:
+        # ConfigObj would interpolate this value
+        raise UnsupportedIniSyntaxException(value)
+    quote = value[0]
+    if quote in '"\'':
+        end = value.find(quote, 1)
+        if end == -1 or value.startswith(quote * 3):
+            # multiline and unterminated values
+            raise UnsupportedIniSyntaxException(value)
+        rest = value[end + 1:].lstrip()
+        if rest and rest[0] != '#':
+            # lists of quoted items
+            raise UnsupportedIniSyntaxException(value)
+        return value[1:end]
+    value = value.split('#', 1)[0].rstrip()
+    if ',' not in value:
+        return value
+    items = [x.strip() for x in value.split(',')]
+    if not items[-1]:
+        items.pop()  # a trailing comma
+    for an_item in items:
+        if not an_item or an_item[0] in '"\'':
+            raise UnsupportedIniSyntaxException(value)
+    return items
+
+
+#------------------------------------------------------------------------------
+def parse_ini(lines):
+    """a reader for the subset of the ini syntax that configman itself
+    writes: comments, 'key=value' lines, quoted values, comma delimited lists
+    and nested '[section]', '[[subsection]]' headers.  It returns the flat
+    mapping of dotted keys to values directly, rather than building the tree
+    of Sections that ConfigObj builds.  Unlike ConfigObj, the mapping is a
+    plain dict that does not preserve the order of the keys.  Includes must
+    already have been expanded.  Syntax outside of the subset, as well as
+    errors that ConfigObj would report, raise UnsupportedIniSyntaxException
+    so that the caller can fall back to ConfigObj."""
+    values = {}
+    section_path = []
+    prefix = ''
+    names_seen = set()
+    for a_line in lines:
+        stripped = a_line.strip()
+        if not stripped or stripped[0] == '#':
+            continue
+        if stripped[0] == '[':
+            depth = len(stripped) - len(stripped.lstrip('['))
+            end = stripped.find(']' * depth, depth)
+            if end == -1 or depth > len(section_path) + 1:
+                raise UnsupportedIniSyntaxException(a_line)
+            name = stripped[depth:end].strip()
+            rest = stripped[end + depth:].lstrip()
+            if (
+                not name
+                or name[0] in '"\''
+                or (rest and rest[0] != '#')
+            ):
+                raise UnsupportedIniSyntaxException(a_line)
+            section_path = section_path[:depth - 1]
+            section_path.append(name)
+            prefix = '.'.join(section_path) + '.'
+            if prefix in names_seen or prefix[:-1] in values:
+                raise UnsupportedIniSyntaxException(a_line)
+            names_seen.add(prefix)
+            continue
+        key, equal_sign, value = stripped.partition('=')
+        key = key.rstrip()
+        if not equal_sign or not key or key[0] in '"\'':
+            raise UnsupportedIniSyntaxException(a_line)
+        key = prefix + key
+        if key in values or key + '.' in names_seen:
+            # duplicates are errors in ConfigObj
+            raise UnsupportedIniSyntaxException(a_line)
+        value = value.lstrip()
+        if value and (
+            value[0] in '"\'' or ',' in value or '#' in value or '%(' in value
+        ):
+            value = native_ini_value(value)
+        values[key] = value
+    return values
+
+
 #==============================================================================
 class LoadingIniFileFailsException(ValueException):
     pass
@@ -121,8 +316,19 @@ class ValueSource(object):
     def __init__(
         self, source,
         config_manager=None,
-        top_level_section_name=''
+        top_level_section_name='',
+        native_parser=None,
     ):
+        """parameters:
+            source - the ini file name or the ConfigObj class itself
+            config_manager - the ConfigurationManager being set up
+            top_level_section_name - not used
+            native_parser - True to read with the native ini reader, False
+                            to read with ConfigObj, None to use the module
+                            level 'use_native_parser' default
+        """
+        if native_parser is None:
+            native_parser = use_native_parser
         self.delayed_parser_instantiation = False
         self.top_level_section_name = top_level_section_name
         if source is configobj.ConfigObj:
@@ -146,7 +352,20 @@ class ValueSource(object):
             source.endswith(file_name_extension)
         ):
             try:
-                self.config_obj = ConfigObjWithIncludes(source)
+                if native_parser:
+                    self.values = parse_cache.get(
+                        source,
+                        'native_' + file_name_extension,
+                        self._parse_file_natively,
+                        with_dependencies=True
+                    )
+                else:
+                    self.values = parse_cache.get(
+                        source,
+                        file_name_extension,
+                        self._parse_file,
+                        with_dependencies=True
+                    )
             except Exception, x:
                 raise LoadingIniFileFailsException(
                     "ConfigObj cannot load ini: %s" % str(x)
@@ -164,20 +383,41 @@ class ValueSource(object):
             try:
                 app = config_manager._get_option('admin.application')
                 source = "%s%s" % (app.value.app_name, file_name_extension)
-                self.config_obj = configobj.ConfigObj(source)
+                self.values = flatten(configobj.ConfigObj(source))
                 self.delayed_parser_instantiation = False
             except AttributeError:
                 # we don't have enough information to get the ini file
                 # yet.  we'll ignore the error for now
                 return obj_hook()  # return empty dict of the obj_hook type
-        if isinstance(self.config_obj, obj_hook):
-            return self.config_obj
-        return obj_hook(initializer=self.config_obj)
+        if isinstance(self.values, obj_hook):
+            return self.values
+        return view_or_copy(self.values, obj_hook)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _parse_file(file_name):
+        config_obj = ConfigObjWithIncludes(file_name)
+        return flatten(config_obj), config_obj.files_read
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _parse_file_natively(file_name):
+        expander = IncludeExpander()
+        lines = expander.expand_includes(file_name)
+        try:
+            values = parse_ini(lines)
+        except UnsupportedIniSyntaxException:
+            # leave anything unusual to the general parser, it already has
+            # the includes expanded
+            values = flatten(configobj.ConfigObj(lines))
+        return values, expander.files_read
 
     #--------------------------------------------------------------------------
     @staticmethod
     def write(source_mapping, output_stream=sys.stdout):
-        ValueSource._write_ini(source_mapping, output_stream=output_stream)
+        """write the whole file with one call, rather than a line at a time,
+        so that writing to a pipe or an unbuffered stream stays cheap"""
+        output_stream.write(''.join(ValueSource.emit(source_mapping)))
 
     #--------------------------------------------------------------------------
     @staticmethod
@@ -190,85 +430,68 @@ class ValueSource(object):
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def _write_ini(source_dict, namespace_name=None, level=0, indent_size=4,
-                   output_stream=sys.stdout):
-        """this function prints the components of a configobj ini file.  It is
-        recursive for outputing the nested sections of the ini file."""
-        options = [
-            value
-            for value in source_dict.values()
-            if isinstance(value, Option)
-        ]
-        options.sort(cmp=lambda x, y: cmp(x.name, y.name))
+    def emit(source_dict, level=0, indent_size=4):
+        """a generator of the chunks of text of a configobj ini file, in
+        order.  It is recursive for the nested sections of the file."""
+        options = []
+        namespaces = []
+        for key, value in source_dict.iteritems():
+            if isinstance(value, Option):
+                options.append(value)
+            elif isinstance(value, Namespace):
+                namespaces.append((key, value))
+        options.sort(key=operator.attrgetter('name'))
         indent_spacer = " " * (level * indent_size)
         for an_option in options:
-            print >>output_stream, "%s# %s" % (indent_spacer, an_option.doc)
+            yield "%s# %s\n" % (indent_spacer, an_option.doc)
             option_value = str(an_option)
             if isinstance(option_value, unicode):
                 option_value = option_value.encode('utf8')
 
             if an_option.reference_value_from:
-                print >>output_stream, (
-                    '%s# see "%s.%s" for the default or override it here' % (
-                        indent_spacer,
-                        an_option.reference_value_from,
-                        an_option.name
-                    )
+                yield (
+                    '%s# see "%s.%s" for the default or override it here\n'
+                ) % (
+                    indent_spacer,
+                    an_option.reference_value_from,
+                    an_option.name
                 )
 
             if an_option.likely_to_be_changed or an_option.has_changed:
-                option_format = '%s%s=%s\n'
+                option_format = '%s%s=%s\n\n'
             else:
-                option_format = '%s#%s=%s\n'
+                option_format = '%s#%s=%s\n\n'
 
             if isinstance(option_value, basestring) and ',' in option_value:
                 # quote lists unless they're already quoted
                 if option_value[0] not in '\'"':
                     option_value = '"%s"' % option_value
 
-            print >>output_stream, option_format % (
+            yield option_format % (
                 indent_spacer,
                 an_option.name,
                 option_value
             )
         next_level = level + 1
-        namespaces = [
-            (key, value)
-            for key, value in source_dict.items()
-            if isinstance(value, Namespace)
-        ]
         namespaces.sort(key=ValueSource._namespace_reference_value_from_sort)
         for key, namespace in namespaces:
             next_level_spacer = " " * next_level * indent_size
-            print >>output_stream, "%s%s%s%s\n" % (
+            yield "%s%s%s%s\n\n" % (
                 indent_spacer,
                 "[" * next_level,
                 key,
                 "]" * next_level
             )
             if namespace._doc:
-                print >>output_stream, (
-                    "%s%s" % (next_level_spacer, namespace._doc)
-                )
+                yield "%s%s\n" % (next_level_spacer, namespace._doc)
             if namespace._reference_value_from:
-                print >>output_stream, (
-                    "%s#+include ./common_%s.ini\n"
-                    % (next_level_spacer, key)
-                )
-
-            if namespace_name:
-                ValueSource._write_ini(
-                    source_dict=namespace,
-                    namespace_name="%s.%s" % (namespace_name, key),
-                    level=level+1,
-                    indent_size=indent_size,
-                    output_stream=output_stream
-                )
-            else:
-                ValueSource._write_ini(
-                    source_dict=namespace,
-                    namespace_name=key,
-                    level=level+1,
-                    indent_size=indent_size,
-                    output_stream=output_stream
+                yield "%s#+include ./common_%s.ini\n\n" % (
+                    next_level_spacer,
+                    key
                 )
+            for a_chunk in ValueSource.emit(
+                namespace,
+                level=next_level,
+                indent_size=indent_size
+            ):
+                yield a_chunk
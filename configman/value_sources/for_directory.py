@@ -0,0 +1,129 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""This module implements a configuration value source for a directory of
+config file fragments, in the manner of 'conf.d' directories.  Each file in
+the directory with a fragment extension is loaded by the value source for its
+type.  The fragments are loaded concurrently by a pool of threads, then merged
+into a single flat table in the lexical order of their file names, so
+'20-local.ini' overrides '10-defaults.json'.
+
+Fragments are read through the process wide parse cache, so loading the
+directory again parses only the fragments that have changed since."""
+
+import os
+from multiprocessing.pool import ThreadPool
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
+
+from configman.value_sources import file_extension_dispatch, handles
+from configman.value_sources.source_exceptions import (
+    ValueException,
+    CantHandleTypeException
+)
+from configman.dotdict import DotDict, view_or_copy
+from configman.memoize import memoize
+
+can_handle = (
+    basestring,
+)
+
+# the file name extensions of the files in a directory that are loaded as
+# fragments.  Files with any other extension are ignored.
+fragment_extensions = ('ini', 'conf', 'json', 'cmb')
+
+# the largest number of threads used to load the fragments of one directory
+max_workers = 8
+
+
+#==============================================================================
+class FragmentLoadingError(ValueException):
+    pass
+
+
+#------------------------------------------------------------------------------
+def find_fragments(directory_name):
+    """return a list of the pathnames of the fragments in a directory in the
+    lexical order of their file names"""
+    return [
+        os.path.join(directory_name, a_file_name)
+        for a_file_name in sorted(os.listdir(directory_name))
+        if os.path.splitext(a_file_name)[1][1:] in fragment_extensions
+        and os.path.isfile(os.path.join(directory_name, a_file_name))
+    ]
+
+
+#==============================================================================
+class ValueSource(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, source, the_config_manager=None, workers=None):
+        """parameters:
+            source - the name of a directory of fragments
+            the_config_manager - the ConfigurationManager being set up
+            workers - the number of threads with which to load fragments.
+                      None means one per fragment, up to 'max_workers'"""
+        if not (isinstance(source, basestring) and handles.directory(source)):
+            raise CantHandleTypeException()
+        self.fragments = find_fragments(source)
+        if workers is None:
+            workers = min(len(self.fragments), max_workers)
+        if workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                fragment_tables = pool.map(
+                    lambda a_fragment: self._load_fragment(
+                        a_fragment,
+                        the_config_manager
+                    ),
+                    self.fragments
+                )
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            fragment_tables = [
+                self._load_fragment(a_fragment, the_config_manager)
+                for a_fragment in self.fragments
+            ]
+        self.values = OrderedDict()
+        for a_table in fragment_tables:
+            self.values.update(a_table)
+        if "always_ignore_mismatches" in self.values:
+            self.always_ignore_mismatches = bool(
+                self.values["always_ignore_mismatches"]
+            )
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _load_fragment(file_name, the_config_manager):
+        """return a list of the (key, value) pairs of a fragment"""
+        a_handler = file_extension_dispatch.get_handler(
+            os.path.splitext(file_name)[1][1:]
+        )
+        try:
+            values = a_handler.ValueSource(
+                file_name,
+                the_config_manager
+            ).get_values(the_config_manager, True)
+            return [
+                (key, values[key])
+                for key in values.keys_breadth_first()
+            ]
+        except Exception, x:
+            raise FragmentLoadingError(
+                "Directory couldn't load the fragment %s: %s"
+                % (file_name, str(x))
+            )
+
+    #--------------------------------------------------------------------------
+    @memoize()
+    def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
+        """the 'config_manager' and 'ignore_mismatches' are dummy values for
+        this implementation of a ValueSource."""
+        return view_or_copy(self.values, obj_hook)
@@ -20,7 +20,7 @@ from configman import dotdict
 from configman import option
 from configman import namespace
 from configman.config_exceptions import NotAnOptionError
-from configman.converters import boolean_converter
+from configman.converters import boolean_converter, str_to_help_topic
 from configman.dotdict import DotDict
 from configman.memoize import memoize
 
@@ -39,6 +39,12 @@ can_handle = (
     list,   # a list of options to serve as the argv source
 )
 
+# the converters of the options that are switches, like boolean options,
+# but that may also be given a value, as in '--help' and '--help=db'
+optional_value_converters = (
+    str_to_help_topic,
+)
+
 
 #==============================================================================
 class ValueSource(object):
@@ -81,6 +87,10 @@ class ValueSource(object):
         short_options_str, long_options_list = self.getopt_create_opts(
             config_manager.option_definitions
         )
+        argv, flag_values = self._take_flag_values(
+            self.argv_source,
+            config_manager.option_definitions
+        )
         try:
             if ignore_mismatches:
                 fn = ValueSource.getopt_with_ignore
@@ -90,7 +100,7 @@ class ValueSource(object):
             # consumes the defined switches.  The things that are not
             # consumed are then offered as the 'args' variable of the
             # parent configuration_manager
-            getopt_options, config_manager.args = fn(self.argv_source,
+            getopt_options, config_manager.args = fn(argv,
                                                      short_options_str,
                                                      long_options_list)
         except getopt.GetoptError, x:
@@ -113,7 +123,7 @@ class ValueSource(object):
             if option_.from_string_converter == boolean_converter:
                 command_line_values[name] = not option_.default
             else:
-                command_line_values[name] = opt_val
+                command_line_values[name] = flag_values.get(name, opt_val)
         for name, value in zip(
             self._get_arguments(
                 config_manager.option_definitions,
@@ -124,6 +134,33 @@ class ValueSource(object):
             command_line_values[name] = value
         return command_line_values
 
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _take_flag_values(argv, option_definitions):
+        """getopt gives no value to a switch.  Those of the options with one
+        of the optional_value_converters may be given one anyway, as in
+        '--help=db'.  Return the argv with those values taken out, and a
+        mapping of the option names to the values."""
+        flag_values = {}
+        new_argv = list(argv)
+        for index, an_arg in enumerate(argv):
+            if an_arg == '--':
+                break
+            if not an_arg.startswith('--') or '=' not in an_arg:
+                continue
+            name, value = an_arg[2:].split('=', 1)
+            try:
+                option_ = option_definitions[name]
+            except (KeyError, AttributeError):
+                continue
+            if (
+                isinstance(option_, option.Option)
+                and option_.from_string_converter in optional_value_converters
+            ):
+                flag_values[name] = value
+                new_argv[index] = '--' + name
+        return new_argv, flag_values
+
     #--------------------------------------------------------------------------
     def getopt_create_opts(self, option_definitions):
         short_options_list = []
@@ -142,7 +179,10 @@ class ValueSource(object):
                                      long_options_list):
         for key, val in source.items():
             if isinstance(val, option.Option):
-                boolean_option = type(val.default) == bool
+                boolean_option = (
+                    type(val.default) == bool
+                    or val.from_string_converter in optional_value_converters
+                )
                 if val.short_form:
                     try:
                         if boolean_option:
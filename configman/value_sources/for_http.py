@@ -0,0 +1,412 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""This module implements a configuration value source backed by a key/value
+HTTP service.  The source is given as the base URL of the service.  Each top
+level namespace is a resource of its own: the keys of the namespace 'db' are
+fetched with a GET of '<base URL>/db', the keys that are not in any namespace
+with a GET of '<base URL>/'.  The response is a json object of the keys
+within that namespace, nested or in the dotted 'x.y' form.  A 404 response
+means the namespace has no keys.
+
+Only the namespaces that the ConfigurationManager has options in are
+fetched.  Whenever a namespace is needed that hasn't been fetched yet, every
+namespace currently known to be needed is fetched in the same batch, one
+request after another over a persistent connection from a process wide
+pool.
+
+Responses are kept in an on disk cache along with their ETags, so a later
+start sends conditional requests and a 304 response reuses the cached
+keys.  The cache holds config values, secrets among them, so it is only used
+in a directory that belongs to the user and that no one else may read or
+write.  If the service can't be reached, or fails, the last good response in
+the cache is used instead.  With nothing in the cache, the failure is fatal
+when the ValueSource is made, and a warning afterwards.
+
+A service shared by many apps will hold keys that any one app doesn't know,
+so this value source always ignores mismatches."""
+
+import collections
+import hashlib
+import httplib
+import json
+import os
+import socket
+import stat
+import tempfile
+import threading
+import urllib
+import urlparse
+import warnings
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
+
+from configman.value_sources import handles
+from configman.value_sources.source_exceptions import (
+    ValueException,
+    CantHandleTypeException
+)
+from configman.value_sources.parse_cache import flatten
+from configman.dotdict import DotDict, view_or_copy
+from configman.memoize import memoize
+
+can_handle = (
+    basestring,
+)
+
+# the number of seconds to wait on the service before giving up
+timeout = 5.0
+
+# the directory of the cache of responses.  None means a directory of the
+# user's own in the system's temporary directory:
+# 'configman_http_cache-<uid>'
+cache_directory = None
+
+# the largest number of idle connections kept open to any one host
+max_idle_connections_per_host = 4
+
+
+#==============================================================================
+class HttpSourceUnavailableError(ValueException):
+    pass
+
+
+#==============================================================================
+class ConnectionPool(object):
+    """a thread safe pool of idle persistent HTTP connections, by host"""
+
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    #--------------------------------------------------------------------------
+    def get(self, scheme, netloc):
+        """return a 2-tuple: a connection and True if it was taken from the
+        pool, rather than newly made"""
+        with self._lock:
+            try:
+                return self._idle[(scheme, netloc)].pop(), True
+            except (KeyError, IndexError):
+                pass
+        if scheme == 'https':
+            connection_class = httplib.HTTPSConnection
+        else:
+            connection_class = httplib.HTTPConnection
+        return connection_class(netloc, timeout=timeout), False
+
+    #--------------------------------------------------------------------------
+    def put(self, scheme, netloc, connection):
+        """return a connection to the pool once its response has been read"""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < max_idle_connections_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    #--------------------------------------------------------------------------
+    def clear(self):
+        """close all the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for connection in connections:
+                connection.close()
+
+
+#------------------------------------------------------------------------------
+# the pool shared by all the http ValueSources in this process
+connection_pool = ConnectionPool()
+
+
+#------------------------------------------------------------------------------
+def http_get(url, headers=None):
+    """GET a URL over a pooled connection and return a 3-tuple of the
+    status, the ETag header or None, and the body of the response.  A pooled
+    connection that the server has since closed is replaced and the request
+    tried again."""
+    parts = urlparse.urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = '%s?%s' % (path, parts.query)
+    while True:
+        connection, was_pooled = connection_pool.get(
+            parts.scheme,
+            parts.netloc
+        )
+        try:
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except (socket.error, httplib.HTTPException):
+            connection.close()
+            if was_pooled:
+                continue
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            connection_pool.put(parts.scheme, parts.netloc, connection)
+        return response.status, response.getheader('etag'), body
+
+
+#==============================================================================
+class ResponseCache(object):
+    """the on disk cache of the keys and ETags of responses, one file per
+    URL"""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = cache_directory
+        if directory is None:
+            directory_name = 'configman_http_cache'
+            if hasattr(os, 'getuid'):
+                # without a uid, as on Windows, the temporary directory is
+                # the user's own
+                directory_name += '-%d' % os.getuid()
+            directory = os.path.join(tempfile.gettempdir(), directory_name)
+        self.directory = directory
+
+    #--------------------------------------------------------------------------
+    def _is_private(self):
+        """return True if the cache directory can be trusted: a directory,
+        not a link to one, that belongs to this user and that no one else
+        has any permissions on.  The directory is made if it doesn't
+        exist."""
+        try:
+            if not os.path.lexists(self.directory):
+                os.makedirs(self.directory, 0700)
+            directory_stat = os.lstat(self.directory)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(directory_stat.st_mode):
+            return False
+        if not hasattr(os, 'getuid'):
+            # no owners or permission bits to check
+            return True
+        if directory_stat.st_uid != os.getuid():
+            return False
+        return not directory_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+
+    #--------------------------------------------------------------------------
+    def _check_private(self):
+        if self._is_private():
+            return True
+        warnings.warn(
+            'the http response cache %s is not used, it is not a private '
+            'directory of this user' % self.directory
+        )
+        return False
+
+    #--------------------------------------------------------------------------
+    def _file_name(self, url):
+        return os.path.join(
+            self.directory,
+            '%s.json' % hashlib.sha1(url).hexdigest()
+        )
+
+    #--------------------------------------------------------------------------
+    def get(self, url):
+        """return a 2-tuple of the ETag and the flat mapping of keys from the
+        last good response for a URL, or None if there isn't one"""
+        if not self._check_private():
+            return None
+        try:
+            with open(self._file_name(url)) as f:
+                entry = json.load(f, object_pairs_hook=OrderedDict)
+            return entry['etag'], entry['values']
+        except (IOError, ValueError, KeyError):
+            return None
+
+    #--------------------------------------------------------------------------
+    def put(self, url, etag, values):
+        """save a response.  The cache is only an aid, failing to write it
+        is not an error."""
+        if not self._check_private():
+            return
+        try:
+            handle, temporary_file_name = tempfile.mkstemp(
+                dir=self.directory
+            )
+            with os.fdopen(handle, 'w') as f:
+                json.dump({'url': url, 'etag': etag, 'values': values}, f)
+            # a rename, so readers never see a partly written file
+            os.rename(temporary_file_name, self._file_name(url))
+        except (IOError, OSError):
+            pass
+
+
+#==============================================================================
+class HttpMapping(collections.Mapping):
+    """a read-only flat mapping of dotted keys that fetches each top level
+    namespace from the service the first time a key within it is looked
+    up"""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, base_url, the_config_manager=None, response_cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.config_manager = the_config_manager
+        self.response_cache = response_cache or ResponseCache()
+        self.fetched_namespaces = set()
+        # namespaces whose keys came from the cache because the service
+        # failed
+        self.stale_namespaces = set()
+        self._values = OrderedDict()
+        self._namespaces = set()
+        self._lock = threading.RLock()
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _namespace_of(key):
+        if '.' in key:
+            return key.partition('.')[0]
+        return ''
+
+    #--------------------------------------------------------------------------
+    def wanted_namespaces(self):
+        """return the set of the top level namespaces of all the options
+        known to the ConfigurationManager at this moment"""
+        try:
+            keys = self.config_manager.option_definitions.keys_breadth_first()
+        except AttributeError:
+            return set([''])
+        return set(self._namespace_of(a_key) for a_key in keys) | set([''])
+
+    #--------------------------------------------------------------------------
+    def fetch(self, namespaces):
+        """fetch, in one batch, those of the namespaces not yet fetched.  If
+        the service fails for a namespace that isn't in the cache,
+        HttpSourceUnavailableError is raised after the rest of the batch has
+        been fetched."""
+        failures = []
+        with self._lock:
+            for a_namespace in sorted(
+                set(namespaces) - self.fetched_namespaces
+            ):
+                try:
+                    values = self._fetch_namespace(a_namespace)
+                except HttpSourceUnavailableError, x:
+                    failures.append(str(x))
+                    values = {}
+                self.fetched_namespaces.add(a_namespace)
+                for key, value in values.iteritems():
+                    if a_namespace:
+                        key = '%s.%s' % (a_namespace, key)
+                    self._values[key] = value
+                    self._add_namespaces_of(key)
+        if failures:
+            raise HttpSourceUnavailableError('; '.join(failures))
+
+    #--------------------------------------------------------------------------
+    def _add_namespaces_of(self, key):
+        namespace = key.rpartition('.')[0]
+        while namespace and namespace not in self._namespaces:
+            self._namespaces.add(namespace)
+            namespace = namespace.rpartition('.')[0]
+
+    #--------------------------------------------------------------------------
+    def _fetch_namespace(self, a_namespace):
+        url = '%s/%s' % (self.base_url, urllib.quote(a_namespace))
+        cached = self.response_cache.get(url)
+        headers = {}
+        if cached is not None and cached[0]:
+            headers['If-None-Match'] = cached[0]
+        try:
+            status, etag, body = http_get(url, headers)
+        except (socket.error, httplib.HTTPException), x:
+            status, failure = None, x
+        else:
+            failure = 'status %d' % status
+        if status == 200:
+            try:
+                values = flatten(json.loads(body))
+                self.response_cache.put(url, etag, values)
+                return values
+            except (ValueError, AttributeError), x:
+                failure = 'bad response: %s' % x
+        elif status == 304 and cached is not None:
+            return cached[1]
+        elif status == 404:
+            self.response_cache.put(url, None, {})
+            return {}
+        if cached is not None:
+            self.stale_namespaces.add(a_namespace)
+            return cached[1]
+        raise HttpSourceUnavailableError(
+            "Http couldn't fetch %s: %s" % (url, failure)
+        )
+
+    #--------------------------------------------------------------------------
+    def _ensure_fetched(self, a_namespace):
+        if a_namespace in self.fetched_namespaces:
+            return
+        try:
+            self.fetch(self.wanted_namespaces() | set([a_namespace]))
+        except HttpSourceUnavailableError, x:
+            # lookups happen in the middle of the overlay of values, it is
+            # too late for the failure to be fatal
+            warnings.warn(str(x))
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        self._ensure_fetched(self._namespace_of(key))
+        return self._values[key]
+
+    #--------------------------------------------------------------------------
+    def is_namespace(self, key):
+        """return True if there are keys of the form 'key.x'"""
+        self._ensure_fetched(key.partition('.')[0])
+        return key in self._namespaces
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        """iterate over the keys fetched so far"""
+        return iter(self._values)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._values)
+
+
+#==============================================================================
+class ValueSource(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(
+        self,
+        source,
+        the_config_manager=None,
+        cache_directory=None
+    ):
+        """parameters:
+            source - the base URL of the key/value service
+            the_config_manager - the ConfigurationManager being set up.  Its
+                                 options determine which namespaces are
+                                 fetched.
+            cache_directory - the directory of the cache of responses.  None
+                              means the module level 'cache_directory'"""
+        if not (isinstance(source, basestring) and handles.http_url(source)):
+            raise CantHandleTypeException()
+        self.values = HttpMapping(
+            source,
+            the_config_manager,
+            ResponseCache(cache_directory)
+        )
+        # fetch what is known to be needed now, so that an unusable service
+        # is reported while the value sources are being set up
+        self.values.fetch(self.values.wanted_namespaces())
+        self.always_ignore_mismatches = True
+
+    #--------------------------------------------------------------------------
+    @memoize()
+    def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
+        """the 'config_manager' and 'ignore_mismatches' are dummy values for
+        this implementation of a ValueSource."""
+        return view_or_copy(self.values, obj_hook)
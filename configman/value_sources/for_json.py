@@ -4,6 +4,8 @@
 
 import json
 import collections
+import os
+import re
 import sys
 
 from configman.converters import (
@@ -18,7 +20,16 @@ from configman.value_sources.source_exceptions import (
     CantHandleTypeException
 )
 
-from configman.dotdict import DotDict
+from configman.value_sources.parse_cache import (
+    parse_cache,
+    flatten,
+    OrderedDict
+)
+from configman.dotdict import (
+    DotDict,
+    iteritems_breadth_first,
+    view_or_copy
+)
 from configman.memoize import memoize
 
 can_handle = (
@@ -28,17 +39,252 @@ can_handle = (
 
 file_name_extension = 'json'
 
+# json files at least this large (in bytes) are decoded lazily, value by
+# value, as their values are looked up.  See LazyJsonMapping.  Set to None to
+# never decode lazily unless a source asks for it, as
+# SourceWithOptions(source, lazy=True).
+lazy_decoding_threshold = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_skip_whitespace = json.decoder.WHITESPACE.match
+_string = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_scalar = re.compile(r'[^\s,\]}]+')
+_quote_or_bracket = re.compile(r'["{}\[\]]')
+
+
+#------------------------------------------------------------------------------
+def _skip_string(text, idx):
+    """return the index just past the json string that starts at idx"""
+    match = _string.match(text, idx)
+    if match is None:
+        raise ValueError('Unterminated string starting at: %d' % idx)
+    return match.end()
+
+
+#------------------------------------------------------------------------------
+def _skip_value(text, idx):
+    """return the index just past the json value that starts at idx.  The
+    value is not decoded: strings are skipped whole and only the nesting of
+    the brackets is followed, so a malformed value is only reported when it
+    is decoded."""
+    first = text[idx:idx + 1]
+    if first == '"':
+        return _skip_string(text, idx)
+    if first not in ('{', '['):
+        match = _scalar.match(text, idx)
+        if match is None:
+            raise ValueError('Expecting value: %d' % idx)
+        return match.end()
+    depth = 0
+    while True:
+        match = _quote_or_bracket.search(text, idx)
+        if match is None:
+            raise ValueError('Unterminated value: %d' % idx)
+        idx = match.start()
+        char = match.group()
+        if char == '"':
+            idx = _skip_string(text, idx)
+            continue
+        idx += 1
+        if char in '{[':
+            depth += 1
+        else:
+            depth -= 1
+            if not depth:
+                return idx
+
 
 #==============================================================================
 class LoadingJsonFileFailsException(ValueException):
     pass
 
 
+#==============================================================================
+class LazyJsonMapping(collections.Mapping):
+    """A read-only mapping over the text of a json object that decodes a
+    value only when its key is first looked up.  At construction, the text
+    is scanned once, without decoding anything, to index where the value of
+    each key starts and ends.  The value of a key that is a json object, a
+    namespace, is itself a LazyJsonMapping over the same text.  Afterwards,
+    only the raw text, the index and the values that have actually been
+    asked for are held in memory.
+
+    Like a DotDict, it accepts keys of the form 'x.y.z'."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, text, start=None):
+        """parameters:
+            text - the json text
+            start - for a nested object, the index of its opening brace
+                    within the text.  Left as None, the whole text must be
+                    one json object."""
+        self._text = text
+        self._index = OrderedDict()
+        self._decoded = {}
+        if start is None:
+            self.end = self._index_object(_skip_whitespace(text, 0).end())
+            if _skip_whitespace(text, self.end).end() != len(text):
+                raise ValueError('Extra data: %d' % self.end)
+        else:
+            self.end = self._index_object(start)
+
+    #--------------------------------------------------------------------------
+    def _index_object(self, idx):
+        """index the keys of the json object that starts at idx and return
+        the index just past its end"""
+        text = self._text
+        skip_whitespace = lambda idx: _skip_whitespace(text, idx).end()
+        if text[idx:idx + 1] != '{':
+            raise ValueError('Expecting object: %d' % idx)
+        idx = skip_whitespace(idx + 1)
+        if text[idx:idx + 1] == '}':
+            return idx + 1
+        while True:
+            if text[idx:idx + 1] != '"':
+                raise ValueError('Expecting property name: %d' % idx)
+            key, idx = json.decoder.scanstring(text, idx + 1)
+            idx = skip_whitespace(idx)
+            if text[idx:idx + 1] != ':':
+                raise ValueError('Expecting : delimiter: %d' % idx)
+            start = skip_whitespace(idx + 1)
+            if text[start:start + 1] == '{':
+                namespace = LazyJsonMapping(text, start)
+                self._index[key] = namespace
+                idx = namespace.end
+            else:
+                idx = _skip_value(text, start)
+                self._index[key] = start
+            idx = skip_whitespace(idx)
+            delimiter = text[idx:idx + 1]
+            idx = skip_whitespace(idx + 1)
+            if delimiter == '}':
+                return idx
+            if delimiter != ',':
+                raise ValueError('Expecting , delimiter: %d' % idx)
+
+    #--------------------------------------------------------------------------
+    def _decode(self, key, keep=True):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        start = self._index[key]
+        if isinstance(start, LazyJsonMapping):
+            return start
+        try:
+            value = _decoder.scan_once(self._text, start)[0]
+        except StopIteration:
+            raise ValueError('No JSON object could be decoded: %d' % start)
+        if keep:
+            self._decoded[key] = value
+        return value
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        if key in self._index:
+            return self._decode(key)
+        head, dot, rest = key.partition('.')
+        if dot and isinstance(self._index.get(head), LazyJsonMapping):
+            return self._index[head][rest]
+        raise KeyError(key)
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self._index)
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._index)
+
+    #--------------------------------------------------------------------------
+    def iteritems(self):
+        """iterate without retaining the values that have not already been
+        decoded by lookups"""
+        for key in self._index:
+            yield key, self._decode(key, keep=False)
+
+    #--------------------------------------------------------------------------
+    def keys_breadth_first(self, include_dicts=False):
+        for key, value in iteritems_breadth_first(self, include_dicts):
+            yield key
+
+    #--------------------------------------------------------------------------
+    def iterkeys_of_values(self):
+        """iterate over the keys, in the form 'x.y.z', of all the values that
+        are not namespaces, without decoding any of them"""
+        for key, start in self._index.iteritems():
+            if isinstance(start, LazyJsonMapping):
+                for sub_key in start.iterkeys_of_values():
+                    yield '%s.%s' % (key, sub_key)
+            else:
+                yield key
+
+    #--------------------------------------------------------------------------
+    def is_namespace(self, key):
+        """True if the key, in the form 'x.y.z', is a json object with values
+        in it"""
+        try:
+            namespace = self[key]
+        except KeyError:
+            return False
+        return isinstance(namespace, LazyJsonMapping) and any(
+            namespace.iterkeys_of_values()
+        )
+
+    #--------------------------------------------------------------------------
+    def decoded_keys(self):
+        """the top level keys with values that have been decoded so far"""
+        return [
+            key for key, start in self._index.iteritems()
+            if key in self._decoded
+            or isinstance(start, LazyJsonMapping) and start.decoded_keys()
+        ]
+
+
+#==============================================================================
+class FlatLazyJsonMapping(collections.Mapping):
+    """A read-only flat mapping of the values of a LazyJsonMapping with keys
+    of the form 'x.y.z', as the DotDictView expects.  Like the mapping that
+    an eagerly read json file is flattened into, it has no keys for the
+    namespaces.  Nothing is decoded until it is looked up."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, a_lazy_json_mapping):
+        self._lazy_json_mapping = a_lazy_json_mapping
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        value = self._lazy_json_mapping[key]
+        if isinstance(value, LazyJsonMapping):
+            raise KeyError(key)
+        return value
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return self._lazy_json_mapping.iterkeys_of_values()
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return sum(1 for key in self)
+
+    #--------------------------------------------------------------------------
+    def is_namespace(self, key):
+        return self._lazy_json_mapping.is_namespace(key)
+
+
 #==============================================================================
 class ValueSource(object):
 
     #--------------------------------------------------------------------------
-    def __init__(self, source, the_config_manager=None):
+    def __init__(self, source, the_config_manager=None, lazy=None):
+        """parameters:
+            source - the json file name or the json module itself
+            the_config_manager - the ConfigurationManager being set up
+            lazy - True to decode the top level keys of the file only as
+                   they are looked up, False to decode the whole file now,
+                   None to decide by comparing the size of the file with
+                   the module level 'lazy_decoding_threshold'
+        """
         self.values = None
         if source is json:
             try:
@@ -53,44 +299,105 @@ class ValueSource(object):
             and source.endswith(file_name_extension)
         ):
             try:
-                with open(source) as fp:
-                    self.values = json.load(fp)
-            except IOError, x:
+                if lazy is None:
+                    lazy = self._is_large_file(source)
+                if lazy:
+                    self.values = parse_cache.get(
+                        source,
+                        'lazy_' + file_name_extension,
+                        self._index_file
+                    )
+                else:
+                    self.values = parse_cache.get(
+                        source,
+                        file_name_extension,
+                        self._parse_file
+                    )
+            except (IOError, OSError), x:
                 # The file doesn't exist.  That's ok, we'll give warning
                 # but this isn't a fatal error
                 import warnings
                 warnings.warn("%s doesn't exist" % source)
                 self.values = {}
-            except ValueError:
+            except ValueError, x:
                 raise LoadingJsonFileFailsException(
                     "Cannot load json: %s" % str(x)
                 )
         else:
             raise CantHandleTypeException()
+        if "always_ignore_mismatches" in self.values:
+            # a json file shared by many apps can declare that the keys
+            # that an app doesn't know are not errors
+            self.always_ignore_mismatches = bool(
+                self.values["always_ignore_mismatches"]
+            )
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _is_large_file(file_name):
+        if lazy_decoding_threshold is None:
+            return False
+        try:
+            return os.path.getsize(file_name) >= lazy_decoding_threshold
+        except OSError:
+            # let the open fail with a more meaningful error
+            return False
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _parse_file(file_name):
+        with open(file_name) as fp:
+            return flatten(json.load(fp))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _index_file(file_name):
+        with open(file_name) as fp:
+            return LazyJsonMapping(fp.read())
 
     #--------------------------------------------------------------------------
     @memoize()
     def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
         if isinstance(self.values, obj_hook):
             return self.values
-        return obj_hook(self.values)
+        if isinstance(self.values, LazyJsonMapping):
+            if obj_hook is DotDict:
+                # the lazy mapping offers the same dotted key lookups as the
+                # DotDict, copying it would decode everything
+                return self.values
+            return view_or_copy(FlatLazyJsonMapping(self.values), obj_hook)
+        return view_or_copy(self.values, obj_hook)
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def recursive_default_dict():
-        return collections.defaultdict(ValueSource.recursive_default_dict)
+    def write(source_dict, output_stream=sys.stdout):
+        """write the whole document with one call.  json.dump would write it
+        a token at a time."""
+        output_stream.write(''.join(ValueSource.emit(source_dict)))
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def write(source_dict, output_stream=sys.stdout):
-        json_dict = ValueSource.recursive_default_dict()
-        for qkey in source_dict.keys_breadth_first(include_dicts=True):
-            val = source_dict[qkey]
-            if isinstance(val, Namespace):
+    def emit(source_dict):
+        """a generator of the chunks of text of the json document.  The
+        document is encoded as one chunk, by the json module's C encoder,
+        which is many times faster than producing it a token at a time."""
+        yield json.dumps(ValueSource._to_json_dict(source_dict))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _to_json_dict(source_dict):
+        """return the nested dicts of the json document for a DotDict.
+        Namespaces with nothing in them are left out."""
+        json_dict = {}
+        for key in source_dict:
+            val = getattr(source_dict, key)
+            # Options are by far the most common, and the cheapest to test
+            if not isinstance(val, Option) and isinstance(val, DotDict):
+                d = ValueSource._to_json_dict(val)
+                if d or not isinstance(val, Namespace):
+                    json_dict[key] = d
                 continue
-            d = json_dict
-            for x in qkey.split('.'):
-                d = d[x]
+            json_dict[key] = d = {}
             if isinstance(val, Option):
                 for okey, oval in val.__dict__.iteritems():
                     try:
@@ -102,6 +409,6 @@ class ValueSource(object):
                 d['name'] = val.name
                 fn = val.function
                 d['function'] = to_string_converters[type(fn)](fn)
-        json.dump(json_dict, output_stream)
+        return json_dict
 
 
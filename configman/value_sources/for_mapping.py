@@ -7,7 +7,8 @@ import os
 
 from configman.value_sources.source_exceptions import CantHandleTypeException
 
-from configman.dotdict import DotDict
+from configman.value_sources.parse_cache import as_flat_mapping
+from configman.dotdict import DotDict, view_or_copy
 from configman.memoize import memoize
 
 
@@ -32,11 +33,14 @@ class ValueSource(object):
         else:
             raise CantHandleTypeException()
         self.source = source
+        self._flat_source = None
 
     #--------------------------------------------------------------------------
     @memoize()
     def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
         if isinstance(self.source, obj_hook):
             return self.source
-        return obj_hook(initializer=self.source)
+        if self._flat_source is None:
+            self._flat_source = as_flat_mapping(self.source)
+        return view_or_copy(self._flat_source, obj_hook)
 
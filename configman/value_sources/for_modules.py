@@ -12,9 +12,11 @@ import re
 from inspect import isclass, ismodule, isfunction
 from types import NoneType
 from collections import defaultdict
+from operator import itemgetter
 
 from configman.namespace import Namespace
-from configman.dotdict import DotDict
+from configman.dotdict import DotDict, view_or_copy
+from configman.value_sources.parse_cache import flatten
 from configman.option import Option, Aggregation
 from configman.converters import (
     to_str,
@@ -187,6 +189,20 @@ def local_to_str(a_thing):
             return to_str(a_thing)
 
 
+#------------------------------------------------------------------------------
+def _items_within(a_dot_dict, prefix=''):
+    """a generator of the keys, in the form 'x.y.z', and the values of
+    everything within a set of nested DotDicts, the DotDicts included"""
+    for key in a_dot_dict:
+        value = getattr(a_dot_dict, key)
+        full_key = prefix + key
+        yield full_key, value
+        # Options are by far the most common, and the cheapest to test
+        if not isinstance(value, Option) and isinstance(value, DotDict):
+            for an_item in _items_within(value, full_key + '.'):
+                yield an_item
+
+
 #==============================================================================
 class ValueSource(object):
     #--------------------------------------------------------------------------
@@ -212,76 +228,91 @@ class ValueSource(object):
             module_as_dotdict[key] = value
         self.module = source
         self.source = module_as_dotdict
+        self.values = flatten(module_as_dotdict)
 
     #--------------------------------------------------------------------------
     def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
         if isinstance(self.source, obj_hook):
             return self.source
-        return obj_hook(initializer=self.source)
+        return view_or_copy(self.values, obj_hook)
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def write_class(key, value, alias_by_class, output_stream):
+    def emit_class(key, value, alias_by_class):
         if value in alias_by_class:
             class_str = alias_by_class[value]
         else:
             class_str = local_to_str(value)
         if is_identifier(class_str):
             parts = [x.strip() for x in class_str.split('.') if x.strip()]
-            print >>output_stream, '%s = %s' % (key, parts[-1])
+            return '%s = %s\n' % (key, parts[-1])
         else:
-            print >>output_stream, '%s = "%s"' % (key, class_str)
+            return '%s = "%s"\n' % (key, class_str)
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def write_bare_value(key, value, output_stream):
+    def emit_bare_value(key, value, alias_by_class):
         if isclass(value):
-            ValueSource.write_class(key, value, output_stream)
-            return
+            return ValueSource.emit_class(key, value, alias_by_class)
         try:
             value = local_to_str(value)
         except CannotConvertError:
             value = repr(value)
         if '\n' in value:
             value = "'''%s'''" % str_quote_stripper(value)
-        print >>output_stream, '%s = %s' % (key, value)
+        return '%s = %s\n' % (key, value)
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def write_option(key, an_option, alias_by_class, output_stream):
-        print >>output_stream, '\n',
+    def emit_option(key, an_option, alias_by_class):
         if an_option.doc:
-            print >>output_stream, '# %s' % an_option.doc
+            doc = '# %s\n' % an_option.doc
+        else:
+            doc = ''
         if (
             isclass(an_option.value)
             or ismodule(an_option.value)
             or isfunction(an_option.value)
         ):
-            ValueSource.write_class(
-                key,
-                an_option.value,
-                alias_by_class,
-                output_stream
-            )
-            return
+            return ''.join((
+                '\n',
+                doc,
+                ValueSource.emit_class(key, an_option.value, alias_by_class)
+            ))
         else:
             value = local_to_str(an_option.value)
-            print >>output_stream, '%s = %s' % (key, value)
+            return '\n%s%s = %s\n' % (doc, key, value)
 
     #--------------------------------------------------------------------------
     @staticmethod
-    def write_namespace(key, a_namespace, output_stream):
-        print >>output_stream, '\n# Namespace:', key
+    def emit_namespace(key, a_namespace):
         if hasattr(a_namespace, 'doc'):
-            print >>output_stream, '#', a_namespace.doc
-        print >>output_stream, '%s = DotDict()' % key
+            return '\n# Namespace: %s\n# %s\n%s = DotDict()\n' % (
+                key,
+                a_namespace.doc,
+                key
+            )
+        return '\n# Namespace: %s\n%s = DotDict()\n' % (key, key)
 
     #--------------------------------------------------------------------------
     @staticmethod
     def write(source_mapping, output_stream=sys.stdout):
         """This method writes a Python module respresenting all the keys
-        and values known to configman.
+        and values known to configman.  The module is written with one call,
+        rather than a line at a time.
+        """
+        output_stream.write(''.join(ValueSource.emit(source_mapping)))
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def emit(source_mapping):
+        """a generator of the chunks of text of a Python module respresenting
+        all the keys and values known to configman, in order.
         """
+        # the keys and values are gathered in one walk of the mapping, sorted
+        # by key, as the module is to be written
+        items = sorted(_items_within(source_mapping), key=itemgetter(0))
+
         # a set of classes, modules and/or functions that are values in
         # configman options.  These values will have to be imported in the
         # module that this method is writing.
@@ -295,11 +326,14 @@ class ValueSource(object):
         symbols_to_ignore = set()
 
         # look ahead to see what sort of imports we're going to have to do
-        for key in source_mapping.keys_breadth_first():
-            value = source_mapping[key]
-
-            if isinstance(value, Aggregation):
-                # Aggregations don't get included, skip on
+        for key, value in items:
+            if isinstance(value, Option):
+                # it's the value inside the option, not the option itself
+                # that is of interest to us
+                value = value.value
+            elif isinstance(value, (Aggregation, DotDict)):
+                # Aggregations don't get included, skip on.  Namespaces
+                # are only looked into.
                 continue
 
             if '.' in key:
@@ -307,13 +341,6 @@ class ValueSource(object):
                 # we will use the DotDict class to represent namespaces
                 set_of_classes_needing_imports.add(DotDict)
 
-            option = None
-            if isinstance(value, Option):
-                # it's the value inside the option, not the option itself
-                # that is of interest to us
-                option = value
-                value = option.value
-
             if value is None:
                 # we don't need in import anything having to do with None
                 continue
@@ -371,7 +398,7 @@ class ValueSource(object):
                 )
 
         # start writing the output module
-        print >>output_stream, "# generated Python configman file\n"
+        yield "# generated Python configman file\n\n"
 
         # the first section that we're going to write is imports of the form:
         #     from X import Y
@@ -409,7 +436,7 @@ class ValueSource(object):
                         symbols_to_ignore.add(a_class_name)
 
                 output_line = output_line + ')'
-                print >>output_stream, output_line.strip()
+                yield output_line.strip() + '\n'
             else:
                 a_class, a_class_name = list_of_class_names[0]
                 output_line = "from %s import %s" % (
@@ -424,8 +451,8 @@ class ValueSource(object):
                     symbols_to_ignore.add(alias_by_class[a_class])
                 else:
                     symbols_to_ignore.add(a_class_name)
-                print >>output_stream, output_line.strip()
-        print >>output_stream, ''
+                yield output_line.strip() + '\n'
+        yield '\n'
 
         # The next section to write will be the imports of the form:
         #     import X
@@ -437,38 +464,31 @@ class ValueSource(object):
                 continue
             import_str = ("import %s" % a_class_name).strip()
             symbols_to_ignore.add(a_class_name)
-            print  >>output_stream, import_str
+            yield import_str + '\n'
 
         # See the explanation of 'symbols_to_ignore' above
         if symbols_to_ignore:
-            print >>output_stream, "\n" \
-                "# the following symbols will be ignored by configman when\n" \
-                "# this module is used as a value source.  This will\n" \
-                "# suppress the mismatch warning since these symbols are\n" \
-                "# values for options, not option names themselves."
-            print >>output_stream, "ignore_symbol_list = ["
+            yield (
+                "\n"
+                "# the following symbols will be ignored by configman when\n"
+                "# this module is used as a value source.  This will\n"
+                "# suppress the mismatch warning since these symbols are\n"
+                "# values for options, not option names themselves.\n"
+                "ignore_symbol_list = [\n"
+            )
             for a_symbol in symbols_to_ignore:
-                print >>output_stream, '    "%s",' % a_symbol
-            print >>output_stream, ']\n'
+                yield '    "%s",\n' % a_symbol
+            yield ']\n\n'
 
         # finally, as the last step, we need to write out the keys and values
         # will be used by a future configman as Options and values.
-        sorted_keys = sorted(
-            source_mapping.keys_breadth_first(include_dicts=True)
-        )
-        for key in sorted_keys:
-            value = source_mapping[key]
-            if isinstance(value, Namespace):
-                ValueSource.write_namespace(key, value, output_stream)
-            elif isinstance(value, Option):
-                ValueSource.write_option(
-                    key,
-                    value,
-                    alias_by_class,
-                    output_stream
-                )
+        for key, value in items:
+            if isinstance(value, Option):
+                yield ValueSource.emit_option(key, value, alias_by_class)
+            elif isinstance(value, Namespace):
+                yield ValueSource.emit_namespace(key, value)
             elif isinstance(value, Aggregation):
                 # skip Aggregations
                 continue
             else:
-                ValueSource.write_bare_value(key, value, output_stream)
+                yield ValueSource.emit_bare_value(key, value, alias_by_class)
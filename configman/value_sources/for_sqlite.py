@@ -0,0 +1,341 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""This module implements a configuration value source backed by a SQLite
+database, for deployments that keep the values of many tenants, or profiles,
+in one place.  The values are rows of a single table, indexed by scope and
+dotted key:
+
+    CREATE TABLE configman_values (
+        scope TEXT NOT NULL DEFAULT '',
+        key TEXT NOT NULL,
+        value,
+        PRIMARY KEY (scope, key)
+    )
+
+The rows of the scope '' are shared by all scopes.  A ValueSource for a
+given scope sees the shared rows overridden by those of its own scope and
+none of the rows of other scopes.  The scope is given either as a parameter
+or in the source itself, as in 'app.sqlite?scope=acme'.
+
+Nothing is read when the database is opened.  The first lookup of a key that
+hasn't been asked for before fetches, in one parameterized query, all the
+keys of the options that the ConfigurationManager knows of at that moment,
+so each round of expansion costs one query for just the keys that it added.
+
+Values of the types None, int, long and float are stored natively.  Every
+other value is stored as the string that its option's to_string_converter
+makes of it."""
+
+import collections
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import urlparse
+
+from configman.option import Option
+from configman.value_sources import handles
+from configman.value_sources.source_exceptions import (
+    ValueException,
+    CantHandleTypeException
+)
+from configman.dotdict import DotDict, iteritems_breadth_first, view_or_copy
+from configman.memoize import memoize
+
+can_handle = (
+    basestring,
+)
+
+file_name_extension = 'sqlite'
+# the files are databases, they must be opened with 'rb' or 'wb'
+binary_file_format = True
+
+table_name = 'configman_values'
+
+# the scope of the ValueSources that are not given one in their source.  None
+# means only the shared rows of the scope ''
+scope = None
+
+# the largest number of keys asked for in one query.  SQLite may be built to
+# allow no more than 999 parameters in a statement.
+max_batch_size = 400
+
+create_table_sql = """
+    CREATE TABLE IF NOT EXISTS %s (
+        scope TEXT NOT NULL DEFAULT '',
+        key TEXT NOT NULL,
+        value,
+        PRIMARY KEY (scope, key)
+    )""" % table_name
+
+
+#==============================================================================
+class NotASqliteDatabaseError(ValueException):
+    pass
+
+
+#------------------------------------------------------------------------------
+def write_rows(connection, items, a_scope=''):
+    """write an iterable of (key, value) pairs into the values table of a
+    database, creating the table if need be.  The existing rows of the scope
+    are replaced."""
+    with connection:
+        connection.execute(create_table_sql)
+        connection.execute(
+            'DELETE FROM %s WHERE scope = ?' % table_name,
+            (a_scope,)
+        )
+        connection.executemany(
+            'INSERT INTO %s (scope, key, value) VALUES (?, ?, ?)'
+            % table_name,
+            ((a_scope, key, value) for key, value in items)
+        )
+
+
+#==============================================================================
+class SqliteMapping(collections.Mapping):
+    """a read-only flat mapping of the dotted keys of one scope of a
+    database.  Keys are fetched in batches, as they are first asked for."""
+
+    #--------------------------------------------------------------------------
+    def __init__(self, file_name, a_scope=None, the_config_manager=None):
+        self.config_manager = the_config_manager
+        if a_scope:
+            self._scopes = ('', a_scope)
+        else:
+            self._scopes = ('',)
+        self._connection = sqlite3.connect(
+            file_name,
+            # the ValueSource may be made in one thread and used in another,
+            # the lock serializes the use of the connection
+            check_same_thread=False
+        )
+        self._connection.text_factory = str
+        self._lock = threading.Lock()
+        self._values = {}
+        self._queried_keys = set()
+        self._namespaces = {}
+        self._all_keys = None
+        self._option_keys = None
+        self._defined_keys = frozenset()
+        try:
+            self._query('SELECT 1 FROM %s LIMIT 1' % table_name, ())
+        except sqlite3.DatabaseError, x:
+            self._connection.close()
+            raise NotASqliteDatabaseError(
+                '%s has no %s table: %s' % (file_name, table_name, str(x))
+            )
+
+    #--------------------------------------------------------------------------
+    def _query(self, sql, parameters):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    #--------------------------------------------------------------------------
+    def _scope_condition(self):
+        return 'scope IN (%s)' % ', '.join('?' * len(self._scopes))
+
+    #--------------------------------------------------------------------------
+    def _wanted_keys(self, key):
+        """return the keys of all the options known to the
+        ConfigurationManager.  They are listed once, and listed again only
+        when asked about a key that the ConfigurationManager had not defined
+        when they were last listed, as when expansion has added options."""
+        if self._option_keys is None or key not in self._defined_keys:
+            try:
+                option_definitions = self.config_manager.option_definitions
+            except AttributeError:
+                return []
+            option_keys = []
+            defined_keys = set()
+            for a_key in option_definitions.keys_breadth_first(
+                include_dicts=True
+            ):
+                defined_keys.add(a_key)
+                if isinstance(option_definitions[a_key], Option):
+                    option_keys.append(a_key)
+            self._option_keys = option_keys
+            self._defined_keys = frozenset(defined_keys)
+        return self._option_keys
+
+    #--------------------------------------------------------------------------
+    def _batches(self, keys):
+        keys = sorted(keys)
+        for i in xrange(0, len(keys), max_batch_size):
+            yield keys[i:i + max_batch_size]
+
+    #--------------------------------------------------------------------------
+    def fetch(self, keys):
+        """fetch those of the keys not yet asked for"""
+        new_keys = set(keys) - self._queried_keys
+        for a_batch in self._batches(new_keys):
+            rows = self._query(
+                'SELECT key, value FROM %s WHERE %s AND key IN (%s) '
+                # the shared rows first, so those of the scope override them
+                'ORDER BY scope' % (
+                    table_name,
+                    self._scope_condition(),
+                    ', '.join('?' * len(a_batch))
+                ),
+                self._scopes + tuple(a_batch)
+            )
+            self._values.update(rows)
+        self._queried_keys.update(new_keys)
+
+    #--------------------------------------------------------------------------
+    def _fetch_namespaces(self, keys):
+        """find out which of the keys, not yet asked about, are namespaces:
+        one index range lookup for each, in a single query"""
+        new_keys = [k for k in keys if k not in self._namespaces]
+        for a_batch in self._batches(new_keys):
+            rows = self._query(
+                'SELECT name FROM (%s) WHERE EXISTS ('
+                'SELECT 1 FROM %s WHERE %s '
+                "AND key >= name || '.' AND key < name || '/')" % (
+                    ' UNION ALL '.join(['SELECT ? AS name'] * len(a_batch)),
+                    table_name,
+                    self._scope_condition(),
+                ),
+                tuple(a_batch) + self._scopes
+            )
+            self._namespaces.update((name, False) for name in a_batch)
+            self._namespaces.update((name, True) for (name,) in rows)
+
+    #--------------------------------------------------------------------------
+    def __getitem__(self, key):
+        if key not in self._queried_keys:
+            self.fetch(self._wanted_keys(key) + [key])
+        return self._values[key]
+
+    #--------------------------------------------------------------------------
+    def is_namespace(self, key):
+        """return True if there are keys of the form 'key.x'"""
+        if key not in self._namespaces:
+            self._fetch_namespaces(self._wanted_keys(key) + [key])
+        return self._namespaces[key]
+
+    #--------------------------------------------------------------------------
+    def _load_all_keys(self):
+        """listing the keys takes a scan of all the rows of the scope.  Only
+        the check for mismatches and namespace lookups need it."""
+        if self._all_keys is None:
+            rows = self._query(
+                'SELECT key, value FROM %s WHERE %s ORDER BY key, scope' % (
+                    table_name,
+                    self._scope_condition()
+                ),
+                self._scopes
+            )
+            self._values.update(rows)
+            self._queried_keys.update(self._values)
+            self._all_keys = sorted(set(key for key, value in rows))
+        return self._all_keys
+
+    #--------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self._load_all_keys())
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._load_all_keys())
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        self._connection.close()
+
+
+#==============================================================================
+class ValueSource(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, source, the_config_manager=None, scope=None):
+        """parameters:
+            source - the name of a SQLite database file, optionally followed
+                     by '?scope=<scope>'
+            the_config_manager - the ConfigurationManager being set up.  Its
+                                 options determine which keys are fetched.
+            scope - the scope of the values, overriding any in the source.
+                    None means the scope in the source, if any, or else the
+                    module level 'scope'"""
+        if not (
+            isinstance(source, basestring) and handles.sqlite_file(source)
+        ):
+            raise CantHandleTypeException()
+        file_name, _, query = source.partition('?')
+        if scope is None:
+            scope = urlparse.parse_qs(query).get('scope', [None])[-1]
+        if scope is None:
+            scope = globals()['scope']
+        if not os.path.isfile(file_name):
+            # sqlite3 would make a new empty database
+            raise NotASqliteDatabaseError(
+                "Sqlite couldn't open %s: no such file" % file_name
+            )
+        self.values = SqliteMapping(file_name, scope, the_config_manager)
+        try:
+            self.always_ignore_mismatches = bool(
+                self.values["always_ignore_mismatches"]
+            )
+        except KeyError:
+            pass
+
+    #--------------------------------------------------------------------------
+    @memoize()
+    def get_values(self, config_manager, ignore_mismatches, obj_hook=DotDict):
+        """the 'config_manager' and 'ignore_mismatches' are dummy values for
+        this implementation of a ValueSource."""
+        return view_or_copy(self.values, obj_hook)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def write(source_mapping, output_stream=sys.stdout):
+        """write the values of the Options of a mapping of Options as the
+        shared rows of a database.  A stream opened in binary mode, as
+        'dump_conf' opens one, is given the database file itself.  It is
+        made in a temporary file and copied into the stream, so the stream
+        needn't be a file.  Any other stream is given the database as SQL
+        statements."""
+        items = [
+            (key, ValueSource._storable_value(value))
+            for key, value in iteritems_breadth_first(source_mapping)
+            if isinstance(value, Option)
+        ]
+        if 'b' not in getattr(output_stream, 'mode', ''):
+            connection = sqlite3.connect(':memory:')
+            try:
+                write_rows(connection, items)
+                for a_statement in connection.iterdump():
+                    output_stream.write('%s\n' % a_statement)
+            finally:
+                connection.close()
+            return
+        file_descriptor, database_name = tempfile.mkstemp(
+            suffix='.' + file_name_extension
+        )
+        os.close(file_descriptor)
+        try:
+            connection = sqlite3.connect(database_name)
+            try:
+                write_rows(connection, items)
+            finally:
+                connection.close()
+            with open(database_name, 'rb') as database_file:
+                shutil.copyfileobj(database_file, output_stream)
+        finally:
+            os.remove(database_name)
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _storable_value(an_option):
+        """return the value of an option if SQLite can store it natively,
+        otherwise the option's value as a string"""
+        value = an_option.value
+        if value is None or type(value) is float:
+            return value
+        if type(value) in (int, long) and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return str(an_option)
@@ -0,0 +1,36 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""The tests that tell whether a value source handler takes a given string
+source.  They are here, rather than in the handler modules, so that the
+dispatch can ask them without importing the handlers and so that each
+handler's ValueSource asks the very same question.  They must stay cheap:
+this module imports nothing beyond the standard library."""
+
+import os
+
+
+#------------------------------------------------------------------------------
+def http_url(source):
+    """for_http: the base URL of a key/value service"""
+    return source.startswith(('http://', 'https://'))
+
+
+#------------------------------------------------------------------------------
+def cmb_file(source):
+    """for_cmb: the name of a cmb file"""
+    return source.endswith('cmb')
+
+
+#------------------------------------------------------------------------------
+def sqlite_file(source):
+    """for_sqlite: the name of a SQLite database file, optionally followed
+    by a '?' query"""
+    return source.partition('?')[0].endswith('sqlite')
+
+
+#------------------------------------------------------------------------------
+def directory(source):
+    """for_directory: the name of an existing directory"""
+    return os.path.isdir(source)
@@ -0,0 +1,153 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""This module implements a process wide cache of parsed config files.  Many
+ConfigurationManager instances in a single process, as in test suites or
+multi-tenant services, tend to read the same ini, json and conf files.  The
+file based ValueSource implementations fetch their parsed content from here
+rather than parsing the same file over and over.
+
+The cache is keyed by the real path of the file and the name of the format.
+An entry is valid only while the mtime and size of the file, and of any file
+that it included, are unchanged.  The
+cached mappings are shared, so they must be treated as read-only: the
+ValueSource implementations only ever hand out read-only views of them or
+copies."""
+
+import collections
+import os
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 - the order of keys is not preserved
+    OrderedDict = dict
+
+from configman.dotdict import iteritems_breadth_first
+
+
+#------------------------------------------------------------------------------
+def flatten(a_mapping):
+    """return an ordered dict of all the non-mapping values of a nested
+    mapping with the keys in the dotted form 'x.y.z'"""
+    return OrderedDict(iteritems_breadth_first(a_mapping))
+
+
+#------------------------------------------------------------------------------
+def as_flat_mapping(a_mapping):
+    """return the mapping itself if none of its values are mappings,
+    otherwise a flattened copy of it"""
+    for value in a_mapping.itervalues():
+        if isinstance(value, collections.Mapping):
+            return flatten(a_mapping)
+    return a_mapping
+
+
+#==============================================================================
+class ParseCache(object):
+
+    #--------------------------------------------------------------------------
+    def __init__(self, max_cache_size=1000):
+        """parameters:
+            max_cache_size - the number of entries to which the cache can
+                             grow.  Like the memoize decorator, if the cache
+                             exceeds the max, it is thrown out and a new one
+                             made."""
+        self.max_cache_size = max_cache_size
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _signature(real_path):
+        file_stat = os.stat(real_path)
+        return (file_stat.st_mtime, file_stat.st_size)
+
+    #--------------------------------------------------------------------------
+    def _is_current(self, signature, dependencies, real_path):
+        if signature != self._signature(real_path):
+            return False
+        for a_path, a_signature in dependencies:
+            try:
+                if a_signature != self._signature(a_path):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    #--------------------------------------------------------------------------
+    def get(self, file_name, format_name, parser, with_dependencies=False):
+        """return the flat mapping for a file, calling 'parser' with the real
+        path of the file only if there is no valid cached entry for it.
+
+        parameters:
+            file_name - the pathname of the file to parse
+            format_name - a string naming the format.  The same file parsed
+                          as different formats gets distinct entries
+            parser - a function that accepts a pathname and returns a flat
+                     mapping of the file's contents.  Exceptions raised by
+                     the parser propagate and nothing is cached.
+            with_dependencies - if True, the parser returns a 2-tuple: the
+                                flat mapping and a sequence of the pathnames
+                                of other files that were read, like ini
+                                includes.  A change to any of those files
+                                also invalidates the entry."""
+        real_path = os.path.realpath(file_name)
+        key = (real_path, format_name)
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None:
+            signature, dependencies, values = entry
+            if self._is_current(signature, dependencies, real_path):
+                with self._lock:
+                    self.hits += 1
+                return values
+        with self._lock:
+            self.misses += 1
+        signature = self._signature(real_path)
+        if with_dependencies:
+            values, dependency_paths = parser(real_path)
+            dependencies = tuple(
+                (a_path, self._signature(a_path))
+                for a_path in dependency_paths
+                if a_path != real_path
+            )
+        else:
+            values = parser(real_path)
+            dependencies = ()
+        with self._lock:
+            if len(self._cache) >= self.max_cache_size:
+                self._cache = {}
+            self._cache[key] = (signature, dependencies, values)
+        return values
+
+    #--------------------------------------------------------------------------
+    def statistics(self):
+        """return a dict of the hit and miss counts and the number of
+        entries currently in the cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._cache),
+        }
+
+    #--------------------------------------------------------------------------
+    def clear(self):
+        """empty the cache and reset the statistics"""
+        with self._lock:
+            self._cache = {}
+            self.hits = 0
+            self.misses = 0
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._cache)
+
+
+#------------------------------------------------------------------------------
+# the instance shared by all the file based ValueSources in this process
+parse_cache = ParseCache()